@@ -3,9 +3,12 @@
 Aplicación principal del Bot de WhatsApp para Google Maps
 """
 
+import functools
+import hmac
 import os
 import sys
-from flask import Flask, request, jsonify
+import uuid
+from flask import Flask, Response, request, jsonify
 from twilio.twiml.messaging_response import MessagingResponse
 from datetime import datetime
 
@@ -14,78 +17,181 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.bot import WhatsAppBot
 from src.config import Config
+from src.utils.logger import configure_logging, log_context
+from src.utils.metrics import render_metrics
 
-# Crear instancia global del bot
-bot = WhatsAppBot()
-config = Config()
-
-# Configurar Flask app
-app = Flask(__name__)
-
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint para Docker"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'whatsapp-feedback-bot',
-        'version': '1.0.0',
-        'timestamp': datetime.now().isoformat()
-    })
-
-@app.route('/webhook', methods=['POST'])
-def webhook():
-    """Webhook para recibir mensajes de Twilio"""
-    try:
-        # Obtener datos del mensaje
-        from_number = request.form.get('From', '').replace('whatsapp:', '')
-        message_body = request.form.get('Body', '')
-        media_urls = []
-        
-        # Obtener URLs de medios si los hay
-        num_media = int(request.form.get('NumMedia', 0))
-        for i in range(num_media):
-            media_url = request.form.get(f'MediaUrl{i}', '')
-            if media_url:
-                media_urls.append(media_url)
-                
-        # Procesar mensaje
-        response_message = bot.handle_incoming_message(from_number, message_body, media_urls)
-        
-        # Crear respuesta TwiML
-        resp = MessagingResponse()
-        resp.message(response_message)
-        
-        return str(resp)
+def configure_app_logging():
+    """Configurar el logging del proceso según ``Config`` (una sola vez)"""
+    configure_logging(
+        Config.LOG_LEVEL,
+        Config.LOG_FILE,
+        json_format=Config.LOG_FORMAT == 'json',
+        max_bytes=Config.LOG_MAX_BYTES,
+        backup_count=Config.LOG_BACKUP_COUNT,
+        per_process=Config.LOG_FILE_PER_PROCESS
+    )
+
+def create_app(bot=None, start_workers=True):
+    """Crear la aplicación Flask con su propio bot.
+
+    gunicorn la llama una vez en cada worker (``app:create_app()``), así cada
+    proceso tiene su cliente de Twilio, sus hilos y sus pools de navegadores.
+    Si no recibe un bot, también configura el logging del proceso.
+    """
+    if bot is None:
+        configure_app_logging()
+        bot = WhatsAppBot()
+    if start_workers:
+        bot.start_workers()
         
-    except Exception as e:
-        bot.logger.error(f"Error en webhook: {str(e)}")
-        resp = MessagingResponse()
-        resp.message("Lo siento, hubo un error. Por favor, intenta de nuevo.")
-        return str(resp)
-
-@app.route('/', methods=['GET'])
-def index():
-    """Página principal"""
-    return jsonify({
-        'message': 'WhatsApp Feedback Bot para Google Maps',
-        'version': '1.0.0',
-        'status': 'running',
-        'endpoints': {
-            'health': '/health',
-            'webhook': '/webhook',
-            'index': '/'
-        }
-    })
+    app = Flask(__name__)
+    app.extensions['whatsapp_bot'] = bot
+    
+    @app.route('/health', methods=['GET'])
+    def health_check():
+        """Health check endpoint para Docker"""
+        return jsonify({
+            'status': 'healthy',
+            'service': 'whatsapp-feedback-bot',
+            'version': '1.0.0',
+            'timestamp': datetime.now().isoformat()
+        })
+
+    @app.route('/webhook', methods=['POST'])
+    def webhook():
+        """Webhook para recibir mensajes de Twilio"""
+        try:
+            # Obtener datos del mensaje
+            from_number = request.form.get('From', '').replace('whatsapp:', '')
+            message_body = request.form.get('Body', '')
+            message_sid = request.form.get('MessageSid')
+            media_urls = []
+
+            # Obtener URLs de medios si los hay
+            num_media = int(request.form.get('NumMedia', 0))
+            for i in range(num_media):
+                media_url = request.form.get(f'MediaUrl{i}', '')
+                if media_url:
+                    media_urls.append(media_url)
+
+            # Procesar mensaje (los registros llevan el MessageSid como request_id)
+            with log_context(request_id=message_sid or uuid.uuid4().hex):
+                response_message = bot.handle_incoming_message(from_number, message_body, media_urls, message_sid)
+
+            # Crear respuesta TwiML: es la única entrega de la respuesta al usuario
+            resp = MessagingResponse()
+            if response_message:
+                resp.message(response_message)
+
+            return str(resp)
+
+        except Exception as e:
+            bot.logger.exception("Error en webhook: %s", e)
+            resp = MessagingResponse()
+            resp.message("Lo siento, hubo un error. Por favor, intenta de nuevo.")
+            return str(resp)
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def job_status(job_id):
+        """Consultar el estado de un envío encolado"""
+        job = bot.get_job_status(job_id)
+        if job is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        return jsonify(job)
+
+    @app.route('/stats', methods=['GET'])
+    def stats():
+        """Estadísticas operativas (sesiones, cola, pool y caché de lugares)"""
+        return jsonify(bot.get_stats())
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Métricas en formato Prometheus (agregadas entre workers si hay PROMETHEUS_MULTIPROC_DIR)"""
+        body, content_type = render_metrics()
+        return Response(body, content_type=content_type)
+
+    def admin_required(view):
+        """Exigir ``Authorization: Bearer <ADMIN_TOKEN>``; sin token configurado la ruta no existe"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            token = bot.config.ADMIN_TOKEN
+            if not token or bot.trace_store is None:
+                return jsonify({'error': 'No encontrado'}), 404
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+                return jsonify({'error': 'No autorizado'}), 401
+            return view(*args, **kwargs)
+        return wrapper
+
+    @app.route('/admin/traces', methods=['GET'])
+    @admin_required
+    def list_traces():
+        """Últimos intentos de envío (filtros: status, job_id, limit)"""
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        traces = bot.trace_store.recent(limit, request.args.get('status'), request.args.get('job_id'))
+        return jsonify({'traces': traces})
+
+    @app.route('/admin/traces/summary', methods=['GET'])
+    @admin_required
+    def traces_summary():
+        """Duración por paso y por espera en las últimas trazas"""
+        limit = min(request.args.get('limit', 200, type=int), 5000)
+        return jsonify(bot.trace_store.summary(limit))
+
+    @app.route('/admin/traces/<trace_id>', methods=['GET'])
+    @admin_required
+    def trace_detail(trace_id):
+        """Línea de tiempo completa de un intento"""
+        trace = bot.trace_store.get(trace_id)
+        if trace is None:
+            return jsonify({'error': 'Traza no encontrada'}), 404
+        return jsonify(trace)
+
+    @app.route('/admin/traces/<trace_id>/<kind>', methods=['GET'])
+    @admin_required
+    def trace_snapshot(trace_id, kind):
+        """Captura de pantalla (``screenshot``) o DOM (``dom``) del paso que falló"""
+        snapshot = bot.trace_store.get_snapshot(trace_id, kind)
+        if snapshot is None:
+            return jsonify({'error': 'Captura no encontrada'}), 404
+        content_type, encoding, data = snapshot
+        response = Response(data, content_type=content_type)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if kind == 'dom':
+            # El HTML de Google se descarga; no se muestra en el origen del bot
+            response.headers['Content-Disposition'] = f'attachment; filename="{trace_id}.html"'
+        return response
+
+    @app.route('/', methods=['GET'])
+    def index():
+        """Página principal"""
+        return jsonify({
+            'message': 'WhatsApp Feedback Bot para Google Maps',
+            'version': '1.0.0',
+            'status': 'running',
+            'endpoints': {
+                'health': '/health',
+                'webhook': '/webhook',
+                'jobs': '/jobs/<job_id>',
+                'stats': '/stats',
+                'metrics': '/metrics',
+                'traces': '/admin/traces',
+                'index': '/'
+            }
+        })
+    
+    return app
 
 if __name__ == '__main__':
     # Verificar configuración
     required_vars = [
         'TWILIO_ACCOUNT_SID',
         'TWILIO_AUTH_TOKEN', 
-        'TWILIO_WHATSAPP_NUMBER',
-        'GOOGLE_EMAIL',
-        'GOOGLE_PASSWORD'
+        'TWILIO_WHATSAPP_NUMBER'
     ]
+    if not os.getenv('GOOGLE_ACCOUNTS_FILE'):
+        required_vars += ['GOOGLE_EMAIL', 'GOOGLE_PASSWORD']
     
     missing_vars = []
     for var in required_vars:
@@ -101,10 +207,11 @@ if __name__ == '__main__':
     
     print("🤖 Iniciando Bot de WhatsApp para Google Maps...")
     print("✅ Configuración verificada")
-    print("🌐 Iniciando servidor web en http://localhost:5000")
+    print("🌐 Iniciando servidor de desarrollo en http://localhost:5000 (producción: gunicorn -c gunicorn.conf.py)")
     print("📱 El bot estará disponible en el webhook: http://localhost:5000/webhook")
     
-    app.run(
+    config = Config()
+    create_app().run(
         debug=config.FLASK_DEBUG,
         host='0.0.0.0',
         port=5000
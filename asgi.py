@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Aplicación ASGI del Bot de WhatsApp para Google Maps
+
+    uvicorn asgi:create_asgi_app --factory --host 0.0.0.0 --port 5000
+
+``POST /webhook/async`` hace esperar los mensajes de Twilio en el event loop y
+los procesa con el manejador síncrono en un pool de hilos; el resto de las
+rutas (incluido ``/webhook``) son las de la app Flask.
+"""
+
+import os
+import sys
+import uuid
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from twilio.twiml.messaging_response import MessagingResponse
+
+# Agregar src al path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.bot.async_bot import AsyncWhatsAppBot
+from src.utils.logger import log_context
+from app import configure_app_logging, create_app
+
+ASYNC_WEBHOOK_PATH = '/webhook/async'
+MAX_BODY_BYTES = 64 * 1024
+
+
+def create_asgi_app(async_bot=None):
+    """Crear la aplicación ASGI con su propio bot (una por proceso)"""
+    if async_bot is None:
+        configure_app_logging()
+        async_bot = AsyncWhatsAppBot()
+    bot = async_bot.bot
+    flask_app = WsgiToAsgi(create_app(bot, start_workers=False))
+
+    async def read_form(receive):
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if len(body) > MAX_BODY_BYTES:
+                raise ValueError("Cuerpo del webhook demasiado grande")
+        fields = parse_qs(body.decode('utf-8'), keep_blank_values=True)
+        return {name: values[0] for name, values in fields.items()}
+
+    async def webhook(receive, send):
+        """Webhook asíncrono para recibir mensajes de Twilio"""
+        resp = MessagingResponse()
+        try:
+            form = await read_form(receive)
+            from_number = form.get('From', '').replace('whatsapp:', '')
+            media_urls = [
+                form[f'MediaUrl{i}'] for i in range(int(form.get('NumMedia', 0))) if form.get(f'MediaUrl{i}')
+            ]
+            message_sid = form.get('MessageSid')
+            with log_context(request_id=message_sid or uuid.uuid4().hex):
+                response_message = await async_bot.handle_incoming_message(
+                    from_number, form.get('Body', ''), media_urls, message_sid
+                )
+            if response_message:
+                resp.message(response_message)
+        except Exception as e:
+            bot.logger.exception("Error en webhook asíncrono: %s", e)
+            resp.message("Lo siento, hubo un error. Por favor, intenta de nuevo.")
+
+        body = str(resp).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/xml; charset=utf-8'), (b'content-length', str(len(body)).encode())]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await async_bot.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_bot.shutdown(bot.config.SHUTDOWN_TIMEOUT)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['path'] == ASYNC_WEBHOOK_PATH and scope['method'] == 'POST':
+            await webhook(receive, send)
+        else:
+            await flask_app(scope, receive, send)
+
+    app.async_bot = async_bot
+    return app
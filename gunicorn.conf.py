@@ -0,0 +1,66 @@
+"""
+Configuración de gunicorn para producción
+
+    gunicorn -c gunicorn.conf.py
+
+Cada worker crea su propio bot con ``app:create_app()`` (sin ``preload_app``,
+para no heredar hilos ni conexiones del proceso maestro). Al detenerse, cada
+worker deja de aceptar requests, termina los envíos en curso y entrega los
+mensajes pendientes antes de salir.
+"""
+
+import os
+import shutil
+from dotenv import load_dotenv
+
+load_dotenv()
+# Antes de importar la configuración: los workers heredan la del maestro
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/feedback-metrics')
+if int(os.getenv('WEB_WORKERS', '2')) > 1:
+    # Sesiones y turnos por remitente compartidos entre workers, y un solo proceso ejecutando los envíos
+    os.environ.setdefault('SESSION_BACKEND', 'sqlite')
+    os.environ.setdefault('JOB_WORKERS_LOCK', 'data/job-workers.lock')
+    os.environ.setdefault('SENDER_LOCKS_DIR', 'data/sender-locks')
+    os.environ.setdefault('LOG_FILE_PER_PROCESS', 'true')
+
+from src.config import Config
+
+wsgi_app = 'app:create_app()'
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+workers = Config.WEB_WORKERS
+worker_class = Config.WEB_WORKER_CLASS
+threads = Config.WEB_THREADS
+worker_connections = Config.WEB_WORKER_CONNECTIONS
+timeout = Config.WEB_TIMEOUT
+# Margen para terminar los envíos en curso antes de que el maestro mate al worker
+graceful_timeout = Config.SHUTDOWN_TIMEOUT + 10
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = Config.LOG_LEVEL.lower()
+
+
+def on_starting(server):
+    """Vaciar las métricas de ejecuciones anteriores"""
+    if workers > 1 and Config.SESSION_BACKEND == 'memory':
+        server.log.warning("SESSION_BACKEND=memory con varios workers: cada proceso tendrá sus propias sesiones")
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def worker_exit(server, worker):
+    """Drenar los envíos y mensajes del worker antes de que termine"""
+    app = getattr(worker, 'wsgi', None)
+    bot = getattr(app, 'extensions', {}).get('whatsapp_bot')
+    if bot is not None:
+        server.log.info("Worker %s: esperando los envíos en curso", worker.pid)
+        bot.stop_workers(timeout=Config.SHUTDOWN_TIMEOUT)
+
+
+def child_exit(server, worker):
+    """Descartar los gauges del worker que terminó"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,5 +3,13 @@ Módulo de automatización de Google Maps
 """
 
 from .google_maps import GoogleMapsAutomation
+from .driver_pool import DriverPool, DriverPoolTimeout
+from .session_store import GoogleSessionStore
+from .place_cache import PlaceCache
+from .driver_binary import ChromeDriverError, resolve_chromedriver, resolved_chromedriver
+from .browser_profiles import BrowserProfile, get_browser_profile
+from .tracing import Trace, TraceStore
 
-__all__ = ['GoogleMapsAutomation'] 
\ No newline at end of file
+__all__ = ['GoogleMapsAutomation', 'DriverPool', 'DriverPoolTimeout', 'GoogleSessionStore', 'PlaceCache',
+           'ChromeDriverError', 'resolve_chromedriver', 'resolved_chromedriver',
+           'BrowserProfile', 'get_browser_profile', 'Trace', 'TraceStore'] 
\ No newline at end of file
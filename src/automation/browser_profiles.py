@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from selenium.webdriver.chrome.options import Options
+
+# Recursos que no hacen falta para dejar una reseña
+BLOCKED_URL_PATTERNS = (
+    # Imágenes y teselas del mapa
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*/maps/vt*', '*/kh/v=*',
+    # Fuentes
+    '*.woff', '*.woff2', '*.ttf', '*fonts.gstatic.com*',
+    # Analítica y publicidad
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*/gen_204*', '*/log?format=*',
+)
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """Opciones de Chrome y bloqueos de red con los que se lanza cada navegador"""
+
+    name: str
+    headless: bool = False
+    arguments: tuple = ()
+    blocked_urls: tuple = ()
+    window_size: tuple = (1366, 900)
+
+    def chrome_options(self, binary_location=None):
+        """Opciones de Chrome para este perfil.
+
+        ``binary_location`` (``Config.CHROME_BINARY``) fija el Chrome que se
+        lanza, el mismo contra el que se verificó chromedriver al arrancar.
+        """
+        options = Options()
+        if binary_location:
+            options.binary_location = binary_location
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+
+        # Log de rendimiento para detectar cuándo la red queda inactiva
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        if self.headless:
+            options.add_argument("--headless=new")
+        for argument in self.arguments:
+            options.add_argument(argument)
+        return options
+
+    def apply(self, driver):
+        """Ajustes por CDP una vez lanzado el navegador"""
+        if self.blocked_urls:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(self.blocked_urls)})
+        if self.headless:
+            # El user agent headless delata la automatización
+            user_agent = driver.execute_script("return navigator.userAgent")
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+                'userAgent': user_agent.replace('HeadlessChrome', 'Chrome')
+            })
+
+
+PROFILES = {
+    # Contenedor: sin ventana, sin GPU, sin imágenes/fuentes/analítica y pocos renderers
+    'production': BrowserProfile(
+        name='production',
+        headless=True,
+        arguments=(
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-default-apps",
+            "--mute-audio",
+            "--no-first-run",
+            "--renderer-process-limit=2",
+        ),
+        blocked_urls=BLOCKED_URL_PATTERNS,
+        window_size=(1280, 900),
+    ),
+    # Navegador visible y completo para depurar los selectores
+    'debug': BrowserProfile(name='debug'),
+}
+
+
+def get_browser_profile(name):
+    """Perfil de navegador por nombre (``production`` o ``debug``)"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de navegador desconocido: {name}") from None
@@ -0,0 +1,124 @@
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+# Ejecutables de Chrome que se buscan en el PATH si no se indica uno
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')
+
+_VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+')
+
+_resolved_path = None
+_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+class ChromeDriverError(RuntimeError):
+    """El chromedriver no está disponible o no corresponde al Chrome instalado"""
+
+
+def major_version(binary):
+    """Versión mayor que informa ``binary --version`` (None si no se puede leer)"""
+    try:
+        output = subprocess.run(
+            [binary, '--version'], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_PATTERN.search(output)
+    return int(match.group(1)) if match else None
+
+
+def find_chrome(chrome_binary=None):
+    """Ruta del ejecutable de Chrome: el configurado o el primero del PATH"""
+    if chrome_binary:
+        return chrome_binary
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate)
+        if path:
+            return path
+    return None
+
+
+def verify_chromedriver(driver_path, chrome_binary=None, require_chrome=True):
+    """Comprobar que chromedriver y Chrome tienen la misma versión mayor.
+
+    Sin un Chrome que responda a ``--version`` falla, salvo que el llamador
+    lo acepte explícitamente con ``require_chrome=False``.
+    """
+    driver_version = major_version(driver_path)
+    if driver_version is None:
+        raise ChromeDriverError(f"No se pudo ejecutar chromedriver: {driver_path}")
+
+    chrome_path = find_chrome(chrome_binary)
+    chrome_version = major_version(chrome_path) if chrome_path else None
+    if chrome_version is None:
+        if require_chrome:
+            raise ChromeDriverError(
+                f"No se encontró Chrome ({chrome_path or 'ninguno en el PATH'}); configurar CHROME_BINARY"
+            )
+        logger.warning("No se encontró Chrome; no se verifica la versión de chromedriver")
+        return driver_version
+
+    if chrome_version != driver_version:
+        raise ChromeDriverError(
+            f"chromedriver {driver_version} no corresponde a Chrome {chrome_version} ({chrome_path})"
+        )
+    return driver_version
+
+
+def resolve_chromedriver(driver_path=None, offline=False, chrome_binary=None, verify=True, require_chrome=True):
+    """Resolver la ruta de chromedriver una sola vez por proceso.
+
+    Usa ``driver_path`` si se indica; en modo ``offline`` busca ``chromedriver``
+    en el PATH y nunca descarga nada; si no, lo resuelve con webdriver-manager.
+    Las llamadas siguientes devuelven la ruta ya resuelta sin volver a
+    comprobar nada, así que arrancar un navegador solo lanza el proceso.
+    Si no se encuentra Chrome falla, salvo con ``require_chrome=False``.
+    """
+    global _resolved_path
+    with _lock:
+        if _resolved_path:
+            return _resolved_path
+
+        if driver_path:
+            if not os.access(driver_path, os.X_OK):
+                raise ChromeDriverError(f"chromedriver no encontrado o no ejecutable: {driver_path}")
+            path = driver_path
+        elif offline:
+            path = shutil.which('chromedriver')
+            if not path:
+                raise ChromeDriverError("Modo offline: chromedriver no está en el PATH")
+        else:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+
+        if verify:
+            version = verify_chromedriver(path, chrome_binary, require_chrome)
+            logger.info("chromedriver %s resuelto: %s", version, path)
+
+        _resolved_path = path
+        return path
+
+
+def resolved_chromedriver():
+    """Ruta resuelta al arrancar; falla en lugar de descargar si no se resolvió antes.
+
+    Así lanzar un navegador nunca cae en una descarga con webdriver-manager
+    que ignore ``CHROMEDRIVER_PATH``, el modo offline o ``CHROME_BINARY``.
+    """
+    with _lock:
+        if not _resolved_path:
+            raise ChromeDriverError(
+                "chromedriver no se resolvió al arrancar; llamar a resolve_chromedriver con la configuración"
+            )
+        return _resolved_path
+
+
+def reset_chromedriver_cache():
+    """Olvidar la ruta resuelta (para tests o tras actualizar Chrome)"""
+    global _resolved_path
+    with _lock:
+        _resolved_path = None
@@ -0,0 +1,236 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def process_tree_rss_mb(pid):
+    """Memoria residente (MB) de un proceso y todos sus descendientes.
+
+    Lee ``/proc`` directamente, por lo que solo funciona en Linux (el caso del
+    contenedor Docker). Devuelve None si no se puede medir.
+    """
+    if not pid or not os.path.isdir('/proc'):
+        return None
+
+    total_kb = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            task_dir = f'/proc/{current}/task'
+            for task in os.listdir(task_dir):
+                with open(f'{task_dir}/{task}/children') as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+
+    return total_kb / 1024
+
+
+class PooledDriver:
+    """Driver de Chrome gestionado por el pool"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+        self.discard = False
+
+    @property
+    def pid(self):
+        service = getattr(self.driver, 'service', None)
+        process = getattr(service, 'process', None)
+        return getattr(process, 'pid', None)
+
+    def memory_mb(self):
+        return process_tree_rss_mb(self.pid)
+
+
+class DriverPoolTimeout(Exception):
+    """No hubo un driver disponible dentro del tiempo de espera"""
+
+
+class DriverPool:
+    """Pool acotado de drivers de Chrome con sesión de Google ya iniciada.
+
+    ``factory()`` debe devolver un driver autenticado y ``health_check(driver)``
+    indicar si sigue vivo y con la sesión iniciada. Un driver se recicla tras
+    ``max_uses`` préstamos o al superar ``max_memory_mb`` de memoria residente.
+    """
+
+    def __init__(self, factory, health_check, size=2, max_uses=25,
+                 max_memory_mb=1500, checkout_timeout=120):
+        self.factory = factory
+        self.health_check = health_check
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.checkout_timeout = checkout_timeout
+        self.logger = logging.getLogger(__name__)
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = []
+        self._leased = 0
+        self._starting = 0  # Drivers lanzándose (lugar reservado antes de crearlos)
+        self._closed = False
+        self._created = 0
+        self._recycled = 0
+
+    def warm(self):
+        """Crear drivers hasta llenar el pool (se llama al arrancar)"""
+        while not self._closed:
+            # El lugar se reserva antes de lanzar Chrome, así nunca hay más de ``size`` drivers
+            with self._lock:
+                if len(self._idle) + self._leased + self._starting >= self.size:
+                    break
+                self._starting += 1
+            try:
+                pooled = self._create()
+            except Exception as e:
+                self.logger.error("Error precalentando driver: %s", e)
+                break
+            with self._lock:
+                self._starting -= 1
+                self._idle.append(pooled)
+                self._available.notify()
+
+    def _create(self):
+        """Lanzar un driver para un lugar ya reservado en ``_starting`` (se libera si falla)"""
+        try:
+            pooled = PooledDriver(self.factory())
+        except Exception:
+            with self._lock:
+                self._starting -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._created += 1
+        self.logger.info("Nuevo driver agregado al pool")
+        return pooled
+
+    def _destroy(self, pooled, reason):
+        with self._lock:
+            self._recycled += 1
+        self.logger.info("Reciclando driver del pool (%s)", reason)
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            self.logger.warning("Error cerrando driver: %s", e)
+
+    def checkout(self, timeout=None):
+        """Tomar un driver sano del pool (crea uno si no hay libres)"""
+        if self._closed:
+            raise RuntimeError("El pool de drivers está cerrado")
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise DriverPoolTimeout(f"Sin drivers disponibles tras {timeout}s")
+
+        try:
+            while True:
+                with self._lock:
+                    # Sin libres y con el pool lleno, un driver se está lanzando: esperarlo
+                    while not self._idle and self._leased + self._starting >= self.size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise DriverPoolTimeout(f"Sin drivers disponibles tras {timeout}s")
+                        self._available.wait(remaining)
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        self._leased += 1
+                    else:
+                        pooled = None
+                        self._starting += 1
+
+                if pooled is None:
+                    pooled = self._create()
+                    with self._lock:
+                        self._starting -= 1
+                        self._leased += 1
+                    return pooled
+                if self._is_healthy(pooled):
+                    return pooled
+                with self._lock:
+                    self._leased -= 1
+                self._destroy(pooled, "sesión inválida")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _is_healthy(self, pooled):
+        try:
+            return bool(self.health_check(pooled.driver))
+        except Exception:
+            return False
+
+    def checkin(self, pooled):
+        """Devolver un driver al pool, reciclándolo si corresponde"""
+        pooled.uses += 1
+        try:
+            reason = None
+            if pooled.discard:
+                reason = "descartado"
+            elif self._closed:
+                reason = "pool cerrado"
+            elif pooled.uses >= self.max_uses:
+                reason = f"{pooled.uses} usos"
+            else:
+                memory = pooled.memory_mb()
+                if memory is not None and memory > self.max_memory_mb:
+                    reason = f"{memory:.0f} MB de memoria"
+
+            if reason:
+                self._destroy(pooled, reason)
+            else:
+                with self._lock:
+                    self._idle.append(pooled)
+        finally:
+            with self._lock:
+                self._leased -= 1
+                self._available.notify()
+            self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Prestar un driver durante un bloque ``with``"""
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled
+        except Exception:
+            pooled.discard = True
+            raise
+        finally:
+            self.checkin(pooled)
+
+    def close(self):
+        """Cerrar todos los drivers libres; los prestados se cierran al devolverse"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._destroy(pooled, "pool cerrado")
+
+    def stats(self):
+        """Utilización actual del pool"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'leased': self._leased,
+                'created': self._created,
+                'recycled': self._recycled
+            }
@@ -1,55 +1,137 @@
-import time
 import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
+from .driver_pool import DriverPool
+from .driver_binary import resolved_chromedriver
+from .browser_profiles import get_browser_profile
+from ..utils.metrics import timed_step
+from .tracing import traced_step
+from .waits import Waiter, dom_settled, network_idle, element_stable, uploads_complete
+
+# Cookies que Google establece solo con una sesión iniciada
+GOOGLE_AUTH_COOKIES = ('SID', '__Secure-1PSID', '__Secure-3PSID')
+
+# Selectores de Google Maps
+FIRST_RESULT = (By.CSS_SELECTOR, "[data-result-index='0']")
+PLACE_HEADING = (By.CSS_SELECTOR, "h1")
+REVIEWS_BUTTON = (By.CSS_SELECTOR, "button[aria-label*='reseña'], button[aria-label*='review']")
+WRITE_REVIEW_BUTTON = (By.CSS_SELECTOR, "button[aria-label*='Escribir reseña'], button[aria-label*='Write a review']")
+REVIEW_TEXTAREA = (By.CSS_SELECTOR, "textarea[aria-label*='reseña'], textarea[aria-label*='review']")
+SUBMIT_BUTTON = (By.CSS_SELECTOR, "button[aria-label*='Enviar'], button[aria-label*='Submit']")
+PHOTO_INPUT = (By.CSS_SELECTOR, "input[type='file']")
+PHOTO_THUMBNAIL = (By.CSS_SELECTOR, "[data-photo-index], div[role='img'][aria-label*='foto'], div[role='img'][aria-label*='photo']")
+PHOTO_UPLOAD_PENDING = (By.CSS_SELECTOR, "[role='progressbar']")
+
+# Solo las URLs de fichas de lugar se guardan en la caché
+PLACE_URL_MARKER = "/maps/place/"
 
 class GoogleMapsAutomation:
     """Clase para automatizar la interacción con Google Maps"""
     
-    def __init__(self, email, password):
+    def __init__(self, email, password, driver_pool=None, session_store=None, wait_timeouts=None,
+                 place_cache=None, browser_profile='production', chrome_binary=None):
         self.email = email
         self.password = password
         self.driver = None
-        self.setup_logging()
-        
-    def setup_logging(self):
-        """Configurar logging para la automatización"""
-        logging.basicConfig(level=logging.INFO)
+        self.browser_profile = get_browser_profile(browser_profile)
+        self.chrome_binary = chrome_binary
+        self.driver_pool = driver_pool
+        self.session_store = session_store
+        self.place_cache = place_cache
+        self.waiter = Waiter(wait_timeouts)
+        self.trace = None
         self.logger = logging.getLogger(__name__)
         
+    @timed_step('driver_setup')
+    @traced_step('driver_setup')
     def setup_driver(self):
-        """Configurar el driver de Chrome con opciones optimizadas"""
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
+        """Configurar el driver de Chrome con las opciones del perfil elegido"""
+        # Ruta resuelta al arrancar con la configuración (ver resolve_chromedriver); aquí solo se lanza el proceso
+        service = Service(resolved_chromedriver())
+        self.driver = webdriver.Chrome(service=service, options=self.browser_profile.chrome_options(self.chrome_binary))
+        self.browser_profile.apply(self.driver)
+        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
-        # Mantener el navegador abierto para debugging
-        # chrome_options.add_argument("--headless")
+    def wait_for(self, step, condition, timeout=None):
+        """Esperar una condición registrando el tiempo esperado en el paso"""
+        return self.waiter.until(self.driver, step, condition, timeout)
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    def start_session(self):
+        """Crear un driver con la sesión de Google iniciada y devolverlo"""
+        self.setup_driver()
+        if not self.login_to_google():
+            self.close()
+            raise RuntimeError("Error en el login de Google")
+        return self.driver
         
+    @staticmethod
+    def is_driver_healthy(driver):
+        """Verificar que el driver sigue vivo y con la sesión de Google iniciada"""
+        try:
+            # Cualquier comando falla si el navegador o la sesión murieron
+            driver.current_url
+            return any(driver.get_cookie(name) for name in GOOGLE_AUTH_COOKIES)
+        except Exception:
+            return False
+            
+    @classmethod
+    def create_driver_pool(cls, email, password, size=2, max_uses=25, max_memory_mb=1500,
+                           checkout_timeout=120, session_store=None, wait_timeouts=None,
+                           browser_profile='production', chrome_binary=None):
+        """Crear un pool de drivers autenticados con esta cuenta"""
+        return DriverPool(
+            factory=lambda: cls(
+                email, password, session_store=session_store, wait_timeouts=wait_timeouts,
+                browser_profile=browser_profile, chrome_binary=chrome_binary
+            ).start_session(),
+            health_check=cls.is_driver_healthy,
+            size=size,
+            max_uses=max_uses,
+            max_memory_mb=max_memory_mb,
+            checkout_timeout=checkout_timeout
+        )
+        
+    def is_logged_in(self):
+        """Verificar la sesión en la página actual (sin navegar)"""
+        if "accounts.google.com" in self.driver.current_url:
+            return False
+        return self.is_driver_healthy(self.driver)
+        
+    def restore_session(self):
+        """Reutilizar la sesión guardada; True si sigue siendo válida"""
+        if not self.session_store or not self.session_store.restore(self.driver):
+            return False
+            
+        try:
+            # Una sola navegación: si la sesión expiró Google redirige al login
+            self.driver.get("https://myaccount.google.com/")
+            if self.is_logged_in():
+                self.logger.info("Sesión de Google restaurada desde disco")
+                return True
+        except Exception as e:
+            self.logger.warning("Error verificando la sesión guardada: %s", e)
+            
+        self.logger.info("La sesión guardada expiró, se inicia sesión de nuevo")
+        self.session_store.clear()
+        return False
+        
+    @timed_step('login')
+    @traced_step('login')
     def login_to_google(self):
         """Iniciar sesión en Google"""
+        if self.restore_session():
+            return True
+            
         try:
             self.logger.info("Iniciando sesión en Google...")
             self.driver.get("https://accounts.google.com/signin")
             
             # Esperar y llenar email
-            email_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "identifier"))
-            )
+            email_input = self.wait_for('login', EC.presence_of_element_located((By.NAME, "identifier")))
             email_input.send_keys(self.email)
             
             # Click en siguiente
@@ -57,127 +139,207 @@ class GoogleMapsAutomation:
             next_button.click()
             
             # Esperar y llenar contraseña
-            password_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "password"))
-            )
+            password_input = self.wait_for('login', EC.element_to_be_clickable((By.NAME, "password")))
             password_input.send_keys(self.password)
             
             # Click en siguiente
             password_next = self.driver.find_element(By.ID, "passwordNext")
             password_next.click()
             
-            # Esperar a que se complete el login
-            time.sleep(5)
+            # Esperar a que Google redirija fuera del login con la sesión iniciada
+            self.wait_for('login', lambda driver: self.is_logged_in())
             self.logger.info("Login completado exitosamente")
+            
+            if self.session_store:
+                self.session_store.save(self.driver)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error durante el login: {str(e)}")
+            self.logger.error("Error durante el login: %s", e)
+            return False
+            
+    def open_cached_place(self, place_name):
+        """Abrir directamente la ficha del lugar si su URL está en caché"""
+        if not self.place_cache:
+            return False
+            
+        place_url = self.place_cache.get(place_name)
+        if not place_url:
             return False
             
+        try:
+            self.logger.info("Lugar en caché, abriendo ficha: %s", place_name)
+            self.driver.get(place_url)
+            self.wait_for('place', EC.presence_of_element_located(PLACE_HEADING))
+            self.wait_for('place', dom_settled())
+            return True
+        except Exception as e:
+            self.logger.warning("La URL en caché no funcionó, se busca de nuevo: %s", e)
+            self.place_cache.invalidate(place_name)
+            return False
+            
+    @timed_step('search')
+    @traced_step('search')
     def search_place(self, place_name):
         """Buscar un lugar en Google Maps"""
+        if self.open_cached_place(place_name):
+            return True
+            
         try:
-            self.logger.info(f"Buscando lugar: {place_name}")
+            self.logger.info("Buscando lugar: %s", place_name)
             self.driver.get("https://www.google.com/maps")
             
             # Esperar y llenar la búsqueda
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "searchboxinput"))
-            )
+            search_box = self.wait_for('search', EC.element_to_be_clickable((By.ID, "searchboxinput")))
             search_box.clear()
             search_box.send_keys(place_name)
             
             # Presionar Enter
             search_box.send_keys("\n")
             
-            # Esperar a que carguen los resultados
-            time.sleep(3)
+            # Esperar la lista de resultados o, si hay una sola coincidencia, la ficha del lugar
+            self.wait_for('search', EC.any_of(
+                EC.element_to_be_clickable(FIRST_RESULT),
+                EC.presence_of_element_located(PLACE_HEADING)
+            ))
             
             # Hacer click en el primer resultado
-            first_result = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-result-index='0']"))
-            )
-            first_result.click()
-            
-            time.sleep(3)
+            results = self.driver.find_elements(*FIRST_RESULT)
+            if results:
+                self.wait_for('search', element_stable(FIRST_RESULT)).click()
+                
+            self.wait_for('place', EC.presence_of_element_located(PLACE_HEADING))
+            self.wait_for('place', dom_settled())
             self.logger.info("Lugar encontrado y seleccionado")
+            
+            if self.place_cache and PLACE_URL_MARKER in self.driver.current_url:
+                self.place_cache.put(place_name, self.driver.current_url)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error buscando lugar: {str(e)}")
+            self.logger.error("Error buscando lugar: %s", e)
             return False
             
+    @timed_step('review')
+    @traced_step('review')
     def submit_review(self, rating, text, photos=None):
         """Enviar una reseña al lugar actual"""
         try:
             self.logger.info("Iniciando proceso de envío de reseña...")
             
             # Buscar y hacer click en el botón de reseñas
-            reviews_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label*='reseña'], button[aria-label*='review']"))
-            )
-            reviews_button.click()
-            
-            time.sleep(2)
+            self.wait_for('review', element_stable(REVIEWS_BUTTON)).click()
             
-            # Buscar y hacer click en "Escribir reseña"
-            write_review_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label*='Escribir reseña'], button[aria-label*='Write a review']"))
-            )
-            write_review_button.click()
-            
-            time.sleep(2)
+            # Buscar y hacer click en "Escribir reseña" cuando el panel deje de animarse
+            self.wait_for('review', element_stable(WRITE_REVIEW_BUTTON)).click()
             
             # Seleccionar rating (1-5 estrellas)
             rating_selector = f"button[aria-label*='{rating} estrella'], button[aria-label*='{rating} star']"
-            rating_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, rating_selector))
-            )
-            rating_button.click()
+            self.wait_for('review', element_stable((By.CSS_SELECTOR, rating_selector))).click()
             
             # Escribir texto de la reseña
-            review_text_area = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "textarea[aria-label*='reseña'], textarea[aria-label*='review']"))
-            )
+            review_text_area = self.wait_for('review', EC.element_to_be_clickable(REVIEW_TEXTAREA))
             review_text_area.clear()
             review_text_area.send_keys(text)
             
             # Subir fotos si las hay
             if photos:
-                for photo_path in photos:
-                    if os.path.exists(photo_path):
-                        file_input = self.driver.find_element(By.CSS_SELECTOR, "input[type='file']")
-                        file_input.send_keys(photo_path)
-                        time.sleep(2)
+                self.upload_photos(photos)
             
             # Enviar la reseña
-            submit_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label*='Enviar'], button[aria-label*='Submit']"))
-            )
-            submit_button.click()
+            self.wait_for('submit', element_stable(SUBMIT_BUTTON)).click()
             
-            time.sleep(3)
+            # La reseña se envió cuando se cierra el formulario y termina la petición
+            self.wait_for('submit', EC.invisibility_of_element_located(REVIEW_TEXTAREA))
+            self.wait_for('submit', network_idle())
             self.logger.info("Reseña enviada exitosamente")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error enviando reseña: {str(e)}")
+            self.logger.error("Error enviando reseña: %s", e)
             return False
             
+    @timed_step('photo_upload')
+    @traced_step('photo_upload')
+    def upload_photos(self, photos):
+        """Subir las fotos y esperar a que termine cada miniatura.
+
+        Si el input acepta varios archivos se envían todos en un único
+        ``send_keys`` (rutas separadas por saltos de línea); si no, de a uno.
+        Devuelve los segundos que tardó cada foto desde el inicio de la subida.
+        """
+        paths = [os.path.abspath(path) for path in photos if os.path.exists(path)]
+        if not paths:
+            return []
+
+        file_input = self.wait_for('photos', EC.presence_of_element_located(PHOTO_INPUT))
+        baseline = len(self.driver.find_elements(*PHOTO_THUMBNAIL))
+        condition = uploads_complete(PHOTO_THUMBNAIL, PHOTO_UPLOAD_PENDING, len(paths), baseline)
+
+        if file_input.get_attribute('multiple'):
+            file_input.send_keys("\n".join(paths))
+            self.wait_for('photos', condition)
+        else:
+            for index, path in enumerate(paths, start=1):
+                # El input se vuelve a crear tras cada subida
+                self.wait_for('photos', EC.presence_of_element_located(PHOTO_INPUT)).send_keys(path)
+                condition.expected = index
+                self.wait_for('photos', condition)
+
+        timings = [round(seconds, 2) for seconds in condition.completed_at]
+        self.logger.info("Fotos subidas: %s, segundos por foto: %s", len(paths), timings)
+        return timings
+            
     def close(self):
         """Cerrar el navegador"""
         if self.driver:
             self.driver.quit()
             
-    def process_feedback(self, place_name, rating, text, photos=None):
-        """Proceso completo de feedback"""
+    def process_feedback(self, place_name, rating, text, photos=None, trace=None):
+        """Proceso completo de feedback.
+
+        Con ``trace`` (ver ``TraceStore.start_trace``) se registran los pasos,
+        las esperas y, si algo falla, una captura de la página.
+        """
+        self.trace = self.waiter.trace = trace
+        try:
+            if self.driver_pool:
+                return self.process_feedback_pooled(place_name, rating, text, photos)
+                
+            try:
+                self.setup_driver()
+                
+                if not self.login_to_google():
+                    return False, "Error en el login de Google"
+                    
+                return self.run_review_steps(place_name, rating, text, photos)
+                
+            except Exception as e:
+                return False, f"Error general: {str(e)}"
+            finally:
+                self.close()
+        finally:
+            self.trace = self.waiter.trace = None
+            
+    def process_feedback_pooled(self, place_name, rating, text, photos=None):
+        """Proceso de feedback usando un driver ya autenticado del pool"""
         try:
-            self.setup_driver()
+            with self.driver_pool.lease() as pooled:
+                self.driver = pooled.driver
+                success, message = self.run_review_steps(place_name, rating, text, photos)
+                if not success:
+                    # Puede haber quedado a mitad de un diálogo o roto: no vuelve al pool
+                    pooled.discard = True
+                return success, message
+        except Exception as e:
+            return False, f"Error general: {str(e)}"
+        finally:
+            # El driver pertenece al pool: no se cierra aquí
+            self.driver = None
             
-            if not self.login_to_google():
-                return False, "Error en el login de Google"
-                
+    def run_review_steps(self, place_name, rating, text, photos=None):
+        """Buscar el lugar y enviar la reseña con el driver actual"""
+        try:
             if not self.search_place(place_name):
                 return False, "Error buscando el lugar"
                 
@@ -185,8 +347,6 @@ class GoogleMapsAutomation:
                 return False, "Error enviando la reseña"
                 
             return True, "Reseña enviada exitosamente"
-            
-        except Exception as e:
-            return False, f"Error general: {str(e)}"
         finally:
-            self.close() 
\ No newline at end of file
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Tiempo de espera por paso: %s", self.waiter.summary())
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_place_name(place_name):
+    """Normalizar el nombre de un lugar para usarlo como clave de caché.
+
+    Ignora mayúsculas, acentos, signos de puntuación y espacios repetidos, de
+    modo que "Café  XYZ!" y "cafe xyz" resuelven al mismo lugar.
+    """
+    decomposed = unicodedata.normalize('NFKD', place_name)
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = re.sub(r'[^\w\s]', ' ', without_accents.lower())
+    return ' '.join(cleaned.split())
+
+
+class PlaceCache:
+    """Caché LRU con TTL de nombre de lugar -> URL de la ficha en Google Maps.
+
+    Se persiste como JSON en ``path`` para sobrevivir reinicios. Es seguro
+    usarla desde varios hilos.
+    """
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, max_entries=1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = OrderedDict()  # clave -> (url, guardado_en)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    def load(self):
+        """Cargar las entradas vigentes desde disco"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            self.logger.warning("No se pudo leer la caché de lugares: %s", e)
+            return
+
+        now = time.time()
+        with self._lock:
+            # El archivo se guarda del menos al más reciente
+            for key, (url, saved_at) in entries:
+                if now - saved_at < self.ttl:
+                    self._entries[key] = (url, saved_at)
+            self._evict()
+
+    def _persist(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # Un temporal propio por escritura para que dos procesos con la misma
+        # caché no se pisen; si algo falla no queda basura junto al archivo
+        tmp_file = tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False
+        )
+        try:
+            with tmp_file:
+                json.dump([[key, list(value)] for key, value in self._entries.items()], tmp_file)
+            os.replace(tmp_file.name, self.path)
+        except Exception:
+            os.remove(tmp_file.name)
+            raise
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, place_name):
+        """URL guardada para el lugar, o None si no está o expiró"""
+        key = normalize_place_name(place_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, place_name, url):
+        """Guardar la URL resuelta para un lugar"""
+        key = normalize_place_name(place_name)
+        with self._lock:
+            self._entries[key] = (url, time.time())
+            self._entries.move_to_end(key)
+            self._evict()
+            try:
+                self._persist()
+            except OSError as e:
+                self.logger.warning("No se pudo guardar la caché de lugares: %s", e)
+
+    def invalidate(self, place_name):
+        """Eliminar un lugar (p. ej. si la URL guardada dejó de funcionar)"""
+        key = normalize_place_name(place_name)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                try:
+                    self._persist()
+                except OSError as e:
+                    self.logger.warning("No se pudo guardar la caché de lugares: %s", e)
+
+    def stats(self):
+        """Tamaño y tasa de aciertos de la caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# Campos aceptados por Network.setCookies del protocolo DevTools
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'expires', 'httpOnly', 'secure', 'sameSite', 'priority')
+
+# Restaura el localStorage guardado para el origen de cada documento nuevo
+LOCAL_STORAGE_SCRIPT = """
+(function (saved) {
+    var items = saved[window.location.origin];
+    if (!items) { return; }
+    for (var key in items) {
+        if (window.localStorage.getItem(key) === null) {
+            window.localStorage.setItem(key, items[key]);
+        }
+    }
+})(%s);
+"""
+
+
+class GoogleSessionStore:
+    """Persistencia cifrada de la sesión de Google (cookies y localStorage).
+
+    El estado se guarda en un archivo por cuenta, cifrado con Fernet usando
+    una clave derivada de ``Config.GOOGLE_SESSION_KEY`` con PBKDF2 y una sal
+    aleatoria guardada junto al archivo (``<archivo>.salt``).
+    """
+
+    KDF_ITERATIONS = 480000
+
+    def __init__(self, path, key):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.fernet = Fernet(self.derive_key(key, self.load_salt()))
+
+    @classmethod
+    def derive_key(cls, secret, salt):
+        """Convertir cualquier secreto en una clave Fernet válida"""
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=cls.KDF_ITERATIONS)
+        return base64.urlsafe_b64encode(kdf.derive(secret.encode('utf-8')))
+
+    def load_salt(self):
+        """Sal de la clave, creándola la primera vez (una sola aunque arranquen varios procesos)"""
+        salt_path = f"{self.path}.salt"
+        try:
+            with open(salt_path, 'rb') as salt_file:
+                return salt_file.read()
+        except FileNotFoundError:
+            pass
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as tmp_file:
+            tmp_file.write(os.urandom(16))
+        try:
+            # link falla si otro proceso ya creó la sal: entonces se usa la suya
+            os.link(tmp_file.name, salt_path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_file.name)
+        with open(salt_path, 'rb') as salt_file:
+            return salt_file.read()
+
+    @classmethod
+    def for_account(cls, directory, email, key):
+        """Almacén para una cuenta de Google concreta"""
+        account_id = hashlib.sha256(email.lower().encode('utf-8')).hexdigest()[:16]
+        return cls(os.path.join(directory, f"{account_id}.session"), key)
+
+    def load(self):
+        """Leer el estado guardado (None si no existe o no se puede descifrar)"""
+        try:
+            with open(self.path, 'rb') as session_file:
+                return json.loads(self.fernet.decrypt(session_file.read()))
+        except FileNotFoundError:
+            return None
+        except (InvalidToken, ValueError) as e:
+            self.logger.warning("Sesión guardada inválida, se descarta: %s", e)
+            self.clear()
+            return None
+
+    def save(self, driver):
+        """Guardar cookies y localStorage del driver tras un login exitoso"""
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            origin, items = driver.execute_script(
+                "return [window.location.origin, Object.assign({}, window.localStorage)];"
+            )
+
+            previous = self.load() or {}
+            local_storage = previous.get('local_storage', {})
+            local_storage[origin] = items
+
+            state = {
+                'saved_at': time.time(),
+                'cookies': cookies,
+                'local_storage': local_storage
+            }
+
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            # Un temporal propio por escritura (creado con permisos 0600) para
+            # que dos procesos guardando a la vez no se pisen
+            token = self.fernet.encrypt(json.dumps(state).encode('utf-8'))
+            with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as session_file:
+                session_file.write(token)
+            try:
+                os.replace(session_file.name, self.path)
+            except OSError:
+                os.remove(session_file.name)
+                raise
+
+            self.logger.info("Sesión de Google guardada (%s cookies)", len(cookies))
+            return True
+
+        except Exception as e:
+            self.logger.error("Error guardando la sesión de Google: %s", e)
+            return False
+
+    def restore(self, driver):
+        """Cargar el estado guardado en el driver (sin navegar)"""
+        state = self.load()
+        if not state:
+            return False
+
+        try:
+            now = time.time()
+            cookies = []
+            for cookie in state['cookies']:
+                if not cookie.get('session') and 0 < cookie.get('expires', 0) < now:
+                    continue
+                params = {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+                if cookie.get('session'):
+                    params.pop('expires', None)
+                cookies.append(params)
+
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': LOCAL_STORAGE_SCRIPT % json.dumps(state.get('local_storage', {}))
+            })
+            return True
+
+        except Exception as e:
+            self.logger.error("Error restaurando la sesión de Google: %s", e)
+            return False
+
+    def clear(self):
+        """Eliminar la sesión guardada (p. ej. cuando expiró)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
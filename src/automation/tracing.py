@@ -0,0 +1,370 @@
+import functools
+import gzip
+import inspect
+import io
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from PIL import Image
+from ..utils.database import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+
+def describe_condition(condition):
+    """Nombre legible de una condición de espera, con su selector si lo tiene.
+
+    Sirve para las clases de ``waits`` (atributo ``locator``) y para las
+    funciones de ``expected_conditions``, que guardan el selector en el closure.
+    """
+    if inspect.isfunction(condition):
+        name = condition.__qualname__.split('.<locals>')[0]
+        closure = inspect.getclosurevars(condition).nonlocals
+        locator = closure.get('locator', closure.get('mark'))
+    else:
+        name = type(condition).__name__
+        locator = getattr(condition, 'locator', None)
+    if isinstance(locator, tuple) and len(locator) == 2:
+        return f"{name}({locator[1]})"
+    return name
+
+
+def compress_screenshot(png, max_dimension=1280, quality=60):
+    """Recodificar la captura PNG como JPEG reducido"""
+    with Image.open(io.BytesIO(png)) as image:
+        image = image.convert('RGB')
+        image.thumbnail((max_dimension, max_dimension))
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=quality, optimize=True)
+        return output.getvalue()
+
+
+def capture_snapshot(driver, max_dimension=1280, quality=60):
+    """Captura de pantalla (JPEG) y DOM (HTML comprimido con gzip) de la página actual.
+
+    Devuelve ``{tipo: (content_type, encoding, datos)}``; lo que no se pudo
+    capturar (navegador caído, página cerrada) se omite.
+    """
+    snapshots = {}
+    try:
+        screenshot = compress_screenshot(driver.get_screenshot_as_png(), max_dimension, quality)
+        snapshots['screenshot'] = ('image/jpeg', None, screenshot)
+    except Exception as e:
+        logger.warning("No se pudo capturar la pantalla: %s", e)
+    try:
+        dom = gzip.compress(driver.page_source.encode('utf-8'))
+        snapshots['dom'] = ('text/html; charset=utf-8', 'gzip', dom)
+    except Exception as e:
+        logger.warning("No se pudo capturar el DOM: %s", e)
+    return snapshots
+
+
+def _elapsed_ms(since):
+    return round((time.monotonic() - since) * 1000, 1)
+
+
+class Trace:
+    """Línea de tiempo de un intento de envío.
+
+    Registra cada paso de ``GoogleMapsAutomation`` como un span (inicio y
+    duración relativos al comienzo del intento, resultado y span padre) y
+    cada espera de ``Waiter`` con su condición, duración, cantidad de sondeos
+    y si agotó el tiempo. En el primer paso que falla guarda una captura de
+    la página (ver ``capture_failure``).
+    """
+
+    def __init__(self, job_id=None, attempt=None, account=None, capture_snapshots=True,
+                 screenshot_max_dimension=1280, screenshot_quality=60):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.job_id = job_id
+        self.attempt = attempt
+        self.account = account
+        self.capture_snapshots = capture_snapshots
+        self.screenshot_max_dimension = screenshot_max_dimension
+        self.screenshot_quality = screenshot_quality
+        self.started_at = time.time()
+        self.status = 'running'
+        self.error = None
+        self.failed_step = None
+        self.duration_ms = None
+        self.spans = []
+        self.waits = []
+        self.snapshots = {}
+        self._started = time.monotonic()
+        self._open = []  # Índices de los spans en curso (el último es el actual)
+
+    @contextmanager
+    def span(self, name):
+        """Registrar un paso; el span queda como padre de los que se abran dentro"""
+        span = {
+            'name': name,
+            'parent': self._open[-1] if self._open else None,
+            'start_ms': _elapsed_ms(self._started),
+            'duration_ms': None,
+            'outcome': 'ok',
+        }
+        self.spans.append(span)
+        self._open.append(len(self.spans) - 1)
+        started = time.monotonic()
+        try:
+            yield span
+        except Exception as e:
+            span['outcome'] = 'error'
+            span['error'] = str(e)[:500]
+            raise
+        finally:
+            span['duration_ms'] = _elapsed_ms(started)
+            self._open.pop()
+
+    def record_wait(self, step, condition, seconds, polls, timed_out):
+        """Registrar una espera de ``Waiter`` dentro del span actual"""
+        self.waits.append({
+            'span': self._open[-1] if self._open else None,
+            'step': step,
+            'condition': describe_condition(condition),
+            'start_ms': round(_elapsed_ms(self._started) - seconds * 1000, 1),
+            'duration_ms': round(seconds * 1000, 1),
+            'polls': polls,
+            'timed_out': timed_out,
+        })
+
+    def capture_failure(self, step, driver):
+        """Marcar el paso que falló primero y capturar la página en ese momento"""
+        if self.failed_step is not None:
+            return
+        self.failed_step = step
+        if self.capture_snapshots and driver is not None:
+            self.snapshots = capture_snapshot(driver, self.screenshot_max_dimension, self.screenshot_quality)
+
+    def finish(self, success, message=None):
+        """Cerrar la traza con el resultado del intento"""
+        self.status = 'ok' if success else 'error'
+        self.error = None if success else message
+        self.duration_ms = _elapsed_ms(self._started)
+        return self
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'job_id': self.job_id,
+            'attempt': self.attempt,
+            'account': self.account,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'error': self.error,
+            'failed_step': self.failed_step,
+            'spans': self.spans,
+            'waits': self.waits,
+            'snapshots': sorted(self.snapshots),
+        }
+
+
+def traced_step(step):
+    """Registrar un método de ``GoogleMapsAutomation`` como span de ``self.trace``.
+
+    Igual que ``timed_step``, el paso falla si lanza una excepción o devuelve
+    ``False``; en ese caso se captura la página antes de que cambie.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            trace = self.trace
+            if trace is None:
+                return function(self, *args, **kwargs)
+            with trace.span(step) as span:
+                try:
+                    result = function(self, *args, **kwargs)
+                except Exception:
+                    trace.capture_failure(step, self.driver)
+                    raise
+                if result is False:
+                    span['outcome'] = 'error'
+                    trace.capture_failure(step, self.driver)
+                return result
+        return wrapper
+    return decorator
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TraceStore:
+    """Trazas de los últimos envíos en SQLite, compartidas entre procesos.
+
+    Guarda como máximo ``max_traces`` trazas y las capturas de las últimas
+    ``max_snapshots`` que fallaron; lo más viejo se elimina al guardar.
+    """
+
+    def __init__(self, db_path, max_traces=500, max_snapshots=50, screenshot_max_dimension=1280,
+                 screenshot_quality=60):
+        self.max_traces = max_traces
+        self.max_snapshots = max_snapshots
+        self.screenshot_max_dimension = screenshot_max_dimension
+        self.screenshot_quality = screenshot_quality
+        self.db = SQLiteDatabase(db_path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS traces (
+                trace_id TEXT PRIMARY KEY,
+                job_id TEXT,
+                attempt INTEGER,
+                account TEXT,
+                status TEXT NOT NULL,
+                failed_step TEXT,
+                started_at REAL NOT NULL,
+                duration_ms REAL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_traces_started ON traces (started_at);
+            CREATE INDEX IF NOT EXISTS idx_traces_job ON traces (job_id);
+            CREATE TABLE IF NOT EXISTS trace_snapshots (
+                trace_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                content_type TEXT NOT NULL,
+                encoding TEXT,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (trace_id, kind)
+            );
+            CREATE INDEX IF NOT EXISTS idx_trace_snapshots_created ON trace_snapshots (created_at);
+        """)
+
+    def start_trace(self, job_id=None, attempt=None, account=None):
+        """Crear la traza de un intento de envío"""
+        return Trace(
+            job_id, attempt, account,
+            capture_snapshots=self.max_snapshots > 0,
+            screenshot_max_dimension=self.screenshot_max_dimension,
+            screenshot_quality=self.screenshot_quality
+        )
+
+    def save(self, trace):
+        """Guardar una traza terminada; los errores se registran sin interrumpir el envío"""
+        try:
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO traces (trace_id, job_id, attempt, account, status, failed_step, "
+                    "started_at, duration_ms, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (trace.trace_id, trace.job_id, trace.attempt, trace.account, trace.status,
+                     trace.failed_step, trace.started_at, trace.duration_ms, json.dumps(trace.to_dict()))
+                )
+                for kind, (content_type, encoding, data) in trace.snapshots.items():
+                    conn.execute(
+                        "INSERT OR REPLACE INTO trace_snapshots (trace_id, kind, content_type, encoding, data, "
+                        "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (trace.trace_id, kind, content_type, encoding, data, trace.started_at)
+                    )
+                self._prune(conn)
+        except Exception as e:
+            logger.warning("No se pudo guardar la traza %s: %s", trace.trace_id, e)
+
+    def _prune(self, conn):
+        conn.execute(
+            "DELETE FROM traces WHERE trace_id IN "
+            "(SELECT trace_id FROM traces ORDER BY started_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_traces,)
+        )
+        conn.execute(
+            "DELETE FROM trace_snapshots WHERE trace_id NOT IN (SELECT trace_id FROM traces) "
+            "OR trace_id IN (SELECT trace_id FROM trace_snapshots GROUP BY trace_id "
+            "ORDER BY MAX(created_at) DESC LIMIT -1 OFFSET ?)",
+            (self.max_snapshots,)
+        )
+
+    def recent(self, limit=50, status=None, job_id=None):
+        """Resumen de las trazas más recientes, opcionalmente filtradas"""
+        query = "SELECT trace_id, job_id, attempt, account, status, failed_step, started_at, duration_ms FROM traces"
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if job_id:
+            conditions.append("job_id = ?")
+            params.append(job_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.db.execute(query, params).fetchall()]
+
+    def get(self, trace_id):
+        """Traza completa (spans y esperas), o None si no existe"""
+        row = self.db.execute("SELECT data FROM traces WHERE trace_id = ?", (trace_id,)).fetchone()
+        if row is None:
+            return None
+        trace = json.loads(row['data'])
+        # Las capturas pueden haberse eliminado antes que la traza
+        trace['snapshots'] = [
+            snapshot['kind'] for snapshot in self.db.execute(
+                "SELECT kind FROM trace_snapshots WHERE trace_id = ? ORDER BY kind", (trace_id,)
+            ).fetchall()
+        ]
+        return trace
+
+    def get_snapshot(self, trace_id, kind):
+        """``(content_type, encoding, datos)`` de una captura, o None"""
+        row = self.db.execute(
+            "SELECT content_type, encoding, data FROM trace_snapshots WHERE trace_id = ? AND kind = ?",
+            (trace_id, kind)
+        ).fetchone()
+        return (row['content_type'], row['encoding'], bytes(row['data'])) if row else None
+
+    def summary(self, limit=200):
+        """Duración por paso y por espera en las últimas ``limit`` trazas.
+
+        Permite ver qué paso domina la latencia (``share`` es la fracción del
+        tiempo total de los intentos; un paso anidado, como ``photo_upload``,
+        también cuenta en su padre) y qué esperas agotan el tiempo.
+        """
+        rows = self.db.execute(
+            "SELECT data FROM traces ORDER BY started_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        steps, waits, total_ms = {}, {}, 0.0
+        for row in rows:
+            trace = json.loads(row['data'])
+            total_ms += trace['duration_ms'] or 0.0
+            for span in trace['spans']:
+                entry = steps.setdefault(span['name'], {'durations': [], 'errors': 0})
+                entry['durations'].append(span['duration_ms'] or 0.0)
+                entry['errors'] += span['outcome'] == 'error'
+            for wait in trace['waits']:
+                key = f"{wait['step']}: {wait['condition']}"
+                entry = waits.setdefault(key, {'durations': [], 'polls': 0, 'timeouts': 0})
+                entry['durations'].append(wait['duration_ms'])
+                entry['polls'] += wait['polls']
+                entry['timeouts'] += wait['timed_out']
+
+        def describe(durations):
+            return {
+                'count': len(durations),
+                'avg_ms': round(sum(durations) / len(durations), 1),
+                'p50_ms': _percentile(durations, 0.5),
+                'p95_ms': _percentile(durations, 0.95),
+                'max_ms': max(durations),
+                'share': round(sum(durations) / total_ms, 3) if total_ms else 0.0,
+            }
+
+        return {
+            'traces': len(rows),
+            'steps': {
+                name: dict(describe(entry['durations']), errors=entry['errors'])
+                for name, entry in steps.items()
+            },
+            'waits': {
+                key: dict(describe(entry['durations']), timeouts=entry['timeouts'],
+                          avg_polls=round(entry['polls'] / len(entry['durations']), 1))
+                for key, entry in waits.items()
+            },
+        }
+
+    def stats(self):
+        """Cantidad de trazas guardadas y de intentos fallidos entre ellas"""
+        row = self.db.execute(
+            "SELECT COUNT(*) AS traces, COALESCE(SUM(status = 'error'), 0) AS failed FROM traces"
+        ).fetchone()
+        snapshots = self.db.execute("SELECT COUNT(DISTINCT trace_id) FROM trace_snapshots").fetchone()[0]
+        return {'traces': row['traces'], 'failed': row['failed'], 'with_snapshots': snapshots}
@@ -0,0 +1,198 @@
+import json
+import logging
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+# Tiempos máximos (segundos) por paso si Config no indica otros
+DEFAULT_TIMEOUTS = {
+    'default': 10,
+    'login': 20,
+    'search': 15,
+    'place': 15,
+    'review': 10,
+    'photos': 60,
+    'submit': 15,
+}
+
+# Registra la hora de la última mutación del DOM; se instala una vez por documento
+DOM_SETTLED_SCRIPT = """
+if (!window.__feedbackMutationObserver) {
+    window.__feedbackLastMutation = performance.now();
+    window.__feedbackMutationObserver = new MutationObserver(function () {
+        window.__feedbackLastMutation = performance.now();
+    });
+    window.__feedbackMutationObserver.observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    return null;
+}
+return performance.now() - window.__feedbackLastMutation;
+"""
+
+
+class dom_settled:
+    """Condición: el DOM no tuvo mutaciones durante ``quiet_ms`` milisegundos"""
+
+    def __init__(self, quiet_ms=300):
+        self.quiet_ms = quiet_ms
+
+    def __call__(self, driver):
+        if driver.execute_script("return document.readyState") != 'complete':
+            return False
+        elapsed = driver.execute_script(DOM_SETTLED_SCRIPT)
+        return elapsed is not None and elapsed >= self.quiet_ms
+
+
+class network_idle:
+    """Condición: sin peticiones de red en curso durante ``idle_ms`` milisegundos.
+
+    Lee el log de rendimiento de Chrome (``goog:loggingPrefs``). Las peticiones
+    abiertas más de ``long_poll_s`` segundos se consideran conexiones
+    persistentes (long polling) y no bloquean la espera. Si el log no está
+    disponible se usa ``document.readyState`` como aproximación.
+    """
+
+    IGNORED_TYPES = ('WebSocket', 'EventSource', 'Ping')
+
+    def __init__(self, idle_ms=500, long_poll_s=5.0):
+        self.idle_ms = idle_ms
+        self.long_poll_s = long_poll_s
+        self.in_flight = {}
+        self.last_activity = time.monotonic()
+
+    def _consume_log(self, driver):
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method = message.get('method', '')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                if params.get('type') not in self.IGNORED_TYPES:
+                    self.in_flight[request_id] = time.monotonic()
+                    self.last_activity = time.monotonic()
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                if self.in_flight.pop(request_id, None) is not None:
+                    self.last_activity = time.monotonic()
+
+    def __call__(self, driver):
+        try:
+            self._consume_log(driver)
+        except WebDriverException:
+            return driver.execute_script("return document.readyState") == 'complete'
+
+        now = time.monotonic()
+        pending = [started for started in self.in_flight.values() if now - started < self.long_poll_s]
+        return not pending and (now - self.last_activity) * 1000 >= self.idle_ms
+
+
+class element_stable:
+    """Condición: el elemento es visible, está habilitado y no se movió entre dos sondeos.
+
+    Evita hacer click en botones que todavía se están animando. Devuelve el
+    elemento cuando está estable.
+    """
+
+    def __init__(self, locator):
+        self.locator = locator
+        self.last_rect = None
+
+    def __call__(self, driver):
+        try:
+            elements = driver.find_elements(*self.locator)
+            if not elements:
+                self.last_rect = None
+                return False
+            element = elements[0]
+            if not (element.is_displayed() and element.is_enabled()):
+                return False
+            rect = element.rect
+        except StaleElementReferenceException:
+            self.last_rect = None
+            return False
+
+        stable = rect == self.last_rect
+        self.last_rect = rect
+        return element if stable else False
+
+
+class uploads_complete:
+    """Condición: hay ``expected`` miniaturas nuevas y ninguna sigue subiendo.
+
+    Cuenta las miniaturas (``thumbnail_locator``) a partir de ``baseline`` y
+    considera terminada cada una cuando ya no contiene un indicador de
+    progreso (``pending_locator``). En ``completed_at`` queda, por foto, el
+    tiempo desde el inicio de la subida hasta que se vio terminada.
+    """
+
+    def __init__(self, thumbnail_locator, pending_locator, expected, baseline=0):
+        self.thumbnail_locator = thumbnail_locator
+        self.pending_locator = pending_locator
+        self.expected = expected
+        self.baseline = baseline
+        self.started = time.monotonic()
+        self.completed_at = []
+
+    def __call__(self, driver):
+        try:
+            thumbnails = driver.find_elements(*self.thumbnail_locator)[self.baseline:]
+            done = sum(1 for thumbnail in thumbnails
+                       if not thumbnail.find_elements(*self.pending_locator))
+        except StaleElementReferenceException:
+            return False
+
+        elapsed = time.monotonic() - self.started
+        while len(self.completed_at) < min(done, self.expected):
+            self.completed_at.append(elapsed)
+        return done >= self.expected
+
+
+class Waiter:
+    """Esperas por condición con tiempo máximo por paso y registro del tiempo esperado.
+
+    Si ``trace`` tiene una traza (ver ``tracing.Trace``), cada espera se
+    registra en ella con su condición, duración y cantidad de sondeos.
+    """
+
+    def __init__(self, timeouts=None, poll_frequency=0.1):
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.poll_frequency = poll_frequency
+        self.timings = {}
+        self.trace = None
+        self.logger = logging.getLogger(__name__)
+
+    def timeout_for(self, step):
+        return self.timeouts.get(step, self.timeouts['default'])
+
+    def until(self, driver, step, condition, timeout=None):
+        """Esperar a que ``condition`` sea verdadera y devolver su resultado"""
+        timeout = timeout if timeout is not None else self.timeout_for(step)
+        polls = 0
+        timed_out = False
+
+        def poll(driver):
+            nonlocal polls
+            polls += 1
+            return condition(driver)
+
+        started = time.monotonic()
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(
+                poll, message=f"Tiempo agotado esperando el paso '{step}' ({timeout}s)"
+            )
+        except TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            seconds = time.monotonic() - started
+            self.record(step, seconds)
+            if self.trace is not None:
+                self.trace.record_wait(step, condition, seconds, polls, timed_out)
+
+    def record(self, step, seconds):
+        self.timings[step] = self.timings.get(step, 0.0) + seconds
+
+    def summary(self):
+        """Tiempos esperados por paso, redondeados a milisegundos"""
+        return {step: round(seconds, 3) for step, seconds in self.timings.items()}
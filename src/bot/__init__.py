@@ -3,5 +3,14 @@ Módulo del bot de WhatsApp
 """
 
 from .whatsapp_bot import WhatsAppBot
+from .async_bot import AsyncWhatsAppBot
+from .sessions import (
+    UserSession, SessionStore, InMemorySessionStore, SQLiteSessionStore, SessionSweeper, create_session_store
+)
+from .inbound import InboundMessageLog, InMemoryInboundLog, SQLiteInboundLog, create_inbound_log
 
-__all__ = ['WhatsAppBot'] 
\ No newline at end of file
+__all__ = [
+    'WhatsAppBot', 'AsyncWhatsAppBot', 'UserSession', 'SessionStore', 'InMemorySessionStore', 'SQLiteSessionStore',
+    'SessionSweeper', 'create_session_store', 'InboundMessageLog', 'InMemoryInboundLog', 'SQLiteInboundLog',
+    'create_inbound_log'
+] 
\ No newline at end of file
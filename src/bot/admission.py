@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from ..utils.rate_limit import TokenBucket
+
+
+class SenderRateLimiter:
+    """Token bucket por remitente.
+
+    Guarda como máximo ``max_senders`` buckets (se descartan los usados hace
+    más tiempo), así una avalancha de números distintos no agota la memoria.
+    """
+
+    def __init__(self, rate_per_minute=30, burst=20, max_senders=10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_senders = max_senders
+        self.rejected = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, sender):
+        """Consumir un token del remitente; False si superó su límite"""
+        with self._lock:
+            bucket = self._buckets.get(sender)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[sender] = bucket
+                while len(self._buckets) > self.max_senders:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(sender)
+
+        if bucket.try_acquire():
+            return True
+        with self._lock:
+            self.rejected += 1
+        return False
+
+    def stats(self):
+        with self._lock:
+            return {'tracked_senders': len(self._buckets), 'rejected': self.rejected}
+
+
+class AdmissionController:
+    """Límite global de mensajes en proceso y en espera.
+
+    Como máximo ``max_concurrent`` mensajes se procesan a la vez; los demás
+    esperan hasta ``wait_timeout`` segundos. Si ya hay ``max_waiting``
+    esperando, el mensaje se rechaza sin esperar.
+    """
+
+    def __init__(self, max_concurrent=32, max_waiting=64, wait_timeout=5.0):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def acquire(self):
+        """Reservar un lugar para procesar un mensaje; False si se rechaza"""
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.in_flight += 1
+                self.admitted += 1
+            return True
+
+        with self._lock:
+            if self.waiting >= self.max_waiting:
+                self.rejected_queue_full += 1
+                return False
+            self.waiting += 1
+
+        admitted = self._slots.acquire(timeout=self.wait_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if admitted:
+                self.in_flight += 1
+                self.admitted += 1
+            else:
+                self.rejected_timeout += 1
+        return admitted
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_timeout': self.rejected_timeout
+            }
+
+
+class AsyncAdmissionController(AdmissionController):
+    """``AdmissionController`` para asyncio: los mensajes esperan sin ocupar un hilo.
+
+    ``acquire`` es una corrutina y debe usarse siempre desde el mismo event
+    loop; ``stats`` se puede leer desde cualquier hilo.
+    """
+
+    def __init__(self, max_concurrent=1000, max_waiting=5000, wait_timeout=5.0):
+        super().__init__(max_concurrent, max_waiting, wait_timeout)
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self):
+        """Reservar un lugar para procesar un mensaje; False si se rechaza"""
+        if not self._slots.locked():
+            await self._slots.acquire()
+            with self._lock:
+                self.in_flight += 1
+                self.admitted += 1
+            return True
+
+        with self._lock:
+            if self.waiting >= self.max_waiting:
+                self.rejected_queue_full += 1
+                return False
+            self.waiting += 1
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_timeout)
+            admitted = True
+        except asyncio.TimeoutError:
+            admitted = False
+        with self._lock:
+            self.waiting -= 1
+            if admitted:
+                self.in_flight += 1
+                self.admitted += 1
+            else:
+                self.rejected_timeout += 1
+        return admitted
@@ -0,0 +1,133 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from twilio.rest import Client
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from ..utils.locks import AsyncKeyedLock
+from ..utils.metrics import WEBHOOK_REQUEST_LATENCY
+from .admission import AsyncAdmissionController
+from .async_dispatcher import AsyncOutboundDispatcher
+from .whatsapp_bot import WhatsAppBot
+
+
+class AsyncWhatsAppBot:
+    """Adaptador asyncio del manejo de mensajes entrantes.
+
+    No es un camino asíncrono de punta a punta: reutiliza un ``WhatsAppBot``
+    y su manejador síncrono (sesiones, transiciones y cola de envíos sobre
+    SQLite), que corre completo en un pool de ``ASYNC_BLOCKING_WORKERS``
+    hilos. Lo que pasa a ser asíncrono es la espera: el turno por remitente y
+    el control de admisión son corrutinas, así miles de conversaciones pueden
+    esperar su turno sin un hilo por cada una, pero cada mensaje admitido
+    ocupa un hilo del pool mientras se procesa. Los mensajes salientes usan un
+    cliente HTTP asíncrono.
+
+    En el event loop solo se hacen comprobaciones en memoria: la lista de
+    autorizados se recarga desde el disco en una tarea de fondo que corre en
+    el pool (``refresh_allowlist``), nunca al consultarla.
+
+    Selenium ya corre fuera del webhook, en los workers de envío, limitados
+    por ``JOB_MAX_CONCURRENT``.
+    """
+
+    def __init__(self, bot=None):
+        self.bot = bot or WhatsAppBot()
+        config = self.bot.config
+        self.config = config
+        self.logger = self.bot.logger
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.ASYNC_BLOCKING_WORKERS, thread_name_prefix="async-bot"
+        )
+        self.sender_locks = AsyncKeyedLock()
+        self.admission = AsyncAdmissionController(
+            max_concurrent=config.ASYNC_MAX_CONCURRENT,
+            max_waiting=config.ASYNC_MAX_WAITING,
+            wait_timeout=config.WEBHOOK_WAIT_TIMEOUT
+        )
+        # Los avisos de los workers de envío salen por el event loop
+        self.bot.dispatcher = AsyncOutboundDispatcher(
+            self.create_twilio_client,
+            config.TWILIO_WHATSAPP_NUMBER,
+            max_concurrent=config.ASYNC_OUTBOUND_CONCURRENCY,
+            rate_per_second=config.OUTBOUND_RATE_PER_SECOND,
+            burst=config.OUTBOUND_BURST,
+            max_attempts=config.OUTBOUND_MAX_ATTEMPTS,
+            max_queue=config.OUTBOUND_MAX_QUEUE
+        )
+        self.bot.metrics_reporter.collect = self.get_stats
+        # El archivo de autorizados no se lee al filtrar cada mensaje en el event loop
+        self.bot.allowlist.reload_on_lookup = False
+        self._allowlist_task = None
+
+    def create_twilio_client(self):
+        """Cliente de Twilio con una sesión aiohttp (pool de conexiones); se crea en el event loop"""
+        return Client(
+            self.config.TWILIO_ACCOUNT_SID,
+            self.config.TWILIO_AUTH_TOKEN,
+            http_client=AsyncTwilioHttpClient(pool_connections=True, timeout=self.config.TWILIO_HTTP_TIMEOUT)
+        )
+
+    async def startup(self):
+        """Arrancar los workers del bot (llamar desde el event loop)"""
+        self.bot.start_workers()
+        if self.bot.allowlist.path:
+            self._allowlist_task = asyncio.create_task(self.refresh_allowlist())
+
+    async def shutdown(self, timeout=None):
+        """Terminar los envíos en curso y entregar los mensajes pendientes"""
+        if self._allowlist_task:
+            self._allowlist_task.cancel()
+            self._allowlist_task = None
+        await self.run_blocking(self.bot.stop_workers, timeout)
+        self.executor.shutdown(wait=False)
+
+    async def run_blocking(self, function, *args):
+        """Ejecutar una función bloqueante en el pool acotado"""
+        loop = asyncio.get_running_loop()
+        # Con el contexto actual, para que los registros conserven el request_id
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, function, *args))
+
+    async def refresh_allowlist(self):
+        """Recargar la lista de autorizados en el pool cada ``reload_interval`` segundos"""
+        allowlist = self.bot.allowlist
+        while True:
+            await asyncio.sleep(max(allowlist.reload_interval, 0.1))
+            try:
+                await self.run_blocking(allowlist.refresh)
+            except Exception as e:
+                self.logger.error("Error recargando la lista de números autorizados: %s", e)
+
+    async def handle_incoming_message(self, from_number, message_body, media_urls=None, message_sid=None):
+        """Manejar un mensaje entrante con las mismas reglas (y la misma métrica) que ``WhatsAppBot``"""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            rejection = self.bot.screen_sender(from_number)
+            if rejection is not None:
+                outcome = 'rejected'
+                return rejection
+            if not await self.admission.acquire():
+                outcome = 'rejected'
+                return self.bot.reject_overloaded(from_number)
+
+            try:
+                # El turno se espera aquí para no ocupar un hilo del pool esperando
+                async with self.sender_locks.hold(from_number):
+                    reply = await self.run_blocking(
+                        self.bot.handle_admitted_message, from_number, message_body, media_urls, message_sid
+                    )
+            finally:
+                self.admission.release()
+            outcome = 'processed'
+            return reply
+        finally:
+            WEBHOOK_REQUEST_LATENCY.labels(outcome).observe(time.perf_counter() - started)
+
+    def get_stats(self):
+        """Estadísticas del bot con la admisión asíncrona"""
+        stats = self.bot.get_stats()
+        stats['admission'] = self.admission.stats()
+        return stats
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from twilio.base.exceptions import TwilioRestException
+from ..utils.locks import AsyncKeyedLock
+from ..utils.metrics import TWILIO_SEND_ERRORS, TWILIO_SEND_LATENCY
+from .dispatcher import OutboundDispatcher, OutboundMessage
+
+
+class AsyncOutboundDispatcher(OutboundDispatcher):
+    """Envío de mensajes salientes sobre asyncio.
+
+    Tiene la interfaz de ``OutboundDispatcher`` (``submit`` se puede llamar
+    desde cualquier hilo, p. ej. los workers de envío), pero cada mensaje es
+    una tarea del event loop y todas comparten un cliente de Twilio con
+    cliente HTTP asíncrono (pool de conexiones de aiohttp): los mensajes en
+    espera no ocupan hilos. Los mensajes a un mismo destinatario salen en
+    orden y como máximo ``max_concurrent`` llamadas están en curso a la vez.
+
+    ``start`` debe llamarse desde el event loop; ``stop`` y ``drain``, desde
+    otro hilo.
+    """
+
+    def __init__(self, client_factory, from_number, max_concurrent=50, rate_per_second=1.0,
+                 burst=None, max_attempts=4, backoff_base=1.0, backoff_max=30.0, max_queue=10000):
+        super().__init__(client_factory, from_number, num_workers=1, rate_per_second=rate_per_second,
+                         burst=burst, max_attempts=max_attempts, backoff_base=backoff_base,
+                         backoff_max=backoff_max, max_queue=max_queue)
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.loop = None
+        self.client = None
+        self._recipient_locks = AsyncKeyedLock()
+        self._slots = None
+        self._tasks = set()
+        self._pending = 0
+
+    def start(self):
+        """Crear el cliente en el event loop actual"""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.client = self.client_factory()
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+
+    def stop(self, timeout=None):
+        """Esperar los envíos pendientes y cerrar el cliente HTTP"""
+        if self.loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self.aclose(timeout), self.loop)
+        future.result()
+        self.loop = None
+
+    def drain(self, timeout=None):
+        """Esperar a que se procesen los mensajes encolados"""
+        if self.loop is None:
+            return True
+        return asyncio.run_coroutine_threadsafe(self.wait_pending(timeout), self.loop).result()
+
+    async def wait_pending(self, timeout=None):
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        return not self._tasks
+
+    async def aclose(self, timeout=None):
+        await self.wait_pending(timeout)
+        if self.client is not None:
+            await self.client.http_client.close()
+            self.client = None
+
+    def submit(self, to_number, body):
+        """Encolar un mensaje; devuelve False si hay demasiados pendientes o no se arrancó"""
+        with self._stats_lock:
+            accepted = self.loop is not None and self._pending < self.max_queue
+            if accepted:
+                self._pending += 1
+            else:
+                self._dropped += 1
+        if not accepted:
+            self.logger.error("Cola de salida llena o detenida, mensaje a %s descartado", to_number)
+            return False
+
+        message = OutboundMessage(to_number, body)
+        if self._in_loop():
+            self._schedule(message)
+        else:
+            self.loop.call_soon_threadsafe(self._schedule, message)
+        return True
+
+    def _in_loop(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _schedule(self, message):
+        # Las tareas se crean en orden y toman el candado del destinatario en ese orden
+        task = self.loop.create_task(self._send(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, message):
+        try:
+            async with self._recipient_locks.hold(message.to_number):
+                async with self._slots:
+                    await self._deliver(message)
+        except Exception as e:
+            self.logger.error("Error inesperado enviando a %s: %s", message.to_number, e)
+        finally:
+            with self._stats_lock:
+                self._pending -= 1
+
+    async def _acquire_rate(self):
+        while not self.rate_limiter.try_acquire():
+            await asyncio.sleep(self.rate_limiter.wait_time())
+
+    async def _deliver(self, message):
+        while True:
+            await self._acquire_rate()
+            message.attempts += 1
+            try:
+                with TWILIO_SEND_LATENCY.time():
+                    await self.client.messages.create_async(
+                        from_=f'whatsapp:{self.from_number}',
+                        body=message.body,
+                        to=f'whatsapp:{message.to_number}'
+                    )
+            except Exception as e:
+                status = e.status if isinstance(e, TwilioRestException) else 'network'
+                TWILIO_SEND_ERRORS.labels(str(status)).inc()
+                if message.attempts < self.max_attempts and self._is_retryable(e):
+                    with self._stats_lock:
+                        self._retries += 1
+                    delay = self.backoff_delay(message.attempts)
+                    self.logger.warning("Error enviando mensaje a %s, reintento en %.1fs: %s", message.to_number, delay, e)
+                    await asyncio.sleep(delay)
+                    continue
+                with self._stats_lock:
+                    self._failed += 1
+                self.logger.error("Error enviando mensaje a %s: %s", message.to_number, e)
+                return False
+
+            latency = time.monotonic() - message.enqueued_at
+            with self._stats_lock:
+                self._sent += 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+            self.logger.info("Mensaje enviado a %s", message.to_number)
+            return True
+
+    def queue_depth(self):
+        return self._pending
@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+import time
+from ..utils.validators import validate_phone_number
+
+
+def normalize_numbers(numbers):
+    """Normalizar números con ``validate_phone_number`` descartando los inválidos"""
+    normalized = set()
+    for number in numbers:
+        number = number.strip()
+        if not number or number.startswith('#'):
+            continue
+        is_valid, result = validate_phone_number(number)
+        if is_valid:
+            normalized.add(result)
+        else:
+            logging.getLogger(__name__).warning("Número autorizado inválido ignorado: %s (%s)", number, result)
+    return frozenset(normalized)
+
+
+class Allowlist:
+    """Números autorizados a usar el bot.
+
+    Los números se normalizan una sola vez al cargarlos y se guardan en un
+    ``frozenset``, así que cada consulta cuesta lo mismo con diez o con
+    decenas de miles de números. Si se indica ``path`` (un número por línea,
+    se admiten comas y comentarios con ``#``), el archivo se vuelve a leer
+    cuando cambia su fecha de modificación, comprobándola como mucho cada
+    ``reload_interval`` segundos. Si el archivo desaparece, sus números dejan
+    de estar autorizados. Sin números ni archivo el bot queda abierto.
+
+    Con ``reload_on_lookup=False`` las consultas nunca tocan el disco y la
+    comprobación queda a cargo de quien llame a ``refresh()`` (p. ej. una
+    tarea de fondo fuera del event loop).
+    """
+
+    def __init__(self, numbers=(), path=None, reload_interval=5.0, reload_on_lookup=True):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.reload_on_lookup = reload_on_lookup
+        self.logger = logging.getLogger(__name__)
+        self.rejected = 0
+        self._stats_lock = threading.Lock()
+
+        self._static = normalize_numbers(numbers)
+        self._numbers = self._static
+        self._mtime = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+        if path:
+            self.reload()
+
+    @property
+    def restricted(self):
+        return bool(self._static) or bool(self.path)
+
+    def reload(self):
+        """Leer el archivo de números y reemplazar el conjunto de una vez"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as numbers_file:
+                lines = numbers_file.read().replace(',', '\n').splitlines()
+        except FileNotFoundError:
+            # Sin archivo no queda autorizado ningún número que venía de él. Solo se
+            # llega aquí al arrancar o cuando el archivo desaparece, así que se registra una vez
+            self.logger.error("No existe la lista de números autorizados %s: se deniega su acceso", self.path)
+            self._numbers = self._static
+            self._mtime = None
+            return False
+        except OSError as e:
+            self.logger.error("No se pudo leer la lista de números autorizados: %s", e)
+            return False
+
+        self._numbers = self._static | normalize_numbers(lines)
+        self._mtime = mtime
+        self.logger.info("Lista de números autorizados cargada: %s número(s)", len(self._numbers))
+        return True
+
+    def refresh(self):
+        """Recargar el archivo si cambió su fecha de modificación (lee el disco)"""
+        # Un solo hilo comprueba el archivo; el resto sigue con el conjunto actual
+        if not self.path or not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = self._mtime is not None
+            if changed:
+                self.reload()
+        finally:
+            self._reload_lock.release()
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            self.refresh()
+
+    def is_allowed(self, number):
+        """Verificar si el número puede usar el bot"""
+        if self.path and self.reload_on_lookup:
+            self._maybe_reload()
+        if not self.restricted:
+            return True
+
+        numbers = self._numbers
+        if number in numbers:
+            return True
+        is_valid, normalized = validate_phone_number(number)
+        if is_valid and normalized in numbers:
+            return True
+
+        with self._stats_lock:
+            self.rejected += 1
+        return False
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def stats(self):
+        with self._stats_lock:
+            rejected = self.rejected
+        return {'numbers': len(self._numbers), 'restricted': self.restricted, 'rejected': rejected}
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+from ..config import Config
+from . import messages
+
+
+class InvalidInput(ValueError):
+    """Mensaje que no sirve para el paso actual; ``reply`` explica qué se espera"""
+
+    def __init__(self, reply):
+        super().__init__(reply)
+        self.reply = reply
+
+
+def accept_text(message_body, media_urls):
+    return message_body
+
+
+def parse_rating(message_body, media_urls):
+    try:
+        rating = int(message_body)
+    except ValueError:
+        raise InvalidInput(messages.INVALID_RATING) from None
+    if rating not in messages.STARS:
+        raise InvalidInput(messages.INVALID_RATING)
+    return rating
+
+
+def parse_photos(message_body, media_urls):
+    """Lista de URLs a agregar (vacía si el usuario no quiere fotos)"""
+    if message_body.lower() in messages.NO_PHOTOS_WORDS:
+        return []
+    if media_urls:
+        return list(media_urls)
+    raise InvalidInput(messages.INVALID_PHOTOS)
+
+
+def parse_confirmation(message_body, media_urls):
+    answer = message_body.lower()
+    if answer in messages.CONFIRM_WORDS:
+        return True
+    if answer in messages.CANCEL_WORDS:
+        return False
+    raise InvalidInput(messages.INVALID_CONFIRMATION)
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Qué hace un estado de la conversación con cada mensaje.
+
+    ``validator(message_body, media_urls)`` devuelve el valor del paso o lanza
+    ``InvalidInput``. El valor se guarda en el campo ``field`` de la sesión y,
+    si hay ``next_state``, la sesión pasa a ese estado. Recién entonces se
+    llama al método ``handler(from_number, session, value, message_sid)`` del
+    bot, que devuelve la respuesta; sin ``next_state`` el handler decide qué
+    hacer con la sesión.
+    """
+
+    handler: str
+    validator: Callable = accept_text
+    next_state: Optional[str] = None
+    field: Optional[str] = None
+
+
+# Estado actual -> transición (None = conversación nueva)
+TRANSITIONS = {
+    None: Transition('handle_welcome', next_state=Config.WAITING_FOR_PLACE),
+    Config.WAITING_FOR_PLACE: Transition(
+        'handle_place_input', next_state=Config.WAITING_FOR_RATING, field='place_name'
+    ),
+    Config.WAITING_FOR_RATING: Transition(
+        'handle_rating_input', parse_rating, Config.WAITING_FOR_TEXT, field='rating'
+    ),
+    Config.WAITING_FOR_TEXT: Transition(
+        'handle_text_input', next_state=Config.WAITING_FOR_PHOTOS, field='text'
+    ),
+    Config.WAITING_FOR_PHOTOS: Transition(
+        'handle_photos_input', parse_photos, Config.CONFIRMING_SUBMISSION, field='media_urls'
+    ),
+    Config.CONFIRMING_SUBMISSION: Transition('handle_confirmation', parse_confirmation),
+}
+
+
+def bind_transitions(bot, transitions=None):
+    """Tabla estado -> (validador, método ligado, próximo estado, campo), resuelta una sola vez"""
+    return {
+        state: (transition.validator, getattr(bot, transition.handler), transition.next_state, transition.field)
+        for state, transition in (transitions or TRANSITIONS).items()
+    }
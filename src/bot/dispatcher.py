@@ -0,0 +1,185 @@
+import logging
+import queue
+import random
+import threading
+import time
+import zlib
+from twilio.base.exceptions import TwilioRestException
+from ..utils.metrics import TWILIO_SEND_ERRORS, TWILIO_SEND_LATENCY
+from ..utils.rate_limit import TokenBucket
+
+
+class OutboundMessage:
+    """Mensaje pendiente de envío por la API REST de Twilio"""
+
+    __slots__ = ('to_number', 'body', 'enqueued_at', 'attempts')
+
+    def __init__(self, to_number, body):
+        self.to_number = to_number
+        self.body = body
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+class OutboundDispatcher:
+    """Envío de mensajes salientes en segundo plano.
+
+    Cada destinatario se asigna siempre al mismo worker (por hash del
+    número), de modo que sus mensajes salen en orden. Todos los workers
+    comparten un token bucket ajustado al límite de Twilio por número y cada
+    uno reutiliza su propio cliente (con pool de conexiones HTTP). Los
+    errores 429/5xx y de red se reintentan con backoff exponencial y jitter.
+    """
+
+    RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, client_factory, from_number, num_workers=2, rate_per_second=1.0,
+                 burst=None, max_attempts=4, backoff_base=1.0, backoff_max=30.0, max_queue=10000):
+        self.client_factory = client_factory
+        self.from_number = from_number
+        self.num_workers = num_workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.logger = logging.getLogger(__name__)
+
+        self._queues = [queue.Queue(maxsize=max_queue) for _ in range(num_workers)]
+        self._threads = []
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._dropped = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def start(self):
+        """Arrancar los workers de envío"""
+        if self._threads:
+            return
+        self._stop.clear()
+        for index, shard in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._run, args=(shard,), name=f"outbound-sender-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Detener los workers tras vaciar las colas"""
+        self.drain(timeout)
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def drain(self, timeout=None):
+        """Esperar a que se procesen los mensajes encolados"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for shard in self._queues:
+            while shard.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+
+    def _shard_for(self, to_number):
+        return self._queues[zlib.crc32(to_number.encode('utf-8')) % self.num_workers]
+
+    def submit(self, to_number, body):
+        """Encolar un mensaje; devuelve False si la cola está llena"""
+        try:
+            self._shard_for(to_number).put_nowait(OutboundMessage(to_number, body))
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            self.logger.error("Cola de salida llena, mensaje a %s descartado", to_number)
+            return False
+
+    def _run(self, shard):
+        # El cliente se crea dentro del bucle: si falla (credenciales, red) el
+        # worker reintenta con backoff en vez de morir con los mensajes en cola
+        client = None
+        failures = 0
+        while not self._stop.is_set():
+            if client is None:
+                try:
+                    client = self.client_factory()
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    delay = self.backoff_delay(failures)
+                    self.logger.error("No se pudo crear el cliente de Twilio, reintento en %.1fs: %s", delay, e)
+                    self._stop.wait(delay)
+                    continue
+            try:
+                message = shard.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._deliver(client, message)
+            finally:
+                shard.task_done()
+
+    def _is_retryable(self, error):
+        if isinstance(error, TwilioRestException):
+            return error.status in self.RETRYABLE_STATUS
+        # Errores de red/timeout del cliente HTTP
+        return True
+
+    def backoff_delay(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, delay)
+
+    def _deliver(self, client, message):
+        while True:
+            self.rate_limiter.acquire()
+            message.attempts += 1
+            try:
+                with TWILIO_SEND_LATENCY.time():
+                    client.messages.create(
+                        from_=f'whatsapp:{self.from_number}',
+                        body=message.body,
+                        to=f'whatsapp:{message.to_number}'
+                    )
+            except Exception as e:
+                status = e.status if isinstance(e, TwilioRestException) else 'network'
+                TWILIO_SEND_ERRORS.labels(str(status)).inc()
+                if message.attempts < self.max_attempts and self._is_retryable(e):
+                    with self._stats_lock:
+                        self._retries += 1
+                    delay = self.backoff_delay(message.attempts)
+                    self.logger.warning("Error enviando mensaje a %s, reintento en %.1fs: %s", message.to_number, delay, e)
+                    time.sleep(delay)
+                    continue
+                with self._stats_lock:
+                    self._failed += 1
+                self.logger.error("Error enviando mensaje a %s: %s", message.to_number, e)
+                return False
+
+            latency = time.monotonic() - message.enqueued_at
+            with self._stats_lock:
+                self._sent += 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+            self.logger.info("Mensaje enviado a %s", message.to_number)
+            return True
+
+    def queue_depth(self):
+        return sum(shard.qsize() for shard in self._queues)
+
+    def stats(self):
+        """Profundidad de cola, resultados y latencia de envío (desde que se encoló)"""
+        with self._stats_lock:
+            return {
+                'queue_depth': self.queue_depth(),
+                'sent': self._sent,
+                'failed': self._failed,
+                'retries': self._retries,
+                'dropped': self._dropped,
+                'avg_latency_ms': round(self._latency_total / self._sent * 1000, 1) if self._sent else 0.0,
+                'max_latency_ms': round(self._latency_max * 1000, 1)
+            }
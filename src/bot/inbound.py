@@ -0,0 +1,157 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from ..utils.database import SQLiteDatabase
+
+
+class InboundMessageLog(ABC):
+    """Registro de los ``MessageSid`` de Twilio ya procesados.
+
+    Twilio reintenta el webhook si la respuesta tarda; ``claim`` permite
+    procesar cada mensaje una sola vez y ``complete`` guarda la respuesta
+    para devolverla igual en los reintentos. Las entradas expiran tras
+    ``ttl`` segundos y se conservan como máximo ``max_entries``.
+    """
+
+    def __init__(self, ttl=3600, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.duplicates = 0
+
+    @abstractmethod
+    def claim(self, message_sid):
+        """Registrar el mensaje; devuelve ``(True, None)`` si es nuevo o
+        ``(False, respuesta)`` si ya se recibió (respuesta None si sigue en curso)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, message_sid, reply):
+        """Guardar la respuesta dada al mensaje"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, message_sid):
+        """Olvidar un mensaje cuyo procesamiento falló, para que el reintento lo procese"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'tracked': len(self), 'duplicates': self.duplicates}
+
+
+class InMemoryInboundLog(InboundMessageLog):
+    """Registro en memoria del proceso (un único worker)"""
+
+    def __init__(self, ttl=3600, max_entries=100000):
+        super().__init__(ttl, max_entries)
+        self._messages = OrderedDict()  # MessageSid -> (recibido, respuesta)
+        self._lock = threading.Lock()
+
+    def claim(self, message_sid):
+        with self._lock:
+            now = time.time()
+            # Las entradas están en orden de llegada: las expiradas quedan al principio
+            while self._messages and next(iter(self._messages.values()))[0] < now - self.ttl:
+                self._messages.popitem(last=False)
+
+            entry = self._messages.get(message_sid)
+            if entry is not None:
+                self.duplicates += 1
+                return False, entry[1]
+
+            self._messages[message_sid] = (now, None)
+            while len(self._messages) > self.max_entries:
+                self._messages.popitem(last=False)
+            return True, None
+
+    def complete(self, message_sid, reply):
+        with self._lock:
+            entry = self._messages.get(message_sid)
+            if entry is not None:
+                self._messages[message_sid] = (entry[0], reply)
+
+    def release(self, message_sid):
+        with self._lock:
+            self._messages.pop(message_sid, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._messages)
+
+
+class SQLiteInboundLog(InboundMessageLog):
+    """Registro en SQLite compartido por varios procesos/contenedores"""
+
+    PRUNE_EVERY = 100  # Mensajes nuevos entre limpiezas
+
+    def __init__(self, db_path, ttl=3600, max_entries=100000):
+        super().__init__(ttl, max_entries)
+        self.db = SQLiteDatabase(db_path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS inbound_messages (
+                message_sid TEXT PRIMARY KEY,
+                reply TEXT,
+                received_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_inbound_received ON inbound_messages (received_at);
+        """)
+        self._inserted = 0
+
+    def _prune(self):
+        self.db.execute("DELETE FROM inbound_messages WHERE received_at < ?", (time.time() - self.ttl,))
+        self.db.execute(
+            "DELETE FROM inbound_messages WHERE message_sid IN "
+            "(SELECT message_sid FROM inbound_messages ORDER BY received_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def claim(self, message_sid):
+        now = time.time()
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO inbound_messages (message_sid, received_at) VALUES (?, ?)",
+            (message_sid, now)
+        )
+        if cursor.rowcount == 1:
+            self._inserted += 1
+            if self._inserted % self.PRUNE_EVERY == 0:
+                self._prune()
+            return True, None
+
+        row = self.db.execute(
+            "SELECT reply, received_at FROM inbound_messages WHERE message_sid = ?", (message_sid,)
+        ).fetchone()
+        if row is not None and row['received_at'] < now - self.ttl:
+            # Entrada expirada que todavía no se limpió: se trata como nueva
+            cursor = self.db.execute(
+                "UPDATE inbound_messages SET reply = NULL, received_at = ? "
+                "WHERE message_sid = ? AND received_at = ?",
+                (now, message_sid, row['received_at'])
+            )
+            if cursor.rowcount == 1:
+                return True, None
+        self.duplicates += 1
+        return False, row['reply'] if row else None
+
+    def complete(self, message_sid, reply):
+        self.db.execute(
+            "UPDATE inbound_messages SET reply = ? WHERE message_sid = ?", (reply, message_sid)
+        )
+
+    def release(self, message_sid):
+        self.db.execute("DELETE FROM inbound_messages WHERE message_sid = ?", (message_sid,))
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM inbound_messages").fetchone()[0]
+
+
+def create_inbound_log(backend, db_path=None, ttl=3600, max_entries=100000):
+    """Crear el registro de mensajes entrantes (``memory`` o ``sqlite``)"""
+    if backend == 'memory':
+        return InMemoryInboundLog(ttl, max_entries)
+    if backend == 'sqlite':
+        return SQLiteInboundLog(db_path, ttl, max_entries)
+    raise ValueError(f"Backend de mensajes entrantes desconocido: {backend}")
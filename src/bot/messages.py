@@ -0,0 +1,66 @@
+"""
+Textos de la conversación, armados una sola vez al importar el módulo
+"""
+
+STARS = {rating: '⭐' * rating for rating in range(1, 6)}
+
+WELCOME = (
+    "¡Hola! Soy tu bot de feedback para Google Maps. 🗺️\n\n"
+    "Para empezar, envíame el nombre del lugar donde quieres dejar tu reseña.\n"
+    "Puedes escribir el nombre del local, restaurante, o cualquier lugar."
+)
+
+ASK_RATING = (
+    "Perfecto! Buscaré: *{place_name}*\n\n"
+    "Ahora califica el lugar del 1 al 5 estrellas:\n"
+    + "".join(f"{STARS[rating]} = {rating} estrella{'s' if rating > 1 else ''}\n" for rating in STARS)
+    + "\nEscribe solo el número (1, 2, 3, 4 o 5):"
+)
+
+# Un texto completo por calificación
+ASK_TEXT = {
+    rating: (
+        f"¡Excelente! Calificación: {stars}\n\n"
+        "Ahora escribe tu reseña. Cuéntanos tu experiencia:\n"
+        "- ¿Qué te gustó?\n"
+        "- ¿Qué mejorarías?\n"
+        "- ¿Recomendarías el lugar?\n\n"
+        "Escribe tu comentario:"
+    )
+    for rating, stars in STARS.items()
+}
+
+ASK_PHOTOS = (
+    "¡Perfecto! Tu reseña está lista.\n\n"
+    "¿Quieres agregar fotos? Envía las imágenes que quieras incluir en tu reseña.\n"
+    "Si no quieres agregar fotos, escribe 'sin fotos' o 'no'."
+)
+
+CONFIRMATION = (
+    "📋 *Resumen de tu reseña:*\n\n"
+    "📍 *Lugar:* {place_name}\n"
+    "⭐ *Calificación:* {stars}\n"
+    "📝 *Comentario:* {text}\n"
+    "📸 *Fotos:* {photos} imagen(es)\n\n"
+    "¿Estás seguro de que quieres enviar esta reseña a Google Maps?\n"
+    "Escribe 'sí' para confirmar o 'no' para cancelar."
+)
+
+CANCELLED = "Reseña cancelada. Puedes empezar de nuevo enviando cualquier mensaje."
+
+INVALID_RATING = "Por favor, escribe solo un número del 1 al 5."
+INVALID_PHOTOS = "Por favor, envía las fotos o escribe 'sin fotos' si no quieres agregar imágenes."
+INVALID_CONFIRMATION = "Por favor, escribe 'sí' para confirmar o 'no' para cancelar."
+
+CONFLICT = "Recibí varios mensajes a la vez. Por favor, envía de nuevo tu último mensaje."
+CONVERSATION_RESET = "⚠️ No pude continuar tu conversación anterior, así que empezamos de nuevo.\n\n" + WELCOME
+INTERNAL_ERROR = "❌ Error interno del bot. Por favor, intenta de nuevo."
+
+UNAUTHORIZED = "Lo siento, no tienes autorización para usar este bot."
+RATE_LIMITED = "⏳ Estás enviando mensajes muy rápido. Espera un momento y vuelve a intentarlo."
+OVERLOADED = "⏳ El bot está muy ocupado. Por favor, intenta de nuevo en unos minutos."
+
+# Palabras clave (en minúsculas)
+NO_PHOTOS_WORDS = frozenset(('sin fotos', 'no', 'nada'))
+CONFIRM_WORDS = frozenset(('sí', 'si', 'yes', 'ok', 'confirmar'))
+CANCEL_WORDS = frozenset(('no', 'cancelar', 'cancel'))
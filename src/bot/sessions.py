@@ -0,0 +1,313 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict, replace
+from ..utils.database import SQLiteDatabase
+
+# Valor centinela: borrar sin comprobar el estado
+ANY_STATE = object()
+
+
+@dataclass(slots=True)
+class UserSession:
+    """Estado de la conversación de un usuario"""
+
+    state: str = None
+    place_name: str = None
+    rating: int = None
+    text: str = None
+    photos: list = field(default_factory=list)  # Rutas locales de las fotos descargadas
+    media_urls: list = field(default_factory=list)  # URLs de Twilio recibidas
+    created_at: float = field(default_factory=time.time)
+    last_activity: float = field(default_factory=time.time)
+
+    def copy(self):
+        return replace(self, photos=list(self.photos), media_urls=list(self.media_urls))
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class SessionStore(ABC):
+    """Interfaz de almacenamiento de sesiones de conversación.
+
+    Las sesiones se devuelven como copias: los cambios solo se aplican al
+    guardarlos con ``save`` o ``compare_and_set``. ``compare_and_set`` permite
+    que cualquier worker procese el siguiente mensaje de un usuario sin pisar
+    una transición hecha en paralelo por otro.
+
+    Las sesiones sin actividad durante ``idle_timeout`` segundos expiran y,
+    al superar ``max_sessions``, se descartan las usadas hace más tiempo.
+    """
+
+    def __init__(self, idle_timeout=1800, max_sessions=10000):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @abstractmethod
+    def get(self, user_number):
+        """Sesión del usuario o None si no existe"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_or_create(self, user_number):
+        """Sesión del usuario, creándola vacía si no existe"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, user_number, session):
+        """Guardar la sesión sin comprobar su estado"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def compare_and_set(self, user_number, expected_state, session):
+        """Guardar la sesión solo si el estado almacenado es ``expected_state``"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, user_number, expected_state=ANY_STATE):
+        """Eliminar la sesión; con ``expected_state`` solo si el estado coincide"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def sweep(self):
+        """Eliminar las sesiones expiradas y devolver cuántas se borraron"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplementedError
+
+    def is_expired(self, last_activity, now=None):
+        return ((now or time.time()) - last_activity) > self.idle_timeout
+
+    def stats(self):
+        """Métricas del almacén (los contadores son por proceso)"""
+        return {
+            'active': len(self),
+            'created': self.created,
+            'expired': self.expired,
+            'evicted': self.evicted
+        }
+
+
+class InMemorySessionStore(SessionStore):
+    """Sesiones en memoria del proceso (un único worker), ordenadas por uso"""
+
+    def __init__(self, idle_timeout=1800, max_sessions=10000):
+        super().__init__(idle_timeout, max_sessions)
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, user_number):
+        session = self._sessions.get(user_number)
+        if session is not None and self.is_expired(session.last_activity):
+            del self._sessions[user_number]
+            self.expired += 1
+            return None
+        return session
+
+    def _store(self, user_number, session):
+        session.last_activity = time.time()
+        self._sessions[user_number] = session.copy()
+        self._sessions.move_to_end(user_number)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def get(self, user_number):
+        with self._lock:
+            session = self._live(user_number)
+            return session.copy() if session is not None else None
+
+    def get_or_create(self, user_number):
+        with self._lock:
+            session = self._live(user_number)
+            if session is None:
+                session = UserSession()
+                self._store(user_number, session)
+                self.created += 1
+            else:
+                self._sessions.move_to_end(user_number)
+            return session.copy()
+
+    def save(self, user_number, session):
+        with self._lock:
+            self._store(user_number, session)
+
+    def compare_and_set(self, user_number, expected_state, session):
+        with self._lock:
+            current = self._live(user_number)
+            if current is None or current.state != expected_state:
+                return False
+            self._store(user_number, session)
+            return True
+
+    def delete(self, user_number, expected_state=ANY_STATE):
+        with self._lock:
+            current = self._live(user_number)
+            if current is None:
+                return False
+            if expected_state is not ANY_STATE and current.state != expected_state:
+                return False
+            del self._sessions[user_number]
+            return True
+
+    def sweep(self):
+        with self._lock:
+            now = time.time()
+            expired = [user for user, session in self._sessions.items()
+                       if self.is_expired(session.last_activity, now)]
+            for user_number in expired:
+                del self._sessions[user_number]
+            self.expired += len(expired)
+            return len(expired)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sesiones en un archivo SQLite compartido por varios procesos/contenedores"""
+
+    def __init__(self, db_path, idle_timeout=1800, max_sessions=10000):
+        super().__init__(idle_timeout, max_sessions)
+        self.db = SQLiteDatabase(db_path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_number TEXT PRIMARY KEY,
+                state TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+        """)
+
+    def _encode(self, session):
+        session.last_activity = time.time()
+        return (session.state, json.dumps(session.to_dict()), session.last_activity)
+
+    def _evict(self):
+        excess = len(self) - self.max_sessions
+        if excess > 0:
+            cursor = self.db.execute(
+                "DELETE FROM sessions WHERE user_number IN "
+                "(SELECT user_number FROM sessions ORDER BY updated_at LIMIT ?)", (excess,)
+            )
+            self.evicted += cursor.rowcount
+
+    def get(self, user_number):
+        row = self.db.execute(
+            "SELECT data, updated_at FROM sessions WHERE user_number = ?", (user_number,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self.is_expired(row['updated_at']):
+            cursor = self.db.execute(
+                "DELETE FROM sessions WHERE user_number = ? AND updated_at = ?",
+                (user_number, row['updated_at'])
+            )
+            self.expired += cursor.rowcount
+            return None
+        return UserSession.from_dict(json.loads(row['data']))
+
+    def get_or_create(self, user_number):
+        session = self.get(user_number)
+        if session is not None:
+            return session
+
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO sessions (state, data, updated_at, user_number) VALUES (?, ?, ?, ?)",
+            (*self._encode(UserSession()), user_number)
+        )
+        if cursor.rowcount == 1:
+            self.created += 1
+            self._evict()
+        return self.get(user_number) or UserSession()
+
+    def save(self, user_number, session):
+        self.db.execute(
+            "INSERT OR REPLACE INTO sessions (state, data, updated_at, user_number) VALUES (?, ?, ?, ?)",
+            (*self._encode(session), user_number)
+        )
+
+    def compare_and_set(self, user_number, expected_state, session):
+        cursor = self.db.execute(
+            "UPDATE sessions SET state = ?, data = ?, updated_at = ? "
+            "WHERE user_number = ? AND state IS ?",
+            (*self._encode(session), user_number, expected_state)
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, user_number, expected_state=ANY_STATE):
+        if expected_state is ANY_STATE:
+            cursor = self.db.execute("DELETE FROM sessions WHERE user_number = ?", (user_number,))
+        else:
+            cursor = self.db.execute(
+                "DELETE FROM sessions WHERE user_number = ? AND state IS ?",
+                (user_number, expected_state)
+            )
+        return cursor.rowcount == 1
+
+    def sweep(self):
+        cursor = self.db.execute(
+            "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.idle_timeout,)
+        )
+        self.expired += cursor.rowcount
+        return cursor.rowcount
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class SessionSweeper:
+    """Hilo en segundo plano que elimina periódicamente las sesiones expiradas"""
+
+    def __init__(self, store, interval=60):
+        self.store = store
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                removed = self.store.sweep()
+                if removed:
+                    self.logger.info("Sesiones expiradas eliminadas: %s", removed)
+            except Exception as e:
+                self.logger.error("Error limpiando sesiones: %s", e)
+
+
+def create_session_store(backend, db_path=None, idle_timeout=1800, max_sessions=10000):
+    """Crear el almacén de sesiones configurado (``memory`` o ``sqlite``)"""
+    if backend == 'memory':
+        return InMemorySessionStore(idle_timeout, max_sessions)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(db_path, idle_timeout, max_sessions)
+    raise ValueError(f"Backend de sesiones desconocido: {backend}")
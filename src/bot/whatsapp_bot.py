@@ -1,252 +1,569 @@
 from flask import Flask, request, jsonify
 from twilio.twiml.messaging_response import MessagingResponse
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 import os
 import tempfile
 import logging
-from datetime import datetime
+import threading
+import time
 from ..config import Config
-from ..automation import GoogleMapsAutomation
+from ..automation import GoogleMapsAutomation, GoogleSessionStore, PlaceCache, TraceStore, resolve_chromedriver
+from ..jobs import JobStore, JobStatus, AccountScheduler, load_accounts, review_fingerprint
+from .sessions import create_session_store, SessionSweeper
+from .dispatcher import OutboundDispatcher
+from .inbound import create_inbound_log
+from .admission import SenderRateLimiter, AdmissionController
+from .authorization import Allowlist
+from .conversation import InvalidInput, bind_transitions
+from . import messages
+from ..utils.locks import KeyedLock, ProcessLock, ProcessKeyedLock
+from ..utils.metrics import WEBHOOK_LATENCY, WEBHOOK_REQUEST_LATENCY, WEBHOOK_REJECTED, MetricsReporter
+from ..media import MediaIngest, PhotoProcessor, content_hash
 
 class WhatsAppBot:
     """Bot principal de WhatsApp para manejo de feedback"""
     
     def __init__(self):
         self.config = Config()
-        self.client = Client(self.config.TWILIO_ACCOUNT_SID, self.config.TWILIO_AUTH_TOKEN)
-        self.sessions = {}  # Almacenar estado de conversación por usuario
-        self.setup_logging()
-        
-    def setup_logging(self):
-        """Configurar logging del bot"""
-        logging.basicConfig(level=logging.INFO)
+        self.client = self.create_twilio_client()  # Valida las credenciales al arrancar
+        self.dispatcher = OutboundDispatcher(
+            self.create_twilio_client,
+            self.config.TWILIO_WHATSAPP_NUMBER,
+            num_workers=self.config.OUTBOUND_WORKERS,
+            rate_per_second=self.config.OUTBOUND_RATE_PER_SECOND,
+            burst=self.config.OUTBOUND_BURST,
+            max_attempts=self.config.OUTBOUND_MAX_ATTEMPTS,
+            max_queue=self.config.OUTBOUND_MAX_QUEUE
+        )
+        # Almacenar estado de conversación por usuario (compartido entre workers si es sqlite)
+        self.sessions = create_session_store(
+            self.config.SESSION_BACKEND,
+            self.config.SESSION_DB_PATH,
+            idle_timeout=self.config.SESSION_IDLE_TIMEOUT,
+            max_sessions=self.config.SESSION_MAX_ACTIVE
+        )
+        self.session_sweeper = SessionSweeper(self.sessions, interval=self.config.SESSION_SWEEP_INTERVAL)
+        # MessageSid ya procesados (compartidos como las sesiones) y turnos por remitente
+        self.inbound = create_inbound_log(
+            self.config.SESSION_BACKEND,
+            self.config.SESSION_DB_PATH,
+            ttl=self.config.INBOUND_DEDUP_TTL,
+            max_entries=self.config.INBOUND_DEDUP_MAX
+        )
+        # Con varios workers los turnos se toman también entre procesos; si no,
+        # dos mensajes simultáneos del mismo usuario chocan y uno recibe CONFLICT
+        if self.config.SENDER_LOCKS_DIR:
+            self.sender_locks = ProcessKeyedLock(self.config.SENDER_LOCKS_DIR)
+        else:
+            self.sender_locks = KeyedLock()
+        self.allowlist = Allowlist(
+            self.config.ALLOWED_NUMBERS,
+            path=self.config.ALLOWED_NUMBERS_FILE,
+            reload_interval=self.config.ALLOWED_NUMBERS_RELOAD_INTERVAL
+        )
+        # Límites antes de tocar la sesión: por remitente y global
+        self.rate_limiter = SenderRateLimiter(
+            rate_per_minute=self.config.SENDER_RATE_PER_MINUTE,
+            burst=self.config.SENDER_BURST,
+            max_senders=self.config.SESSION_MAX_ACTIVE
+        )
+        self.admission = AdmissionController(
+            max_concurrent=self.config.WEBHOOK_MAX_CONCURRENT,
+            max_waiting=self.config.WEBHOOK_MAX_WAITING,
+            wait_timeout=self.config.WEBHOOK_WAIT_TIMEOUT
+        )
         self.logger = logging.getLogger(__name__)
+        self.media = MediaIngest(
+            self.config.PHOTOS_DIR,
+            auth=(self.config.TWILIO_ACCOUNT_SID, self.config.TWILIO_AUTH_TOKEN),
+            max_workers=self.config.MEDIA_DOWNLOAD_WORKERS,
+            timeout=self.config.MEDIA_DOWNLOAD_TIMEOUT,
+            max_bytes=self.config.MEDIA_MAX_BYTES,
+            processor=self.create_photo_processor()
+        )
+        self.setup_jobs()
+        # Estado -> (validador, handler, próximo estado, campo), resuelto una vez
+        self.transitions = bind_transitions(self)
+        # Gauges de Prometheus (sesiones, colas, navegadores) fuera del camino de cada request
+        self.metrics_reporter = MetricsReporter(self.get_stats, interval=self.config.METRICS_REPORT_INTERVAL)
+        self.submission_lock = None
+        self._workers_lock = threading.Lock()
+        self._stopping = False
+        
+    def create_photo_processor(self):
+        """Normalizador de fotos (None si PHOTO_PROCESS_WORKERS es 0)"""
+        if self.config.PHOTO_PROCESS_WORKERS <= 0:
+            return None
+        return PhotoProcessor(
+            os.path.join(self.config.PHOTOS_DIR, 'processed'),
+            max_dimension=self.config.PHOTO_MAX_DIMENSION,
+            quality=self.config.PHOTO_JPEG_QUALITY,
+            max_workers=self.config.PHOTO_PROCESS_WORKERS
+        )
+        
+    def create_twilio_client(self):
+        """Cliente de Twilio que reutiliza las conexiones HTTP entre envíos"""
+        return Client(
+            self.config.TWILIO_ACCOUNT_SID,
+            self.config.TWILIO_AUTH_TOKEN,
+            http_client=TwilioHttpClient(pool_connections=True, timeout=self.config.TWILIO_HTTP_TIMEOUT)
+        )
+        
+    def setup_jobs(self):
+        """Configurar la cola durable de envíos y los workers de cada cuenta de Google"""
+        self.accounts = load_accounts(
+            self.config.GOOGLE_ACCOUNTS_FILE,
+            self.config.GOOGLE_EMAIL,
+            self.config.GOOGLE_PASSWORD,
+            concurrency=self.config.JOB_WORKERS,
+            cooldown=self.config.ACCOUNT_COOLDOWN
+        )
+        
+        self.place_cache = None
+        if self.config.PLACE_CACHE_PATH:
+            self.place_cache = PlaceCache(
+                self.config.PLACE_CACHE_PATH,
+                ttl=self.config.PLACE_CACHE_TTL,
+                max_entries=self.config.PLACE_CACHE_MAX_ENTRIES
+            )
+            
+        # Línea de tiempo de cada intento de envío y captura de los que fallan
+        self.trace_store = None
+        if self.config.TRACE_DB_PATH:
+            self.trace_store = TraceStore(
+                self.config.TRACE_DB_PATH,
+                max_traces=self.config.TRACE_MAX_ENTRIES,
+                max_snapshots=self.config.TRACE_MAX_SNAPSHOTS
+            )
+            
+        # Sesión de Google guardada y pool de navegadores propios de cada cuenta
+        self.google_sessions = {}
+        self.driver_pools = {}
+        for account in self.accounts:
+            google_session = None
+            if self.config.GOOGLE_SESSION_KEY:
+                google_session = GoogleSessionStore.for_account(
+                    self.config.GOOGLE_SESSION_DIR,
+                    account.email,
+                    self.config.GOOGLE_SESSION_KEY
+                )
+            self.google_sessions[account.alias] = google_session
+            
+            if self.config.DRIVER_POOL_SIZE > 0:
+                self.driver_pools[account.alias] = GoogleMapsAutomation.create_driver_pool(
+                    account.email,
+                    account.password,
+                    size=self.config.DRIVER_POOL_SIZE,
+                    max_uses=self.config.DRIVER_MAX_USES,
+                    max_memory_mb=self.config.DRIVER_MAX_MEMORY_MB,
+                    checkout_timeout=self.config.DRIVER_CHECKOUT_TIMEOUT,
+                    session_store=google_session,
+                    wait_timeouts=self.config.WAIT_TIMEOUTS,
+                    browser_profile=self.config.BROWSER_PROFILE,
+                    chrome_binary=self.config.CHROME_BINARY
+                )
+            
+        self.job_store = JobStore(
+            self.config.JOBS_DB_PATH,
+            lease_timeout=self.config.JOB_LEASE_TIMEOUT,
+            dedup_window=self.config.JOB_DEDUP_WINDOW
+        )
+        self.worker_pool = AccountScheduler(
+            self.job_store,
+            self.accounts,
+            handler=self.process_submission_job,
+            on_finished=self.notify_submission_result,
+            max_concurrent=self.config.JOB_MAX_CONCURRENT,
+            backoff_base=self.config.JOB_RETRY_BACKOFF,
+            backoff_max=self.config.JOB_RETRY_BACKOFF_MAX
+        )
+        
+    def start_workers(self):
+        """Arrancar los hilos de fondo del proceso.
+
+        Con ``JOB_WORKERS_LOCK`` (varios workers de gunicorn) los envíos los
+        ejecuta un único proceso: el que tiene el candado. Los demás esperan
+        en segundo plano y toman el relevo si ese proceso termina.
+        """
+        if self.config.JOB_WORKERS > 0:
+            # Falla al arrancar si chromedriver no corresponde al Chrome instalado
+            resolve_chromedriver(
+                self.config.CHROMEDRIVER_PATH,
+                offline=self.config.CHROMEDRIVER_OFFLINE,
+                chrome_binary=self.config.CHROME_BINARY
+            )
+        self.dispatcher.start()
+        self.session_sweeper.start()
+        self.metrics_reporter.start()
+        
+        if not self.config.JOB_WORKERS_LOCK:
+            self.start_submission_workers()
+            return
+        self.submission_lock = ProcessLock(self.config.JOB_WORKERS_LOCK)
+        threading.Thread(target=self.wait_for_submission_lock, name="submission-standby", daemon=True).start()
+        
+    def wait_for_submission_lock(self):
+        """Esperar el candado de envíos y arrancar los workers al obtenerlo"""
+        self.submission_lock.acquire()
+        with self._workers_lock:
+            if self._stopping:
+                self.submission_lock.release()
+                return
+            self.logger.info("Proceso %s a cargo de los envíos", os.getpid())
+            self.start_submission_workers()
+            
+    def start_submission_workers(self):
+        """Arrancar los workers de envío y precalentar los navegadores"""
+        for index, driver_pool in enumerate(self.driver_pools.values()):
+            # Precalentar los navegadores sin bloquear el arranque del servidor
+            threading.Thread(target=driver_pool.warm, name=f"driver-pool-warmup-{index}", daemon=True).start()
+        self.worker_pool.start()
+        
+    def stop_workers(self, timeout=None):
+        """Detener los workers esperando los envíos en curso"""
+        with self._workers_lock:
+            self._stopping = True
+        self.metrics_reporter.stop(timeout)
+        self.session_sweeper.stop(timeout)
+        self.worker_pool.stop(timeout)
+        for driver_pool in self.driver_pools.values():
+            driver_pool.close()
+        self.media.close()
+        if self.submission_lock:
+            self.submission_lock.release()
+        # Al final, para entregar los resultados de los envíos que terminaron
+        self.dispatcher.stop(timeout)
         
     def get_user_session(self, user_number):
         """Obtener o crear sesión de usuario"""
-        if user_number not in self.sessions:
-            self.sessions[user_number] = {
-                'state': None,
-                'place_name': None,
-                'rating': None,
-                'text': None,
-                'photos': [],
-                'created_at': datetime.now()
-            }
-        return self.sessions[user_number]
+        return self.sessions.get_or_create(user_number)
         
-    def send_message(self, to_number, message):
-        """Enviar mensaje de WhatsApp"""
-        try:
-            message = self.client.messages.create(
-                from_=f'whatsapp:{self.config.TWILIO_WHATSAPP_NUMBER}',
-                body=message,
-                to=f'whatsapp:{to_number}'
-            )
-            self.logger.info(f"Mensaje enviado a {to_number}: {message}")
+    def update_session(self, user_number, session, new_state):
+        """Guardar la sesión con su nuevo estado si nadie la modificó en paralelo"""
+        expected_state = session.state
+        session.state = new_state
+        if self.sessions.compare_and_set(user_number, expected_state, session):
             return True
-        except Exception as e:
-            self.logger.error(f"Error enviando mensaje: {str(e)}")
-            return False
+        self.logger.warning("Transición concurrente descartada para %s (%s -> %s)", user_number, expected_state, new_state)
+        return False
+        
+    def handle_conflict(self, from_number):
+        """Responder cuando otro worker ya procesó un mensaje simultáneo del usuario"""
+        return self.reply(from_number, messages.CONFLICT)
+        
+    def send_message(self, to_number, message):
+        """Encolar un mensaje de WhatsApp para enviarlo en segundo plano"""
+        return self.dispatcher.submit(to_number, message)
             
-    def handle_incoming_message(self, from_number, message_body, media_urls=None):
-        """Manejar mensaje entrante"""
-        session = self.get_user_session(from_number)
+    def reply(self, to_number, message):
+        """Responder al mensaje actual.
         
-        # Verificar si el usuario está autorizado
-        if self.config.ALLOWED_NUMBERS and from_number not in self.config.ALLOWED_NUMBERS:
-            return "Lo siento, no tienes autorización para usar este bot."
-            
-        # Procesar según el estado actual
-        if session['state'] is None:
-            return self.handle_welcome(from_number, message_body)
-        elif session['state'] == self.config.WAITING_FOR_PLACE:
-            return self.handle_place_input(from_number, message_body)
-        elif session['state'] == self.config.WAITING_FOR_RATING:
-            return self.handle_rating_input(from_number, message_body)
-        elif session['state'] == self.config.WAITING_FOR_TEXT:
-            return self.handle_text_input(from_number, message_body)
-        elif session['state'] == self.config.WAITING_FOR_PHOTOS:
-            return self.handle_photos_input(from_number, message_body, media_urls)
-        elif session['state'] == self.config.CONFIRMING_SUBMISSION:
-            return self.handle_confirmation(from_number, message_body)
-            
-    def handle_welcome(self, from_number, message_body):
-        """Manejar mensaje de bienvenida"""
-        session = self.get_user_session(from_number)
-        session['state'] = self.config.WAITING_FOR_PLACE
+        La respuesta viaja en el TwiML que devuelve el webhook, por lo que no
+        requiere una llamada extra a la API REST de Twilio.
+        """
+        return message
         
-        welcome_message = (
-            "¡Hola! Soy tu bot de feedback para Google Maps. 🗺️\n\n"
-            "Para empezar, envíame el nombre del lugar donde quieres dejar tu reseña.\n"
-            "Puedes escribir el nombre del local, restaurante, o cualquier lugar."
-        )
+    def notify(self, to_number, message):
+        """Enviar un mensaje fuera de turno (p. ej. el resultado de un envío) por la API REST"""
+        return self.send_message(to_number, message)
         
-        self.send_message(from_number, welcome_message)
-        return welcome_message
+    def handle_incoming_message(self, from_number, message_body, media_urls=None, message_sid=None):
+        """Manejar mensaje entrante.
+
+        Los mensajes de un mismo remitente se procesan de a uno y en orden de
+        llegada; los de remitentes distintos, en paralelo. Un ``MessageSid``
+        ya recibido (reintento de Twilio) devuelve la respuesta original sin
+        volver a aplicar la transición.
+
+        Antes de eso se verifica la autorización y se aplican el límite por
+        remitente y el control de admisión global; los mensajes rechazados no
+        crean sesión. La latencia medida incluye todo lo anterior.
+        """
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            rejection = self.screen_sender(from_number)
+            if rejection is not None:
+                outcome = 'rejected'
+                return rejection
+            if not self.admission.acquire():
+                outcome = 'rejected'
+                return self.reject_overloaded(from_number)
+                
+            try:
+                reply = self.handle_admitted_message(from_number, message_body, media_urls, message_sid)
+            finally:
+                self.admission.release()
+            outcome = 'processed'
+            return reply
+        finally:
+            WEBHOOK_REQUEST_LATENCY.labels(outcome).observe(time.perf_counter() - started)
+            
+    def screen_sender(self, from_number):
+        """Respuesta de rechazo si el remitente no está autorizado o excede su límite (None si puede seguir)"""
+        if not self.allowlist.is_allowed(from_number):
+            WEBHOOK_REJECTED.labels('unauthorized').inc()
+            return self.reply(from_number, messages.UNAUTHORIZED)
+        if not self.rate_limiter.allow(from_number):
+            WEBHOOK_REJECTED.labels('rate_limited').inc()
+            return self.reply(from_number, messages.RATE_LIMITED)
+        return None
         
-    def handle_place_input(self, from_number, message_body):
-        """Manejar entrada del nombre del lugar"""
+    def reject_overloaded(self, from_number):
+        """Respuesta cuando el control de admisión rechaza el mensaje"""
+        WEBHOOK_REJECTED.labels('overloaded').inc()
+        self.logger.warning("Mensaje de %s rechazado: bot sobrecargado", from_number)
+        return self.reply(from_number, messages.OVERLOADED)
+        
+    def handle_admitted_message(self, from_number, message_body, media_urls=None, message_sid=None):
+        """Procesar un mensaje admitido, en turno y sin repetir MessageSid"""
+        with self.sender_locks.hold(from_number):
+            if not message_sid:
+                return self.process_message(from_number, message_body, media_urls)
+                
+            is_new, previous_reply = self.inbound.claim(message_sid)
+            if not is_new:
+                WEBHOOK_REJECTED.labels('duplicate').inc()
+                self.logger.info("Mensaje %s repetido, se devuelve la respuesta original", message_sid)
+                return previous_reply
+                
+            try:
+                reply = self.process_message(from_number, message_body, media_urls, message_sid)
+            except Exception:
+                self.inbound.release(message_sid)
+                raise
+            self.inbound.complete(message_sid, reply)
+            return reply
+            
+    def process_message(self, from_number, message_body, media_urls=None, message_sid=None):
+        """Aplicar un mensaje a la conversación del usuario"""
+        # Reintento de Twilio de un mensaje que ya encoló una reseña
+        if message_sid:
+            job = self.job_store.find_by_message_sid(message_sid)
+            if job is not None:
+                return self.reply(from_number, self.describe_job(job))
+                
+        # Una sola lectura de la sesión por mensaje
         session = self.get_user_session(from_number)
-        session['place_name'] = message_body
-        session['state'] = self.config.WAITING_FOR_RATING
+        step = self.transitions.get(session.state)
+        if step is None:
+            return self.handle_unknown_state(from_number, session)
+        validator, handler, next_state, field = step
         
-        rating_message = (
-            f"Perfecto! Buscaré: *{message_body}*\n\n"
-            "Ahora califica el lugar del 1 al 5 estrellas:\n"
-            "⭐ = 1 estrella\n"
-            "⭐⭐ = 2 estrellas\n"
-            "⭐⭐⭐ = 3 estrellas\n"
-            "⭐⭐⭐⭐ = 4 estrellas\n"
-            "⭐⭐⭐⭐⭐ = 5 estrellas\n\n"
-            "Escribe solo el número (1, 2, 3, 4 o 5):"
-        )
+        with WEBHOOK_LATENCY.labels(session.state or 'new').time():
+            try:
+                value = validator(message_body, media_urls)
+            except InvalidInput as e:
+                return self.reply(from_number, e.reply)
+                
+            if field is not None:
+                setattr(session, field, value)
+            if next_state is not None and not self.update_session(from_number, session, next_state):
+                return self.handle_conflict(from_number)
+            return handler(from_number, session, value, message_sid)
+            
+    def handle_unknown_state(self, from_number, session):
+        """Reiniciar una conversación guardada en un estado que el bot no conoce"""
+        self.logger.warning("Estado de sesión desconocido para %s: %r, se reinicia", from_number, session.state)
+        if not self.update_session(from_number, session, self.config.WAITING_FOR_PLACE):
+            return self.handle_conflict(from_number)
+        return self.reply(from_number, messages.CONVERSATION_RESET)
         
-        self.send_message(from_number, rating_message)
-        return rating_message
+    def handle_welcome(self, from_number, session, value, message_sid=None):
+        """Manejar mensaje de bienvenida"""
+        return self.reply(from_number, messages.WELCOME)
+        
+    def handle_place_input(self, from_number, session, place_name, message_sid=None):
+        """Manejar entrada del nombre del lugar"""
+        return self.reply(from_number, messages.ASK_RATING.format(place_name=place_name))
         
-    def handle_rating_input(self, from_number, message_body):
+    def handle_rating_input(self, from_number, session, rating, message_sid=None):
         """Manejar entrada de calificación"""
-        session = self.get_user_session(from_number)
+        return self.reply(from_number, messages.ASK_TEXT[rating])
         
-        try:
-            rating = int(message_body)
-            if rating < 1 or rating > 5:
-                raise ValueError("Rating fuera de rango")
-        except ValueError:
-            error_message = "Por favor, escribe solo un número del 1 al 5."
-            self.send_message(from_number, error_message)
-            return error_message
-            
-        session['rating'] = rating
-        session['state'] = self.config.WAITING_FOR_TEXT
-        
-        text_message = (
-            f"¡Excelente! Calificación: {'⭐' * rating}\n\n"
-            "Ahora escribe tu reseña. Cuéntanos tu experiencia:\n"
-            "- ¿Qué te gustó?\n"
-            "- ¿Qué mejorarías?\n"
-            "- ¿Recomendarías el lugar?\n\n"
-            "Escribe tu comentario:"
-        )
-        
-        self.send_message(from_number, text_message)
-        return text_message
-        
-    def handle_text_input(self, from_number, message_body):
+    def handle_text_input(self, from_number, session, text, message_sid=None):
         """Manejar entrada de texto de la reseña"""
-        session = self.get_user_session(from_number)
-        session['text'] = message_body
-        session['state'] = self.config.WAITING_FOR_PHOTOS
+        return self.reply(from_number, messages.ASK_PHOTOS)
         
-        photos_message = (
-            "¡Perfecto! Tu reseña está lista.\n\n"
-            "¿Quieres agregar fotos? Envía las imágenes que quieras incluir en tu reseña.\n"
-            "Si no quieres agregar fotos, escribe 'sin fotos' o 'no'."
-        )
-        
-        self.send_message(from_number, photos_message)
-        return photos_message
-        
-    def handle_photos_input(self, from_number, message_body, media_urls):
+    def handle_photos_input(self, from_number, session, media_urls, message_sid=None):
         """Manejar entrada de fotos"""
-        session = self.get_user_session(from_number)
+        if media_urls:
+            # Descargar las fotos mientras el usuario revisa el resumen
+            self.media.prefetch(
+                media_urls,
+                on_complete=lambda paths: self.store_downloaded_photos(from_number, paths)
+            )
+        return self.show_confirmation(from_number, session)
         
-        if message_body.lower() in ['sin fotos', 'no', 'nada']:
-            session['state'] = self.config.CONFIRMING_SUBMISSION
-            return self.show_confirmation(from_number)
-        elif media_urls:
-            # Descargar y guardar fotos temporalmente
-            for url in media_urls:
-                try:
-                    # Aquí implementarías la descarga de la imagen
-                    # Por ahora, solo guardamos la URL
-                    session['photos'].append(url)
-                except Exception as e:
-                    self.logger.error(f"Error descargando foto: {str(e)}")
-                    
-            session['state'] = self.config.CONFIRMING_SUBMISSION
-            return self.show_confirmation(from_number)
-        else:
-            error_message = "Por favor, envía las fotos o escribe 'sin fotos' si no quieres agregar imágenes."
-            self.send_message(from_number, error_message)
-            return error_message
-            
-    def show_confirmation(self, from_number):
+    def store_downloaded_photos(self, from_number, paths):
+        """Guardar en la sesión las rutas locales de las fotos descargadas"""
+        while True:
+            session = self.sessions.get(from_number)
+            if session is None:
+                # La reseña ya se confirmó o canceló: el trabajo resuelve las fotos
+                return
+            session.photos.extend(path for path in paths if path not in session.photos)
+            if self.sessions.compare_and_set(from_number, session.state, session):
+                return
+                
+    def show_confirmation(self, from_number, session):
         """Mostrar confirmación antes de enviar"""
-        session = self.get_user_session(from_number)
-        
-        confirmation_message = (
-            "📋 *Resumen de tu reseña:*\n\n"
-            f"📍 *Lugar:* {session['place_name']}\n"
-            f"⭐ *Calificación:* {'⭐' * session['rating']}\n"
-            f"📝 *Comentario:* {session['text']}\n"
-            f"📸 *Fotos:* {len(session['photos'])} imagen(es)\n\n"
-            "¿Estás seguro de que quieres enviar esta reseña a Google Maps?\n"
-            "Escribe 'sí' para confirmar o 'no' para cancelar."
-        )
+        return self.reply(from_number, messages.CONFIRMATION.format(
+            place_name=session.place_name,
+            stars=messages.STARS[session.rating],
+            text=session.text,
+            photos=len(session.media_urls)
+        ))
         
-        self.send_message(from_number, confirmation_message)
-        return confirmation_message
-        
-    def handle_confirmation(self, from_number, message_body):
+    def handle_confirmation(self, from_number, session, confirmed, message_sid=None):
         """Manejar confirmación final"""
-        session = self.get_user_session(from_number)
-        
-        if message_body.lower() in ['sí', 'si', 'yes', 'ok', 'confirmar']:
-            return self.submit_to_google_maps(from_number)
-        elif message_body.lower() in ['no', 'cancelar', 'cancel']:
-            # Limpiar sesión
-            del self.sessions[from_number]
+        if confirmed:
+            return self.submit_to_google_maps(from_number, session, message_sid)
             
-            cancel_message = "Reseña cancelada. Puedes empezar de nuevo enviando cualquier mensaje."
-            self.send_message(from_number, cancel_message)
-            return cancel_message
-        else:
-            error_message = "Por favor, escribe 'sí' para confirmar o 'no' para cancelar."
-            self.send_message(from_number, error_message)
-            return error_message
+        # Limpiar sesión
+        self.sessions.delete(from_number)
+        return self.reply(from_number, messages.CANCELLED)
             
-    def submit_to_google_maps(self, from_number):
-        """Enviar reseña a Google Maps"""
-        session = self.get_user_session(from_number)
+    def session_fingerprint(self, from_number, session):
+        """Huella de la reseña de la sesión (las fotos, por el hash de contenido de su nombre)"""
+        return review_fingerprint(
+            from_number, session.place_name, session.rating, session.text,
+            [content_hash(path) for path in session.photos]
+        )
         
-        try:
-            # Crear instancia de automatización
-            automation = GoogleMapsAutomation(
-                self.config.GOOGLE_EMAIL,
-                self.config.GOOGLE_PASSWORD
+    def describe_job(self, job):
+        """Respuesta para una reseña ya encolada (también ante confirmaciones repetidas)"""
+        place_name = job.payload['place_name']
+        if job.status == JobStatus.COMPLETED:
+            return (
+                "✅ *Esta reseña ya fue publicada*\n\n"
+                f"Tu reseña para *{place_name}* ya está en Google Maps.\n"
+                f"Código de seguimiento: {job.job_id}"
             )
-            
-            # Procesar feedback
-            success, message = automation.process_feedback(
-                session['place_name'],
-                session['rating'],
-                session['text'],
-                session['photos'] if session['photos'] else None
+        if job.status == JobStatus.FAILED:
+            return (
+                "❌ *Error al enviar la reseña*\n\n"
+                f"Error: {job.error}\n"
+                f"Código de seguimiento: {job.job_id}"
             )
+        return (
+            "⏳ *Reseña en cola*\n\n"
+            f"Estamos publicando tu reseña para *{place_name}*.\n"
+            "Te avisaremos por aquí cuando esté lista.\n"
+            f"Código de seguimiento: {job.job_id}"
+        )
+        
+    def submit_to_google_maps(self, from_number, session, message_sid=None):
+        """Encolar la reseña para enviarla a Google Maps en segundo plano.
+
+        Si la misma reseña ya se encoló (misma huella o mismo MessageSid) se
+        responde con el trabajo existente en lugar de crear otro.
+        """
+        # Solo el worker que cierra la sesión en estado de confirmación encola el envío
+        if not self.sessions.delete(from_number, expected_state=self.config.CONFIRMING_SUBMISSION):
+            return self.handle_conflict(from_number)
             
-            if success:
-                success_message = (
-                    "✅ *¡Reseña enviada exitosamente!*\n\n"
-                    f"Tu reseña para *{session['place_name']}* ya está publicada en Google Maps.\n"
-                    "¡Gracias por compartir tu experiencia!"
-                )
+        try:
+            if len(session.photos) < len(session.media_urls):
+                # Descargas todavía en curso: esperarlas para identificar las fotos por contenido
+                session.photos = self.media.resolve(session.media_urls)
+                
+            job, created = self.job_store.enqueue_once(
+                from_number,
+                {
+                    'place_name': session.place_name,
+                    'rating': session.rating,
+                    'text': session.text,
+                    'photos': session.photos,
+                    'media_urls': session.media_urls
+                },
+                fingerprint=self.session_fingerprint(from_number, session),
+                message_sid=message_sid,
+                max_attempts=self.config.JOB_MAX_ATTEMPTS
+            )
+            if created:
+                self.worker_pool.notify()
             else:
-                error_message = (
-                    "❌ *Error al enviar la reseña*\n\n"
-                    f"Error: {message}\n"
-                    "Por favor, intenta de nuevo más tarde."
-                )
+                self.logger.info("Reseña duplicada de %s, se reutiliza el trabajo %s", from_number, job.job_id)
                 
-            # Limpiar sesión
-            del self.sessions[from_number]
-            
-            self.send_message(from_number, success_message if success else error_message)
-            return success_message if success else error_message
+            return self.reply(from_number, self.describe_job(job))
             
         except Exception as e:
-            self.logger.error(f"Error en submit_to_google_maps: {str(e)}")
-            error_message = "❌ Error interno del bot. Por favor, intenta de nuevo."
-            self.send_message(from_number, error_message)
-            return error_message 
\ No newline at end of file
+            self.logger.error("Error en submit_to_google_maps: %s", e)
+            return self.reply(from_number, messages.INTERNAL_ERROR)
+            
+    def process_submission_job(self, job, account):
+        """Ejecutar la automatización de Google Maps para un trabajo con la cuenta indicada"""
+        automation = GoogleMapsAutomation(
+            account.email,
+            account.password,
+            driver_pool=self.driver_pools.get(account.alias),
+            session_store=self.google_sessions.get(account.alias),
+            wait_timeouts=self.config.WAIT_TIMEOUTS,
+            place_cache=self.place_cache,
+            browser_profile=self.config.BROWSER_PROFILE,
+            chrome_binary=self.config.CHROME_BINARY
+        )
+        
+        payload = job.payload
+        photos = payload['photos']
+        if len(photos) < len(payload.get('media_urls', [])):
+            # Descargas todavía en curso o hechas por otro worker
+            photos = self.media.resolve(payload['media_urls'])
+            
+        trace = None
+        if self.trace_store:
+            trace = self.trace_store.start_trace(job.job_id, job.attempts, account.alias)
+            
+        success, message = automation.process_feedback(
+            payload['place_name'],
+            payload['rating'],
+            payload['text'],
+            photos if photos else None,
+            trace=trace
+        )
+        
+        if trace:
+            self.trace_store.save(trace.finish(success, message))
+        return success, message
+        
+    def notify_submission_result(self, job):
+        """Enviar al usuario el resultado final de un trabajo"""
+        place_name = job.payload['place_name']
+        
+        if job.status == JobStatus.COMPLETED:
+            message = (
+                "✅ *¡Reseña enviada exitosamente!*\n\n"
+                f"Tu reseña para *{place_name}* ya está publicada en Google Maps.\n"
+                "¡Gracias por compartir tu experiencia!"
+            )
+        else:
+            message = (
+                "❌ *Error al enviar la reseña*\n\n"
+                f"Error: {job.error}\n"
+                "Por favor, intenta de nuevo más tarde."
+            )
+            
+        self.notify(job.user_number, message)
+        
+    def get_stats(self):
+        """Estadísticas operativas del bot"""
+        return {
+            'sessions': self.sessions.stats(),
+            'authorization': self.allowlist.stats(),
+            'inbound': self.inbound.stats(),
+            'rate_limit': self.rate_limiter.stats(),
+            'admission': self.admission.stats(),
+            'outbound': self.dispatcher.stats(),
+            'jobs': self.job_store.count_by_status(),
+            'accounts': self.worker_pool.stats(),
+            'driver_pools': {alias: pool.stats() for alias, pool in self.driver_pools.items()},
+            'place_cache': self.place_cache.stats() if self.place_cache else None,
+            'traces': self.trace_store.stats() if self.trace_store else None
+        }
+        
+    def get_job_status(self, job_id):
+        """Consultar el estado de un trabajo de envío (None si no existe)"""
+        job = self.job_store.get(job_id)
+        return job.to_dict() if job else None
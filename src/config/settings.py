@@ -12,13 +12,70 @@ class Config:
     TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
     TWILIO_WHATSAPP_NUMBER = os.getenv('TWILIO_WHATSAPP_NUMBER')
     
+    # Outbound Messages (límite de Twilio por número remitente)
+    OUTBOUND_WORKERS = int(os.getenv('OUTBOUND_WORKERS', '2'))
+    OUTBOUND_RATE_PER_SECOND = float(os.getenv('OUTBOUND_RATE_PER_SECOND', '1'))
+    OUTBOUND_BURST = int(os.getenv('OUTBOUND_BURST', '5'))
+    OUTBOUND_MAX_ATTEMPTS = int(os.getenv('OUTBOUND_MAX_ATTEMPTS', '4'))
+    OUTBOUND_MAX_QUEUE = int(os.getenv('OUTBOUND_MAX_QUEUE', '10000'))
+    TWILIO_HTTP_TIMEOUT = float(os.getenv('TWILIO_HTTP_TIMEOUT', '10'))
+    
     # Google Maps Configuration
     GOOGLE_EMAIL = os.getenv('GOOGLE_EMAIL')
     GOOGLE_PASSWORD = os.getenv('GOOGLE_PASSWORD')
     
+    # Multiple Google Accounts (JSON con [{"email", "password", "concurrency", "cooldown"}])
+    GOOGLE_ACCOUNTS_FILE = os.getenv('GOOGLE_ACCOUNTS_FILE')
+    ACCOUNT_COOLDOWN = float(os.getenv('ACCOUNT_COOLDOWN', '0'))  # Segundos entre envíos de una misma cuenta
+    
+    # Google Session Persistence (sin clave no se guarda la sesión)
+    GOOGLE_SESSION_KEY = os.getenv('GOOGLE_SESSION_KEY')
+    GOOGLE_SESSION_DIR = os.getenv('GOOGLE_SESSION_DIR', 'data/google_sessions')
+    
     # Bot Configuration
     BOT_NAME = "FeedbackBot"
-    ALLOWED_NUMBERS = os.getenv('ALLOWED_NUMBERS', '').split(',')  # Números autorizados
+    # Números autorizados (vacío y sin archivo = cualquier número)
+    ALLOWED_NUMBERS = [number for number in os.getenv('ALLOWED_NUMBERS', '').split(',') if number.strip()]
+    ALLOWED_NUMBERS_FILE = os.getenv('ALLOWED_NUMBERS_FILE')  # Un número por línea, se recarga al cambiar
+    ALLOWED_NUMBERS_RELOAD_INTERVAL = float(os.getenv('ALLOWED_NUMBERS_RELOAD_INTERVAL', '5'))
+    
+    # Photo Ingest Configuration
+    PHOTOS_DIR = os.getenv('PHOTOS_DIR', 'photos')
+    MEDIA_DOWNLOAD_WORKERS = int(os.getenv('MEDIA_DOWNLOAD_WORKERS', '4'))
+    MEDIA_DOWNLOAD_TIMEOUT = int(os.getenv('MEDIA_DOWNLOAD_TIMEOUT', '30'))
+    MEDIA_MAX_BYTES = int(os.getenv('MEDIA_MAX_BYTES', str(16 * 1024 * 1024)))  # Límite de WhatsApp
+    
+    # Photo Normalization (0 procesos = se suben las fotos tal como llegan)
+    PHOTO_PROCESS_WORKERS = int(os.getenv('PHOTO_PROCESS_WORKERS', '2'))
+    PHOTO_MAX_DIMENSION = int(os.getenv('PHOTO_MAX_DIMENSION', '2048'))  # Lado mayor en píxeles
+    PHOTO_JPEG_QUALITY = int(os.getenv('PHOTO_JPEG_QUALITY', '85'))
+    
+    # Session Storage ('memory' = un solo proceso, 'sqlite' = compartido entre workers)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+    SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', 'data/sessions.db')
+    SESSION_IDLE_TIMEOUT = int(os.getenv('SESSION_IDLE_TIMEOUT', '1800'))  # Segundos sin actividad
+    SESSION_MAX_ACTIVE = int(os.getenv('SESSION_MAX_ACTIVE', '10000'))  # Se descartan las menos usadas
+    SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', '60'))
+    
+    # Inbound Deduplication (MessageSid recordados, mismo backend que las sesiones)
+    INBOUND_DEDUP_TTL = int(os.getenv('INBOUND_DEDUP_TTL', '3600'))
+    INBOUND_DEDUP_MAX = int(os.getenv('INBOUND_DEDUP_MAX', '100000'))
+    
+    # Webhook Limits (WhatsApp envía cada foto como un mensaje aparte: ráfaga amplia)
+    SENDER_RATE_PER_MINUTE = float(os.getenv('SENDER_RATE_PER_MINUTE', '30'))
+    SENDER_BURST = int(os.getenv('SENDER_BURST', '20'))
+    WEBHOOK_MAX_CONCURRENT = int(os.getenv('WEBHOOK_MAX_CONCURRENT', '32'))
+    WEBHOOK_MAX_WAITING = int(os.getenv('WEBHOOK_MAX_WAITING', '64'))
+    WEBHOOK_WAIT_TIMEOUT = float(os.getenv('WEBHOOK_WAIT_TIMEOUT', '5'))  # Segundos esperando un lugar
+    
+    # Async Webhook (asgi.py): mensajes esperando sin ocupar hilos
+    ASYNC_MAX_CONCURRENT = int(os.getenv('ASYNC_MAX_CONCURRENT', '1000'))
+    ASYNC_MAX_WAITING = int(os.getenv('ASYNC_MAX_WAITING', '5000'))
+    ASYNC_BLOCKING_WORKERS = int(os.getenv('ASYNC_BLOCKING_WORKERS', '16'))  # Hilos para las transiciones (SQLite)
+    ASYNC_OUTBOUND_CONCURRENCY = int(os.getenv('ASYNC_OUTBOUND_CONCURRENCY', '50'))  # Llamadas a Twilio en curso
+    
+    # Metrics (Prometheus en /metrics; con varios workers definir PROMETHEUS_MULTIPROC_DIR)
+    METRICS_REPORT_INTERVAL = float(os.getenv('METRICS_REPORT_INTERVAL', '15'))  # Segundos entre actualizaciones de gauges
     
     # Session States
     WAITING_FOR_PLACE = "waiting_for_place"
@@ -27,13 +84,75 @@ class Config:
     WAITING_FOR_PHOTOS = "waiting_for_photos"
     CONFIRMING_SUBMISSION = "confirming_submission"
     
+    # Submission Jobs Configuration
+    JOBS_DB_PATH = os.getenv('JOBS_DB_PATH', 'data/jobs.db')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '1'))  # Workers por cuenta de Google (0 = sin procesar)
+    JOB_MAX_CONCURRENT = int(os.getenv('JOB_MAX_CONCURRENT', '0'))  # Entre todas las cuentas, 0 = uno por núcleo
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', '30'))  # Segundos, se duplica en cada intento
+    JOB_RETRY_BACKOFF_MAX = float(os.getenv('JOB_RETRY_BACKOFF_MAX', '600'))
+    JOB_LEASE_TIMEOUT = int(os.getenv('JOB_LEASE_TIMEOUT', '900'))  # Segundos antes de recuperar un trabajo colgado
+    JOB_DEDUP_WINDOW = int(os.getenv('JOB_DEDUP_WINDOW', str(7 * 24 * 3600)))  # Segundos que se recuerda una reseña enviada
+    
+    # Driver Pool Configuration (0 = un navegador nuevo por envío)
+    DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '0'))
+    DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '25'))
+    DRIVER_MAX_MEMORY_MB = int(os.getenv('DRIVER_MAX_MEMORY_MB', '1500'))
+    DRIVER_CHECKOUT_TIMEOUT = int(os.getenv('DRIVER_CHECKOUT_TIMEOUT', '120'))
+    
+    # Chromedriver (se resuelve una vez al arrancar; offline = nunca descargar)
+    CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH')
+    CHROMEDRIVER_OFFLINE = os.getenv('CHROMEDRIVER_OFFLINE', 'False').lower() == 'true'
+    CHROME_BINARY = os.getenv('CHROME_BINARY')
+    
+    # Browser Profile ('production' = headless y liviano, 'debug' = navegador visible)
+    BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'production')
+    
+    # Place Cache Configuration (ruta vacía = sin caché)
+    PLACE_CACHE_PATH = os.getenv('PLACE_CACHE_PATH', 'data/place_cache.json')
+    PLACE_CACHE_TTL = int(os.getenv('PLACE_CACHE_TTL', str(7 * 24 * 3600)))
+    PLACE_CACHE_MAX_ENTRIES = int(os.getenv('PLACE_CACHE_MAX_ENTRIES', '1000'))
+    
+    # Submission Traces (ruta vacía = sin trazas; se consultan en /admin/traces con ADMIN_TOKEN)
+    TRACE_DB_PATH = os.getenv('TRACE_DB_PATH', 'data/traces.db')
+    TRACE_MAX_ENTRIES = int(os.getenv('TRACE_MAX_ENTRIES', '500'))
+    TRACE_MAX_SNAPSHOTS = int(os.getenv('TRACE_MAX_SNAPSHOTS', '50'))  # Capturas de fallos (0 = sin capturas)
+    # Token para los endpoints /admin (vacío = deshabilitados)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    
+    # Automation Wait Timeouts (segundos por paso, p. ej. WAIT_TIMEOUT_SEARCH=20)
+    WAIT_TIMEOUTS = {
+        step: float(os.getenv(f'WAIT_TIMEOUT_{step.upper()}'))
+        for step in ('default', 'login', 'search', 'place', 'review', 'photos', 'submit')
+        if os.getenv(f'WAIT_TIMEOUT_{step.upper()}')
+    }
+    
     # Flask Configuration
     FLASK_ENV = os.getenv('FLASK_ENV', 'production')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Web Server (gunicorn.conf.py). Cada worker es un proceso con su propio bot;
+    # con más de uno hace falta SESSION_BACKEND=sqlite para compartir las sesiones.
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '2'))
+    WEB_WORKER_CLASS = os.getenv('WEB_WORKER_CLASS', 'gthread')  # gthread | gevent (requiere instalar gevent)
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))  # Requests simultáneos por worker (gthread)
+    WEB_WORKER_CONNECTIONS = int(os.getenv('WEB_WORKER_CONNECTIONS', '1000'))  # Conexiones por worker (gevent)
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', '60'))  # Segundos máximos por request
+    # Segundos para terminar los envíos en curso al detenerse
+    SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', '120'))
+    # Candado que elige al único proceso que ejecuta los envíos (vacío = todos los procesos)
+    JOB_WORKERS_LOCK = os.getenv('JOB_WORKERS_LOCK', '')
+    # Candados por remitente compartidos entre procesos (vacío = solo dentro del proceso)
+    SENDER_LOCKS_DIR = os.getenv('SENDER_LOCKS_DIR', '')
+    
     # Logging Configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.getenv('LOG_FILE', 'logs/bot.log')
+    LOG_FILE = os.getenv('LOG_FILE', 'logs/bot.log')  # Vacío = solo consola
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json | text
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))  # Tamaño antes de rotar
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    # Un archivo por proceso (bot.<pid>.log) cuando hay varios workers
+    LOG_FILE_PER_PROCESS = os.getenv('LOG_FILE_PER_PROCESS', 'False').lower() == 'true'
     
     # Docker Configuration
     NGROK_AUTHTOKEN = os.getenv('NGROK_AUTHTOKEN') 
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+Módulo de trabajos de envío asíncronos
+"""
+
+from .job_queue import JobStatus, SubmissionJob, JobStore, SubmissionWorkerPool
+from .scheduler import GoogleAccount, AccountScheduler, load_accounts
+from .fingerprint import review_fingerprint
+
+__all__ = ['JobStatus', 'SubmissionJob', 'JobStore', 'SubmissionWorkerPool',
+           'GoogleAccount', 'AccountScheduler', 'load_accounts', 'review_fingerprint']
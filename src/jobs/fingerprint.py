@@ -0,0 +1,22 @@
+import hashlib
+import json
+from ..automation.place_cache import normalize_place_name
+
+
+def review_fingerprint(user_number, place_name, rating, text, photo_hashes=()):
+    """Huella de una reseña confirmada.
+
+    Combina el usuario, el lugar normalizado, la calificación, el hash del
+    texto (sin diferencias de espacios ni mayúsculas) y los hashes de las
+    fotos sin importar su orden, de modo que confirmar dos veces la misma
+    reseña produce la misma huella.
+    """
+    normalized_text = ' '.join((text or '').lower().split())
+    material = json.dumps([
+        user_number,
+        normalize_place_name(place_name or ''),
+        rating,
+        hashlib.sha256(normalized_text.encode('utf-8')).hexdigest(),
+        sorted(photo_hashes),
+    ])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
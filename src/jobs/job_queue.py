@@ -0,0 +1,518 @@
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from ..utils.database import SQLiteDatabase
+from ..utils.logger import log_context
+from ..utils.metrics import JOBS_FINISHED
+
+
+class JobStatus:
+    """Estados posibles de un trabajo de envío"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    FINAL = (COMPLETED, FAILED)
+    ALL = (PENDING, RUNNING, RETRYING, COMPLETED, FAILED)
+
+
+@dataclass
+class SubmissionJob:
+    """Trabajo de envío de una reseña a Google Maps"""
+
+    job_id: str
+    user_number: str
+    payload: dict
+    status: str = JobStatus.PENDING
+    attempts: int = 0
+    max_attempts: int = 3
+    result: str = None
+    error: str = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    next_attempt_at: float = field(default_factory=time.time)
+    account: str = None  # Cuenta de Google que tomó el último intento
+    lease_token: str = None  # Identifica el intento dueño del lease actual
+
+    @property
+    def is_final(self):
+        return self.status in JobStatus.FINAL
+
+    def to_dict(self):
+        """Representación serializable del trabajo (para consultas de estado)"""
+        data = asdict(self)
+        for key in ('created_at', 'updated_at', 'next_attempt_at'):
+            data[key] = datetime.fromtimestamp(data[key]).isoformat()
+        return data
+
+
+class JobStore:
+    """Almacén durable de trabajos respaldado por SQLite.
+
+    Varios hilos y procesos pueden compartir el mismo archivo: cada hilo usa
+    su propia conexión y la toma de trabajos se hace dentro de una
+    transacción ``BEGIN IMMEDIATE`` para que dos workers nunca obtengan el
+    mismo trabajo.
+
+    Cada toma genera un ``lease_token``: quien ejecuta el trabajo renueva el
+    lease con él (``renew_lease``) y solo registra el resultado si el token
+    sigue siendo el suyo, así un intento que superó ``lease_timeout`` y fue
+    recuperado por otro worker no pisa el estado del intento nuevo.
+    """
+
+    def __init__(self, db_path, lease_timeout=900, dedup_window=7 * 24 * 3600):
+        self.db_path = db_path
+        self.lease_timeout = lease_timeout
+        self.dedup_window = dedup_window
+        self.db = SQLiteDatabase(db_path)
+        self._create_schema()
+
+    def _create_schema(self):
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                user_number TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                next_attempt_at REAL NOT NULL,
+                lease_expires_at REAL,
+                account TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user_number, status);
+
+            -- Índices de deduplicación: misma reseña y mismo mensaje de Twilio
+            CREATE TABLE IF NOT EXISTS job_fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_fingerprints_created ON job_fingerprints (created_at);
+            CREATE TABLE IF NOT EXISTS job_messages (
+                message_sid TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_messages_created ON job_messages (created_at);
+        """)
+        self._add_column('account', 'TEXT')
+        self._add_column('lease_token', 'TEXT')
+
+    def _add_column(self, name, definition):
+        """Agregar una columna a bases creadas por versiones anteriores"""
+        columns = {row['name'] for row in self.db.execute("PRAGMA table_info(jobs)").fetchall()}
+        if name not in columns:
+            self.db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    def _row_to_job(self, row):
+        return SubmissionJob(
+            job_id=row['job_id'],
+            user_number=row['user_number'],
+            payload=json.loads(row['payload']),
+            status=row['status'],
+            attempts=row['attempts'],
+            max_attempts=row['max_attempts'],
+            result=row['result'],
+            error=row['error'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at'],
+            next_attempt_at=row['next_attempt_at'],
+            account=row['account'],
+            lease_token=row['lease_token'],
+        )
+
+    def _insert(self, conn, user_number, payload, max_attempts):
+        job = SubmissionJob(
+            job_id=uuid.uuid4().hex[:12],
+            user_number=user_number,
+            payload=payload,
+            max_attempts=max_attempts,
+        )
+        conn.execute(
+            "INSERT INTO jobs (job_id, user_number, payload, status, attempts, max_attempts, "
+            "created_at, updated_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.job_id, job.user_number, json.dumps(job.payload), job.status, job.attempts,
+             job.max_attempts, job.created_at, job.updated_at, job.next_attempt_at)
+        )
+        return job
+
+    def enqueue(self, user_number, payload, max_attempts=3):
+        """Crear un trabajo pendiente y devolverlo"""
+        return self._insert(self.db.connection(), user_number, payload, max_attempts)
+
+    def enqueue_once(self, user_number, payload, fingerprint, message_sid=None, max_attempts=3):
+        """Encolar una reseña salvo que ya exista un trabajo para ella.
+
+        Devuelve ``(job, created)``. Se reutiliza el trabajo creado por el
+        mismo ``message_sid`` (reintento del webhook de Twilio) o el que tiene
+        la misma huella dentro de ``dedup_window``, salvo que haya fallado:
+        en ese caso la reseña se puede volver a enviar.
+        """
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM job_fingerprints WHERE created_at < ?", (now - self.dedup_window,))
+            conn.execute("DELETE FROM job_messages WHERE created_at < ?", (now - self.dedup_window,))
+
+            row = None
+            if message_sid:
+                row = conn.execute(
+                    "SELECT jobs.* FROM job_messages JOIN jobs USING (job_id) WHERE message_sid = ?",
+                    (message_sid,)
+                ).fetchone()
+            if row is None:
+                row = conn.execute(
+                    "SELECT jobs.* FROM job_fingerprints JOIN jobs USING (job_id) "
+                    "WHERE fingerprint = ? AND jobs.status != ?",
+                    (fingerprint, JobStatus.FAILED)
+                ).fetchone()
+            if row is not None:
+                return self._row_to_job(row), False
+
+            job = self._insert(conn, user_number, payload, max_attempts)
+            conn.execute(
+                "INSERT OR REPLACE INTO job_fingerprints (fingerprint, job_id, created_at) VALUES (?, ?, ?)",
+                (fingerprint, job.job_id, now)
+            )
+            if message_sid:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_messages (message_sid, job_id, created_at) VALUES (?, ?, ?)",
+                    (message_sid, job.job_id, now)
+                )
+        return job, True
+
+    def find_by_message_sid(self, message_sid):
+        """Trabajo creado por un mensaje de Twilio (None si no hay)"""
+        row = self.db.execute(
+            "SELECT jobs.* FROM job_messages JOIN jobs USING (job_id) WHERE message_sid = ?",
+            (message_sid,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get(self, job_id):
+        """Obtener un trabajo por id (None si no existe)"""
+        row = self.db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim_next(self, account=None):
+        """Tomar el siguiente trabajo listo para ejecutarse.
+
+        Incluye trabajos en ``running`` cuyo lease expiró, de forma que los
+        trabajos de un worker caído se recuperan automáticamente. Entre los
+        trabajos listos se prefieren los de usuarios sin envíos en curso, así
+        un usuario con muchas reseñas encoladas no acapara todas las cuentas.
+        ``account`` queda registrada en el trabajo.
+        """
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs "
+                "WHERE (status IN (?, ?) AND next_attempt_at <= ?) "
+                "   OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY (SELECT COUNT(*) FROM jobs AS running "
+                "          WHERE running.user_number = jobs.user_number "
+                "            AND running.status = ? AND running.lease_expires_at >= ?), "
+                "         next_attempt_at LIMIT 1",
+                (JobStatus.PENDING, JobStatus.RETRYING, now, JobStatus.RUNNING, now,
+                 JobStatus.RUNNING, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            lease_token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?, "
+                "lease_expires_at = ?, account = ?, lease_token = ? WHERE job_id = ?",
+                (JobStatus.RUNNING, now, now + self.lease_timeout, account, lease_token, row['job_id'])
+            )
+
+        job = self._row_to_job(row)
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.updated_at = now
+        job.account = account
+        job.lease_token = lease_token
+        return job
+
+    def renew_lease(self, job_id, lease_token):
+        """Extender el lease de un trabajo en curso; False si ya no es de ``lease_token``"""
+        now = time.time()
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+            "WHERE job_id = ? AND status = ? AND lease_token = ?",
+            (now + self.lease_timeout, now, job_id, JobStatus.RUNNING, lease_token)
+        )
+        return cursor.rowcount > 0
+
+    def _update(self, job_id, lease_token=None, **fields):
+        """Actualizar un trabajo; con ``lease_token`` solo si ese intento sigue siendo el dueño"""
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        if lease_token is None:
+            cursor = self.db.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+        else:
+            cursor = self.db.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ? AND lease_token = ?",
+                (*fields.values(), job_id, lease_token)
+            )
+        return cursor.rowcount > 0
+
+    def mark_completed(self, job_id, result, lease_token=None):
+        return self._update(job_id, lease_token, status=JobStatus.COMPLETED, result=result, error=None,
+                            lease_expires_at=None)
+
+    def mark_failed(self, job_id, error, lease_token=None):
+        return self._update(job_id, lease_token, status=JobStatus.FAILED, error=error, lease_expires_at=None)
+
+    def mark_retry(self, job_id, error, delay, lease_token=None):
+        return self._update(job_id, lease_token, status=JobStatus.RETRYING, error=error,
+                            next_attempt_at=time.time() + delay, lease_expires_at=None)
+
+    def count_by_status(self):
+        """Cantidad de trabajos por estado"""
+        rows = self.db.execute(
+            "SELECT status, COUNT(*) AS total FROM jobs GROUP BY status"
+        ).fetchall()
+        return {row['status']: row['total'] for row in rows}
+
+
+class SubmissionWorkerPool:
+    """Pool de hilos que consume trabajos del ``JobStore``.
+
+    Cada trabajo se ejecuta con ``handler(job) -> (success, message)``. Los
+    fallos se reintentan con backoff exponencial (con jitter) hasta agotar
+    ``max_attempts``; al llegar a un estado final se llama a
+    ``on_finished(job)``.
+
+    ``cooldown`` separa (en segundos) el inicio real de dos trabajos del pool
+    (cuando se llama al handler, no cuando se reserva el turno) y
+    ``slots`` (un semáforo compartido) limita los trabajos simultáneos entre
+    varios pools. ``account`` se registra en cada trabajo que toma el pool.
+
+    Mientras el handler se ejecuta, un hilo renueva el lease del trabajo cada
+    ``lease_renew_interval`` segundos (por defecto un tercio del
+    ``lease_timeout`` del almacén), así un envío largo no se recupera como
+    si su worker hubiera muerto.
+    """
+
+    def __init__(self, store, handler, on_finished=None, num_workers=1,
+                 backoff_base=30.0, backoff_max=600.0, poll_interval=2.0,
+                 name="submission", account=None, cooldown=0.0, slots=None,
+                 lease_renew_interval=None):
+        self.store = store
+        self.handler = handler
+        self.on_finished = on_finished
+        self.num_workers = num_workers
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.name = name
+        self.account = account
+        self.cooldown = cooldown
+        self.slots = slots
+        self.lease_renew_interval = lease_renew_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._cooldown_lock = threading.Lock()
+        self._next_start_at = 0.0
+        self._stats_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.busy = 0
+
+    def start(self):
+        """Arrancar los hilos del pool"""
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._run, name=f"{self.name}-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info("Pool de envíos '%s' iniciado con %s worker(s)", self.name, self.num_workers)
+
+    def request_stop(self):
+        """Pedir a los workers que no tomen más trabajos (sin esperar)"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        """Detener el pool esperando a que terminen los trabajos en curso"""
+        self.request_stop()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Despertar a los workers (p. ej. tras encolar un trabajo)"""
+        self._wakeup.set()
+
+    def backoff_delay(self, attempt):
+        """Demora antes del reintento ``attempt`` (1, 2, ...)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _reserve_start(self):
+        """Reservar el próximo inicio; devuelve (segundos a esperar, reserva previa)"""
+        with self._cooldown_lock:
+            now = time.monotonic()
+            if now < self._next_start_at:
+                return self._next_start_at - now, None
+            previous = self._next_start_at
+            self._next_start_at = now + self.cooldown
+            return 0.0, previous
+
+    def _release_start(self, previous):
+        """Devolver la reserva si no había trabajo que ejecutar"""
+        with self._cooldown_lock:
+            self._next_start_at = previous
+
+    def _mark_started(self):
+        """Contar el cooldown desde que el trabajo empieza de verdad (tras tomarlo de la cola)"""
+        with self._cooldown_lock:
+            self._next_start_at = max(self._next_start_at, time.monotonic() + self.cooldown)
+
+    def _claim(self):
+        try:
+            return self.store.claim_next(account=self.account)
+        except Exception as e:
+            self.logger.error("Error obteniendo trabajo: %s", e)
+            return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._run_once()
+            except Exception:
+                # Un error de la base (p. ej. bloqueada) no debe terminar el hilo del worker
+                self.logger.exception("Error en el worker del pool '%s'", self.name)
+                self._stop.wait(self.poll_interval)
+
+    def _run_once(self):
+        """Esperar el turno, tomar un trabajo y ejecutarlo"""
+        delay, previous = self._reserve_start()
+        if delay > 0:
+            self._stop.wait(delay)
+            return
+        if self.slots and not self.slots.acquire(timeout=self.poll_interval):
+            self._release_start(previous)
+            return
+
+        try:
+            job = self._claim()
+            if job is not None:
+                self.run_job(job)
+        finally:
+            if self.slots:
+                self.slots.release()
+
+        if job is None:
+            self._release_start(previous)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _count(self, name, delta=1):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self):
+        """Trabajos en curso y terminados por este pool (contadores por proceso)"""
+        with self._stats_lock:
+            return {
+                'workers': self.num_workers,
+                'busy': self.busy,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def run_job(self, job):
+        """Ejecutar un trabajo y registrar su resultado (los registros llevan su job_id)"""
+        with log_context(job_id=job.job_id):
+            self._run_job(job)
+
+    def _start_heartbeat(self, job):
+        """Renovar el lease del trabajo hasta que se active el evento devuelto"""
+        done = threading.Event()
+        interval = self.lease_renew_interval or getattr(self.store, 'lease_timeout', 0) / 3
+        if job.lease_token is None or interval <= 0:
+            return done
+
+        def renew():
+            with log_context(job_id=job.job_id):
+                while not done.wait(interval):
+                    try:
+                        if not self.store.renew_lease(job.job_id, job.lease_token):
+                            self.logger.warning("El lease del trabajo %s ya no es de este intento", job.job_id)
+                            return
+                    except Exception as e:
+                        self.logger.error("Error renovando el lease del trabajo %s: %s", job.job_id, e)
+
+        threading.Thread(target=renew, name=f"{self.name}-lease", daemon=True).start()
+        return done
+
+    def _run_job(self, job):
+        self.logger.info("Ejecutando trabajo %s (intento %s/%s)", job.job_id, job.attempts, job.max_attempts)
+        self._count('busy', 1)
+        heartbeat = self._start_heartbeat(job)
+        try:
+            self._mark_started()
+            success, message = self.handler(job)
+        except Exception as e:
+            success, message = False, f"Error general: {str(e)}"
+        finally:
+            heartbeat.set()
+            self._count('busy', -1)
+
+        if success:
+            if not self.store.mark_completed(job.job_id, message, lease_token=job.lease_token):
+                return self._lease_lost(job)
+            job.status, job.result = JobStatus.COMPLETED, message
+            self._count('completed')
+            JOBS_FINISHED.labels(JobStatus.COMPLETED).inc()
+        elif job.attempts < job.max_attempts:
+            delay = self.backoff_delay(job.attempts)
+            if not self.store.mark_retry(job.job_id, message, delay, lease_token=job.lease_token):
+                return self._lease_lost(job)
+            JOBS_FINISHED.labels('retry').inc()
+            self.logger.warning("Trabajo %s falló (%s), reintento en %.0fs", job.job_id, message, delay)
+            return
+        else:
+            if not self.store.mark_failed(job.job_id, message, lease_token=job.lease_token):
+                return self._lease_lost(job)
+            job.status, job.error = JobStatus.FAILED, message
+            self._count('failed')
+            JOBS_FINISHED.labels(JobStatus.FAILED).inc()
+            self.logger.error("Trabajo %s falló definitivamente: %s", job.job_id, message)
+
+        if self.on_finished:
+            try:
+                self.on_finished(job)
+            except Exception as e:
+                self.logger.error("Error notificando el trabajo %s: %s", job.job_id, e)
+
+    def _lease_lost(self, job):
+        """El trabajo ya pertenece a otro intento: no se toca su estado ni se notifica"""
+        self.logger.warning(
+            "El trabajo %s lo recuperó otro worker, se descarta el resultado de este intento", job.job_id
+        )
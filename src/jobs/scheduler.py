@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from .job_queue import SubmissionWorkerPool
+
+
+@dataclass
+class GoogleAccount:
+    """Cuenta de Google que publica reseñas"""
+
+    email: str
+    password: str = field(repr=False)
+    concurrency: int = 1  # Navegadores simultáneos con esta cuenta
+    cooldown: float = 0.0  # Segundos mínimos entre dos envíos de la cuenta
+    alias: str = ''  # Nombre público en estadísticas, métricas y trabajos (nunca el email)
+
+
+def load_accounts(path=None, email=None, password=None, concurrency=1, cooldown=0.0):
+    """Cargar las cuentas configuradas.
+
+    ``path`` es un JSON con una lista de objetos ``{"email", "password"}`` y,
+    opcionalmente, ``concurrency``, ``cooldown`` y ``alias`` por cuenta (por
+    defecto ``account-<posición>``). Sin archivo se usa la cuenta única
+    ``email``/``password``.
+    """
+    if not path:
+        return [GoogleAccount(email or '', password or '', concurrency, cooldown, alias='account-0')]
+
+    with open(path, 'r', encoding='utf-8') as accounts_file:
+        entries = json.load(accounts_file)
+
+    accounts = []
+    for index, entry in enumerate(entries):
+        accounts.append(GoogleAccount(
+            email=entry['email'],
+            password=entry['password'],
+            concurrency=int(entry.get('concurrency', concurrency)),
+            cooldown=float(entry.get('cooldown', cooldown)),
+            alias=entry.get('alias') or f"account-{index}"
+        ))
+    if len({account.email for account in accounts}) != len(accounts):
+        raise ValueError(f"Cuentas de Google repetidas en {path}")
+    if len({account.alias for account in accounts}) != len(accounts):
+        raise ValueError(f"Alias de cuentas repetidos en {path}")
+    return accounts
+
+
+class AccountScheduler:
+    """Reparte los trabajos de la cola entre varias cuentas de Google.
+
+    Cada cuenta tiene su propio ``SubmissionWorkerPool`` con tantos workers
+    como su ``concurrency`` y su ``cooldown`` entre envíos; todos toman
+    trabajos del mismo ``JobStore`` (que ya prioriza a los usuarios sin
+    envíos en curso). ``max_concurrent`` limita los navegadores simultáneos
+    entre todas las cuentas, por defecto uno por núcleo.
+
+    ``handler(job, account) -> (success, message)`` ejecuta cada trabajo con
+    la cuenta del worker que lo tomó. Los pools, sus estadísticas y los
+    trabajos se identifican por el alias de la cuenta, no por su email.
+    """
+
+    def __init__(self, store, accounts, handler, on_finished=None, max_concurrent=None,
+                 backoff_base=30.0, backoff_max=600.0, poll_interval=2.0):
+        self.store = store
+        self.accounts = list(accounts)
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.logger = logging.getLogger(__name__)
+
+        slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.pools = {}
+        for index, account in enumerate(self.accounts):
+            alias = account.alias or f"account-{index}"
+            self.pools[alias] = SubmissionWorkerPool(
+                store,
+                handler=lambda job, account=account: handler(job, account),
+                on_finished=on_finished,
+                num_workers=account.concurrency,
+                backoff_base=backoff_base,
+                backoff_max=backoff_max,
+                poll_interval=poll_interval,
+                name=f"account-{index}",
+                account=alias,
+                cooldown=account.cooldown,
+                slots=slots
+            )
+
+    @property
+    def num_workers(self):
+        return sum(pool.num_workers for pool in self.pools.values())
+
+    def start(self):
+        """Arrancar los workers de todas las cuentas"""
+        for pool in self.pools.values():
+            pool.start()
+        self.logger.info(
+            "Planificador iniciado: %s cuenta(s), %s worker(s), máximo %s envío(s) simultáneo(s)",
+            len(self.pools), self.num_workers, self.max_concurrent
+        )
+
+    def stop(self, timeout=None):
+        """Detener los workers esperando los envíos en curso"""
+        for pool in self.pools.values():
+            pool.request_stop()
+        for pool in self.pools.values():
+            pool.stop(timeout)
+
+    def notify(self):
+        """Despertar a los workers de todas las cuentas"""
+        for pool in self.pools.values():
+            pool.notify()
+
+    def stats(self):
+        """Métricas por cuenta"""
+        return {alias: pool.stats() for alias, pool in self.pools.items()}
@@ -0,0 +1,8 @@
+"""
+Módulo de ingesta de fotos de las reseñas
+"""
+
+from .ingest import MediaIngest, content_hash
+from .processing import PhotoProcessor, normalize_photo
+
+__all__ = ['MediaIngest', 'content_hash', 'PhotoProcessor', 'normalize_photo']
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+
+# Tipos de imagen aceptados y su extensión en disco
+IMAGE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/heic': '.heic',
+}
+
+
+def content_hash(path):
+    """SHA-256 del contenido original de una foto, tomado de su nombre.
+
+    Las descargas se guardan como ``<sha256>.<ext>`` y las fotos normalizadas
+    como ``<sha256>_<parámetros>.jpg``, así que no hace falta volver a leerlas.
+    """
+    return os.path.basename(path).split('.', 1)[0].split('_', 1)[0]
+
+
+class MediaIngest:
+    """Descarga concurrente de las fotos de WhatsApp al directorio de fotos.
+
+    Las descargas empiezan en cuanto llega el mensaje y se hacen en un pool
+    de hilos que comparte una sesión HTTP con pool de conexiones. Cada
+    archivo se guarda en streaming y se nombra por el SHA-256 de su
+    contenido, de modo que la misma foto enviada dos veces ocupa un único
+    archivo. Con un ``processor`` (``PhotoProcessor``) cada descarga se
+    normaliza antes de darse por terminada y la ruta devuelta es la de la
+    foto procesada.
+    """
+
+    def __init__(self, photos_dir, auth=None, max_workers=4, timeout=30,
+                 max_bytes=16 * 1024 * 1024, max_tracked=1000, processor=None):
+        self.photos_dir = photos_dir
+        self.processor = processor
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_tracked = max_tracked
+        self.logger = logging.getLogger(__name__)
+
+        self.http = requests.Session()
+        self.http.auth = auth
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=2)
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='media-download')
+        self._downloads = OrderedDict()  # url -> Future con la ruta local
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(photos_dir, '.tmp'), exist_ok=True)
+
+    def _download(self, url):
+        tmp_path = os.path.join(self.photos_dir, '.tmp', uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with self.http.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+                extension = IMAGE_EXTENSIONS.get(content_type)
+                if extension is None:
+                    raise ValueError(f"Tipo de archivo no soportado: {content_type or 'desconocido'}")
+
+                with open(tmp_path, 'wb') as media_file:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise ValueError(f"La foto supera el máximo de {self.max_bytes} bytes")
+                        digest.update(chunk)
+                        media_file.write(chunk)
+
+            final_path = os.path.join(self.photos_dir, f"{digest.hexdigest()}{extension}")
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+            self.logger.info("Foto descargada: %s (%s bytes)", final_path, size)
+            final_path = os.path.abspath(final_path)
+            if self.processor:
+                final_path = os.path.abspath(self.processor.process(final_path))
+            return final_path
+
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _future_for(self, url):
+        with self._lock:
+            future = self._downloads.get(url)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self.executor.submit(self._download, url)
+                self._downloads[url] = future
+                while len(self._downloads) > self.max_tracked:
+                    self._downloads.popitem(last=False)
+            return future
+
+    def prefetch(self, urls, on_complete=None):
+        """Empezar a descargar las URLs sin bloquear.
+
+        ``on_complete(paths)`` se llama cuando terminan todas, con las rutas
+        locales de las que se descargaron correctamente (en el mismo orden).
+        """
+        futures = [self._future_for(url) for url in urls]
+        if on_complete:
+            remaining = [len(futures)]
+            lock = threading.Lock()
+
+            def done(_):
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0]:
+                        return
+                try:
+                    on_complete(self._collect(urls, futures))
+                except Exception as e:
+                    self.logger.error("Error registrando fotos descargadas: %s", e)
+
+            for future in futures:
+                future.add_done_callback(done)
+        return futures
+
+    def _collect(self, urls, futures):
+        paths = []
+        for url, future in zip(urls, futures):
+            if future.done() and future.exception() is None:
+                paths.append(future.result())
+            else:
+                error = future.exception() if future.done() else 'tiempo agotado'
+                self.logger.error("Error descargando foto %s: %s", url, error)
+        return paths
+
+    def resolve(self, urls, timeout=None):
+        """Rutas locales de las URLs, esperando las descargas pendientes"""
+        futures = [self._future_for(url) for url in urls]
+        wait(futures, timeout=timeout if timeout is not None else self.timeout * 2)
+        return self._collect(urls, futures)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.http.close()
+        if self.processor:
+            self.processor.close()
@@ -0,0 +1,106 @@
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from .ingest import content_hash
+
+
+def normalize_photo(source_path, output_dir, max_dimension=2048, quality=85):
+    """Normalizar una foto para subirla a Google Maps.
+
+    Aplica la orientación EXIF, descarta los metadatos (EXIF, GPS, perfiles),
+    reduce el lado mayor a ``max_dimension`` y la recodifica como JPEG con
+    calidad ``quality``. El resultado se guarda por hash del archivo original
+    (el nombre que le da ``MediaIngest``, sin volver a leerlo) y parámetros,
+    así que procesar la misma foto otra vez no tiene costo.
+
+    Es una función de módulo para poder ejecutarse en un ``ProcessPoolExecutor``.
+    """
+    source_hash = content_hash(source_path)
+    output_path = os.path.join(output_dir, f"{source_hash}_{max_dimension}q{quality}.jpg")
+    if os.path.exists(output_path):
+        return output_path
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        # Sin exif= ni icc_profile= el JPEG se guarda sin metadatos
+        tmp_path = os.path.join(output_dir, f".{uuid.uuid4().hex}.tmp")
+        try:
+            image.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            # Un guardado a medias no debe quedar en el directorio de fotos
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    return output_path
+
+
+class PhotoProcessor:
+    """Normalización de fotos en un pool de procesos (fuera del hilo del request)"""
+
+    def __init__(self, output_dir, max_dimension=2048, quality=85, max_workers=2):
+        self.output_dir = output_dir
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    @property
+    def executor(self):
+        # Se crea al primer uso y con 'spawn' para no heredar hilos del proceso web.
+        # Varios hilos del webhook pueden llegar a la vez: solo uno lo crea
+        executor = self._executor
+        if executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                executor = self._executor
+        return executor
+
+    def submit(self, source_path):
+        """Encolar una foto y devolver el Future con la ruta normalizada"""
+        return self.executor.submit(
+            normalize_photo, source_path, self.output_dir, self.max_dimension, self.quality
+        )
+
+    def process(self, source_path, timeout=120):
+        """Normalizar una foto; si falla se usa el archivo original"""
+        try:
+            output_path = self.submit(source_path).result(timeout=timeout)
+        except Exception as e:
+            self.logger.error("Error normalizando foto %s: %s", source_path, e)
+            return source_path
+
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Foto normalizada: %s -> %s bytes", os.path.getsize(source_path), os.path.getsize(output_path)
+            )
+        return output_path
+
+    def close(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteDatabase:
+    """Acceso a un archivo SQLite compartido entre hilos y procesos.
+
+    Cada hilo usa su propia conexión en modo autocommit con WAL activado;
+    ``transaction()`` abre una transacción ``BEGIN IMMEDIATE`` para las
+    operaciones de lectura-modificación-escritura.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def executescript(self, script):
+        return self.connection().executescript(script)
+
+    @contextmanager
+    def transaction(self):
+        """Transacción con bloqueo de escritura tomado desde el inicio"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
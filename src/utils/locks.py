@@ -0,0 +1,150 @@
+import asyncio
+import fcntl
+import os
+import threading
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+
+
+class KeyedLock:
+    """Exclusión mutua por clave, atendiendo a los hilos en orden de llegada.
+
+    Solo se serializan los hilos que usan la misma clave; el candado interno
+    se toma brevemente para repartir turnos y se libera mientras se espera.
+    Las claves sin hilos esperando se eliminan, así que la memoria usada es
+    proporcional a las claves activas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # clave -> [condición, próximo turno, turno atendido, hilos usando la clave]
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [threading.Condition(self._lock), 0, 0, 0]
+                self._entries[key] = entry
+            condition = entry[0]
+            ticket = entry[1]
+            entry[1] += 1
+            entry[3] += 1
+            while entry[2] != ticket:
+                condition.wait()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                entry[2] += 1
+                entry[3] -= 1
+                if entry[3] == 0:
+                    del self._entries[key]
+                else:
+                    condition.notify_all()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class AsyncKeyedLock:
+    """Versión asyncio de ``KeyedLock`` (un solo event loop).
+
+    Cada clave tiene un ``asyncio.Lock``, que atiende a las corrutinas en
+    orden de llegada; las claves sin corrutinas esperando se eliminan.
+    """
+
+    def __init__(self):
+        self._entries = {}  # clave -> [candado, corrutinas usando la clave]
+
+    @asynccontextmanager
+    async def hold(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._entries[key] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ProcessLock:
+    """Candado exclusivo entre procesos sobre un archivo (``flock``).
+
+    El sistema operativo lo libera si el proceso muere, así que otro proceso
+    esperando en ``acquire()`` lo toma sin intervención.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def acquire(self, blocking=True):
+        """Tomar el candado; con ``blocking=False`` devuelve False si está ocupado"""
+        if self._file is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class ProcessKeyedLock:
+    """Exclusión mutua por clave entre procesos (varios workers de gunicorn).
+
+    Dentro del proceso los hilos se ordenan con un ``KeyedLock``; entre
+    procesos, cada clave se asigna a uno de ``stripes`` archivos del
+    directorio (por un hash estable) y se toma su ``ProcessLock``. Dos claves
+    distintas pueden compartir archivo y esperarse entre sí, pero la cantidad
+    de archivos no crece con las claves.
+    """
+
+    def __init__(self, directory, stripes=256):
+        self.directory = directory
+        self.stripes = stripes
+        self._local = KeyedLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        index = zlib.crc32(str(key).encode('utf-8')) % self.stripes
+        return os.path.join(self.directory, f"{index:03d}.lock")
+
+    @contextmanager
+    def hold(self, key):
+        with self._local.hold(key):
+            lock = ProcessLock(self.path_for(key))
+            lock.acquire()
+            try:
+                yield
+            finally:
+                lock.release()
+
+    def __len__(self):
+        return len(self._local)
@@ -1,55 +1,184 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Identificadores del mensaje o trabajo en curso (se propagan a hilos con copy_context)
+request_id_var = contextvars.ContextVar('request_id', default=None)
+job_id_var = contextvars.ContextVar('job_id', default=None)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s%(context)s'
+
+_lock = threading.Lock()
+_listener = None
+
+
+@contextmanager
+def log_context(request_id=None, job_id=None):
+    """Asociar los registros emitidos dentro del bloque a un mensaje o trabajo"""
+    tokens = []
+    if request_id is not None:
+        tokens.append((request_id_var, request_id_var.set(request_id)))
+    if job_id is not None:
+        tokens.append((job_id_var, job_id_var.set(job_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copia los identificadores del contexto al registro en el hilo que lo emite"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.job_id = job_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for field in ('request_id', 'job_id'):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato de texto con los identificadores al final, si los hay"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record):
+        ids = [
+            f"{field}={getattr(record, field)}" for field in ('request_id', 'job_id')
+            if getattr(record, field, None) is not None
+        ]
+        record.context = f" [{' '.join(ids)}]" if ids else ''
+        return super().format(record)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` que conserva ``exc_info`` formateado y los campos del contexto"""
+
+    def prepare(self, record):
+        # Resolver el mensaje y la traza aquí: los argumentos pueden cambiar después
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _process_log_file(log_file):
+    root, extension = os.path.splitext(log_file)
+    return f"{root}.{os.getpid()}{extension}"
+
+
+def configure_logging(level='INFO', log_file=None, json_format=True, max_bytes=10 * 1024 * 1024,
+                      backup_count=5, per_process=False):
+    """Configurar el logging del proceso una sola vez.
+
+    Los registros se encolan con un ``QueueHandler`` y un único hilo
+    (``QueueListener``) los escribe en consola y en ``log_file`` con rotación
+    por tamaño, así quien registra nunca espera al disco. Con ``per_process``
+    cada proceso escribe su propio archivo (``bot.<pid>.log``) para que varios
+    workers no roten el mismo. Las llamadas siguientes no hacen nada.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = JsonFormatter() if json_format else TextFormatter()
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            if per_process:
+                log_file = _process_log_file(log_file)
+            log_dir = os.path.dirname(log_file)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Escribir los registros pendientes y detener el hilo de logging"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
 
 def setup_logger(name, log_file=None, level=logging.INFO):
-    """Configurar logger personalizado"""
-    
-    # Crear logger
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
-    # Evitar duplicar handlers
-    if logger.handlers:
-        return logger
-    
-    # Crear formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Handler para consola
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # Handler para archivo (opcional)
-    if log_file:
-        # Crear directorio de logs si no existe
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
-    return logger
+    """Logger con nombre.
+
+    No configura nada: el logging del proceso lo configuran los puntos de
+    entrada (``app.create_app``, ``asgi.create_asgi_app``) con
+    ``configure_logging``. ``log_file`` y ``level`` se aceptan por
+    compatibilidad y se ignoran.
+    """
+    return logging.getLogger(name)
+
 
 def get_bot_logger():
-    """Obtener logger específico para el bot"""
-    return setup_logger(
-        'whatsapp_feedback_bot',
-        'logs/bot.log',
-        logging.INFO
-    )
+    """Obsoleto: usar ``logging.getLogger(__name__)`` tras ``configure_logging``"""
+    warnings.warn("get_bot_logger está obsoleto; usar logging.getLogger", DeprecationWarning, stacklevel=2)
+    return setup_logger('whatsapp_feedback_bot')
+
 
 def get_automation_logger():
-    """Obtener logger específico para automatización"""
-    return setup_logger(
-        'google_maps_automation',
-        'logs/automation.log',
-        logging.INFO
-    ) 
\ No newline at end of file
+    """Obsoleto: usar ``logging.getLogger(__name__)`` tras ``configure_logging``.
+
+    El logging se configura una vez por proceso en los puntos de entrada,
+    así que ya no hay un archivo ``logs/automation.log`` aparte.
+    """
+    warnings.warn("get_automation_logger está obsoleto; usar logging.getLogger", DeprecationWarning, stacklevel=2)
+    return setup_logger('google_maps_automation')
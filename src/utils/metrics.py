@@ -0,0 +1,157 @@
+import functools
+import logging
+import os
+import threading
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+# Con varios workers (gunicorn) PROMETHEUS_MULTIPROC_DIR debe estar definido
+# antes de importar este módulo: cada proceso escribe sus métricas en ese
+# directorio y /metrics las agrega.
+
+WEBHOOK_LATENCY = Histogram(
+    'feedback_webhook_latency_seconds',
+    'Tiempo de procesamiento de un mensaje entrante por estado de la sesión',
+    ['state'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+WEBHOOK_REQUEST_LATENCY = Histogram(
+    'feedback_webhook_request_seconds',
+    'Tiempo total de un mensaje entrante (admisión, turno, sesión y transición) por resultado',
+    ['outcome'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+WEBHOOK_REJECTED = Counter(
+    'feedback_webhook_rejected_total',
+    'Mensajes entrantes rechazados antes de procesarse',
+    ['reason']
+)
+TWILIO_SEND_LATENCY = Histogram(
+    'feedback_twilio_send_seconds',
+    'Duración de cada llamada a la API REST de Twilio',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+TWILIO_SEND_ERRORS = Counter(
+    'feedback_twilio_send_errors_total',
+    'Errores al enviar mensajes por Twilio, por código HTTP',
+    ['status']
+)
+AUTOMATION_STEP = Histogram(
+    'feedback_automation_step_seconds',
+    'Duración de cada paso de la automatización de Google Maps',
+    ['step', 'outcome'],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+)
+JOBS_FINISHED = Counter(
+    'feedback_jobs_finished_total',
+    'Intentos de envío terminados por resultado',
+    ['status']
+)
+
+# Valores globales (SQLite): todos los workers informan lo mismo
+SESSIONS_ACTIVE = Gauge(
+    'feedback_sessions_active', 'Sesiones de conversación activas', multiprocess_mode='max'
+)
+JOBS = Gauge(
+    'feedback_jobs', 'Trabajos de envío por estado', ['status'], multiprocess_mode='max'
+)
+# Valores por proceso: se suman los de los workers vivos
+OUTBOUND_QUEUE_DEPTH = Gauge(
+    'feedback_outbound_queue_depth', 'Mensajes salientes en cola', multiprocess_mode='livesum'
+)
+WEBHOOK_IN_FLIGHT = Gauge(
+    'feedback_webhook_in_flight', 'Mensajes entrantes en proceso', multiprocess_mode='livesum'
+)
+DRIVER_POOL_BROWSERS = Gauge(
+    'feedback_driver_pool_browsers', 'Navegadores del pool por cuenta y estado',
+    ['account', 'state'], multiprocess_mode='livesum'
+)
+
+
+def timed_step(step):
+    """Decorador que mide un paso de la automatización.
+
+    El resultado es ``error`` si el método devuelve ``False`` o lanza una
+    excepción y ``ok`` en cualquier otro caso.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = method(*args, **kwargs)
+                if result is not False:
+                    outcome = 'ok'
+                return result
+            finally:
+                AUTOMATION_STEP.labels(step, outcome).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def update_gauges(stats):
+    """Actualizar los gauges con el resultado de ``WhatsAppBot.get_stats()``"""
+    # Import diferido: job_queue importa este módulo
+    from ..jobs.job_queue import JobStatus
+
+    SESSIONS_ACTIVE.set(stats['sessions']['active'])
+    OUTBOUND_QUEUE_DEPTH.set(stats['outbound']['queue_depth'])
+    WEBHOOK_IN_FLIGHT.set(stats['admission']['in_flight'])
+    # Todos los estados, para que uno que quedó vacío vuelva a 0
+    for status in JobStatus.ALL:
+        JOBS.labels(status).set(stats['jobs'].get(status, 0))
+    for account, pool in stats['driver_pools'].items():
+        DRIVER_POOL_BROWSERS.labels(account, 'idle').set(pool['idle'])
+        DRIVER_POOL_BROWSERS.labels(account, 'leased').set(pool['leased'])
+
+
+def render_metrics():
+    """Cuerpo y content type de la respuesta de /metrics"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsReporter:
+    """Hilo que actualiza periódicamente los gauges de este proceso.
+
+    Los gauges se escriben fuera del camino de cada request, así leer
+    /metrics no consulta la base de datos ni bloquea a los workers.
+    """
+
+    def __init__(self, collect, interval=15):
+        self.collect = collect
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def report(self):
+        try:
+            update_gauges(self.collect())
+        except Exception as e:
+            self.logger.error("Error actualizando métricas: %s", e)
+
+    def _run(self):
+        self.report()
+        while not self._stop.wait(self.interval):
+            self.report()
@@ -0,0 +1,26 @@
+"""
+Fixtures compartidas por los tests
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.config import Config
+
+@pytest.fixture
+def bot_config(monkeypatch, tmp_path):
+    """Configuración aislada para crear un WhatsAppBot sin servicios externos"""
+    monkeypatch.setattr(Config, 'TWILIO_ACCOUNT_SID', 'ACtest')
+    monkeypatch.setattr(Config, 'TWILIO_AUTH_TOKEN', 'token')
+    monkeypatch.setattr(Config, 'ALLOWED_NUMBERS', ['+1234567890'])
+    monkeypatch.setattr(Config, 'SESSION_BACKEND', 'memory')
+    monkeypatch.setattr(Config, 'JOBS_DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(Config, 'PLACE_CACHE_PATH', '')
+    monkeypatch.setattr(Config, 'TRACE_DB_PATH', '')
+    monkeypatch.setattr(Config, 'DRIVER_POOL_SIZE', 0)
+    monkeypatch.setattr(Config, 'PHOTOS_DIR', str(tmp_path / 'photos'))
+    monkeypatch.setattr(Config, 'JOB_WORKERS_LOCK', str(tmp_path / 'job-workers.lock'))
+    return Config
@@ -0,0 +1,37 @@
+"""
+Dobles compartidos por varios archivos de tests
+"""
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * 200000
+
+class FakeResponse:
+    def __init__(self, body, content_type):
+        self.body = body
+        self.headers = {'Content-Type': content_type}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+class FakeHttp:
+    """Sesión HTTP falsa que sirve contenidos por URL"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url, stream, timeout):
+        self.requested.append(url)
+        return FakeResponse(*self.responses[url])
+
+    def close(self):
+        pass
@@ -0,0 +1,53 @@
+"""
+Tests para los límites del webhook
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.bot.admission import SenderRateLimiter, AdmissionController
+
+def test_rate_limiter_is_per_sender():
+    """Test para limitar a un remitente sin afectar a los demás"""
+    limiter = SenderRateLimiter(rate_per_minute=0.001, burst=2)
+
+    assert limiter.allow('+111') and limiter.allow('+111')
+    assert not limiter.allow('+111')
+    assert limiter.allow('+222')
+    assert limiter.stats() == {'tracked_senders': 2, 'rejected': 1}
+
+def test_rate_limiter_is_bounded():
+    """Test para no guardar buckets de infinitos remitentes"""
+    limiter = SenderRateLimiter(burst=1, max_senders=2)
+    for sender in ('+1', '+2', '+3'):
+        limiter.allow(sender)
+
+    assert limiter.stats()['tracked_senders'] == 2
+    # El más antiguo se olvidó y vuelve con el bucket lleno
+    assert limiter.allow('+1')
+
+def test_admission_rejects_when_queue_is_full():
+    """Test para rechazar sin esperar cuando la cola de espera está llena"""
+    admission = AdmissionController(max_concurrent=1, max_waiting=0, wait_timeout=1)
+
+    assert admission.acquire()
+    assert not admission.acquire()
+    admission.release()
+    assert admission.acquire()
+    assert admission.stats()['rejected_queue_full'] == 1
+
+def test_admission_waits_for_a_slot():
+    """Test para esperar un lugar libre y rechazar al agotar el tiempo"""
+    admission = AdmissionController(max_concurrent=1, max_waiting=5, wait_timeout=0.05)
+    assert admission.acquire()
+    assert not admission.acquire()
+    assert admission.stats()['rejected_timeout'] == 1
+
+    admission.wait_timeout = 5
+    timer = threading.Timer(0.05, admission.release)
+    timer.start()
+    assert admission.acquire()
+    timer.join()
+    assert admission.stats()['in_flight'] == 1
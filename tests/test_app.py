@@ -0,0 +1,146 @@
+"""
+Tests para la aplicación web y el arranque por worker
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.config import Config
+from src.bot import WhatsAppBot
+from src.utils.locks import ProcessLock, ProcessKeyedLock
+from src.automation import TraceStore
+from app import create_app
+
+@pytest.fixture
+def bot(bot_config, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_WORKERS', 0)
+    bot = WhatsAppBot()
+    yield bot
+    bot.stop_workers(timeout=5)
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_factory_builds_independent_apps(bot):
+    """Test para crear la app con su propio bot y sus rutas"""
+    app = create_app(bot, start_workers=False)
+    client = app.test_client()
+
+    assert app.extensions['whatsapp_bot'] is bot
+    assert client.get('/health').json['status'] == 'healthy'
+    assert client.get('/metrics').status_code == 200
+
+    reply = client.post('/webhook', data={'From': 'whatsapp:+999', 'Body': 'hola'})
+    assert 'no tienes autorización' in reply.get_data(as_text=True)
+
+def test_admin_traces_require_token(bot, monkeypatch, tmp_path):
+    """Test para consultar las trazas solo con el token de administración"""
+    client = create_app(bot, start_workers=False).test_client()
+    bot.trace_store = TraceStore(str(tmp_path / 'traces.db'))
+    trace = bot.trace_store.start_trace(job_id='job-1', attempt=1)
+    trace.snapshots = {'dom': ('text/html; charset=utf-8', 'gzip', b'html')}
+    bot.trace_store.save(trace.finish(False, "Error buscando el lugar"))
+
+    assert client.get('/admin/traces').status_code == 404
+    monkeypatch.setattr(Config, 'ADMIN_TOKEN', 'secreto')
+    assert client.get('/admin/traces').status_code == 401
+    assert client.get('/admin/traces', headers={'Authorization': 'Bearer otro'}).status_code == 401
+
+    headers = {'Authorization': 'Bearer secreto'}
+    listed = client.get('/admin/traces?status=error', headers=headers).json['traces']
+    assert [entry['trace_id'] for entry in listed] == [trace.trace_id]
+    assert client.get(f'/admin/traces/{trace.trace_id}', headers=headers).json['error'] == "Error buscando el lugar"
+    assert client.get('/admin/traces/summary', headers=headers).json['traces'] == 1
+    dom = client.get(f'/admin/traces/{trace.trace_id}/dom', headers=headers)
+    assert dom.headers['Content-Encoding'] == 'gzip'
+    assert 'attachment' in dom.headers['Content-Disposition']
+    assert client.get(f'/admin/traces/{trace.trace_id}/screenshot', headers=headers).status_code == 404
+
+def test_process_lock_is_exclusive(tmp_path):
+    """Test para que un solo proceso tenga el candado a la vez"""
+    path = str(tmp_path / 'locks' / 'job-workers.lock')
+    first, second = ProcessLock(path), ProcessLock(path)
+
+    assert first.acquire(blocking=False)
+    assert not second.acquire(blocking=False)
+    first.release()
+    assert second.acquire(blocking=False)
+    second.release()
+
+def test_submission_workers_wait_for_lock(bot):
+    """Test para que otro proceso tome los envíos cuando el actual termina"""
+    other_process = ProcessLock(Config.JOB_WORKERS_LOCK)
+    assert other_process.acquire(blocking=False)
+
+    bot.start_workers()
+    try:
+        time.sleep(0.05)
+        assert not bot.submission_lock.held
+
+        other_process.release()
+        assert wait_until(lambda: bot.submission_lock.held)
+    finally:
+        bot.stop_workers(timeout=5)
+
+    # Al detenerse lo libera para el siguiente proceso
+    assert other_process.acquire(blocking=False)
+    other_process.release()
+
+def test_sender_turns_are_shared_between_processes(tmp_path):
+    """Test para que dos candados sobre el mismo directorio se excluyan como lo harían dos workers"""
+    first, second = ProcessKeyedLock(str(tmp_path / 'senders')), ProcessKeyedLock(str(tmp_path / 'senders'))
+    entered = threading.Event()
+
+    def other_worker():
+        with second.hold('+1234567890'):
+            entered.set()
+
+    with first.hold('+1234567890'):
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        assert not entered.wait(0.2)
+    assert entered.wait(5)
+    thread.join(5)
+    assert len(first) == len(second) == 0
+
+def test_concurrent_messages_across_workers_do_not_conflict(bot, monkeypatch, tmp_path):
+    """Test para que dos workers atiendan por turno los mensajes simultáneos de un usuario"""
+    monkeypatch.setattr(Config, 'SESSION_BACKEND', 'sqlite')
+    monkeypatch.setattr(Config, 'SESSION_DB_PATH', str(tmp_path / 'sessions.db'))
+    monkeypatch.setattr(Config, 'SENDER_LOCKS_DIR', str(tmp_path / 'senders'))
+    first, second = WhatsAppBot(), WhatsAppBot()
+    try:
+        first.handle_incoming_message('+1234567890', "hola", [])
+
+        # El primer worker se demora entre leer la sesión y guardarla
+        read = threading.Event()
+        get_user_session = first.get_user_session
+        def slow_get_user_session(user_number):
+            session = get_user_session(user_number)
+            read.set()
+            time.sleep(0.2)
+            return session
+        first.get_user_session = slow_get_user_session
+
+        replies = {}
+        thread = threading.Thread(
+            target=lambda: replies.update(first=first.handle_incoming_message('+1234567890', "Café XYZ", []))
+        )
+        thread.start()
+        assert read.wait(5)
+        replies['second'] = second.handle_incoming_message('+1234567890', "5", [])
+        thread.join(5)
+
+        assert "*Café XYZ*" in replies['first']
+        assert "⭐⭐⭐⭐⭐" in replies['second']
+    finally:
+        first.stop_workers(timeout=5)
+        second.stop_workers(timeout=5)
@@ -0,0 +1,189 @@
+"""
+Tests para el webhook asíncrono
+"""
+
+import sys
+import os
+import asyncio
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import httpx
+import pytest
+from twilio.base.exceptions import TwilioRestException
+
+from src.bot import AsyncWhatsAppBot, WhatsAppBot
+from src.bot.admission import AsyncAdmissionController
+from src.bot.authorization import Allowlist
+from src.bot.async_dispatcher import AsyncOutboundDispatcher
+from src.utils.locks import AsyncKeyedLock
+from asgi import create_asgi_app
+
+USER = '+1234567890'
+
+class FakeAsyncMessages:
+    """Registro de los mensajes enviados con ``create_async``"""
+
+    def __init__(self, failures=0):
+        self.sent = []
+        self.failures = failures
+
+    async def create_async(self, from_, body, to):
+        await asyncio.sleep(0)
+        if self.failures:
+            self.failures -= 1
+            raise TwilioRestException(503, 'https://api.twilio.com', "Service Unavailable")
+        self.sent.append((to, body))
+
+class FakeHttpClient:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+class FakeAsyncClient:
+    def __init__(self, failures=0):
+        self.messages = FakeAsyncMessages(failures)
+        self.http_client = FakeHttpClient()
+
+@pytest.fixture
+def async_bot(bot_config):
+    async_bot = AsyncWhatsAppBot(WhatsAppBot())
+    yield async_bot
+    async_bot.executor.shutdown(wait=True)
+
+def test_async_keyed_lock_serializes_in_order():
+    """Test para atender en orden las corrutinas de una misma clave"""
+    locks = AsyncKeyedLock()
+    order = []
+
+    async def worker(index):
+        async with locks.hold('+111'):
+            await asyncio.sleep(0.01 if index == 0 else 0)
+            order.append(index)
+
+    async def main():
+        await asyncio.gather(*(worker(index) for index in range(4)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3]
+    assert len(locks) == 0
+
+def test_async_admission_rejects_when_saturated():
+    """Test para rechazar sin bloquear el event loop cuando no hay lugar"""
+    async def main():
+        admission = AsyncAdmissionController(max_concurrent=1, max_waiting=1, wait_timeout=0.05)
+        assert await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert not await admission.acquire()  # Cola de espera llena
+        assert not await waiting  # Se agotó la espera
+        admission.release()
+        assert await admission.acquire()
+        return admission.stats()
+
+    stats = asyncio.run(main())
+    assert stats['rejected_queue_full'] == 1
+    assert stats['rejected_timeout'] == 1
+    assert stats['in_flight'] == 1
+
+def test_async_conversation_queues_submission(async_bot):
+    """Test para la conversación completa por el camino asíncrono"""
+    async def main():
+        return [
+            await async_bot.handle_incoming_message(USER, message, [])
+            for message in ("hola", "Café XYZ", "5", "Excelente servicio", "sin fotos", "sí")
+        ]
+
+    replies = asyncio.run(main())
+    assert "nombre del lugar" in replies[0]
+    assert "Reseña en cola" in replies[-1]
+    assert async_bot.bot.job_store.count_by_status() == {'pending': 1}
+
+def test_async_senders_are_processed_concurrently(async_bot):
+    """Test para procesar a la vez a muchos remitentes distintos"""
+    senders = [f'+1555000{index:04d}' for index in range(200)]
+    async_bot.bot.allowlist = Allowlist(senders)
+
+    async def main():
+        return await asyncio.gather(*(
+            async_bot.handle_incoming_message(sender, "hola", []) for sender in senders
+        ))
+
+    replies = asyncio.run(main())
+    assert all("nombre del lugar" in reply for reply in replies)
+    assert len(async_bot.bot.sessions) == 200
+
+def test_allowlist_is_refreshed_off_the_event_loop(bot_config, tmp_path, monkeypatch):
+    """Test para recargar la lista de autorizados sin leer el disco en el event loop"""
+    numbers_file = tmp_path / 'allowed.txt'
+    numbers_file.write_text(USER + '\n')
+    monkeypatch.setattr(bot_config, 'ALLOWED_NUMBERS_FILE', str(numbers_file))
+    monkeypatch.setattr(bot_config, 'ALLOWED_NUMBERS_RELOAD_INTERVAL', 0)
+    async_bot = AsyncWhatsAppBot(WhatsAppBot())
+    allowlist = async_bot.bot.allowlist
+    stat_threads = []
+    getmtime = os.path.getmtime
+
+    def recording_getmtime(path):
+        stat_threads.append(threading.current_thread())
+        return getmtime(path)
+
+    monkeypatch.setattr(os.path, 'getmtime', recording_getmtime)
+
+    async def main():
+        loop_thread = threading.current_thread()
+        first = await async_bot.handle_incoming_message('+15550009999', "hola", [])
+        numbers_file.write_text(USER + '\n+15550009999\n')
+        os.utime(numbers_file, (1, 1))
+        refresher = asyncio.create_task(async_bot.refresh_allowlist())
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if allowlist.is_allowed('+15550009999'):
+                break
+        refresher.cancel()
+        second = await async_bot.handle_incoming_message('+15550009999', "hola", [])
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(main())
+    async_bot.executor.shutdown(wait=True)
+    assert "nombre del lugar" not in first
+    assert "nombre del lugar" in second
+    assert stat_threads and loop_thread not in stat_threads
+
+def test_async_dispatcher_retries_and_keeps_order():
+    """Test para reintentar errores 503 y entregar en orden por destinatario"""
+    client = FakeAsyncClient(failures=1)
+
+    async def main():
+        dispatcher = AsyncOutboundDispatcher(
+            lambda: client, '+100', rate_per_second=1000, burst=100, backoff_base=0.001
+        )
+        dispatcher.start()
+        for index in range(3):
+            assert dispatcher.submit(USER, f"mensaje {index}")
+        assert await dispatcher.wait_pending(timeout=5)
+        await dispatcher.aclose()
+        return dispatcher.stats()
+
+    stats = asyncio.run(main())
+    assert [body for _, body in client.messages.sent] == ["mensaje 0", "mensaje 1", "mensaje 2"]
+    assert stats['sent'] == 3 and stats['retries'] == 1
+    assert client.http_client.closed
+
+def test_asgi_webhook_returns_twiml(async_bot):
+    """Test para responder por TwiML desde la ruta asíncrona y servir Flask al lado"""
+    app = create_asgi_app(async_bot)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bot') as client:
+            reply = await client.post('/webhook/async', data={'From': f'whatsapp:{USER}', 'Body': 'hola'})
+            health = await client.get('/health')
+        return reply, health
+
+    reply, health = asyncio.run(main())
+    assert reply.headers['content-type'].startswith('text/xml')
+    assert "nombre del lugar" in reply.text
+    assert health.json()['status'] == 'healthy'
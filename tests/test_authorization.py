@@ -0,0 +1,67 @@
+"""
+Tests para la lista de números autorizados
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.bot.authorization import Allowlist
+
+def test_numbers_are_normalized():
+    """Test para aceptar números con espacios, guiones o sin +"""
+    allowlist = Allowlist([' 1234567890', '+54 9 11-5555-0000', 'abc'])
+
+    assert allowlist.is_allowed('+1234567890')
+    assert allowlist.is_allowed('+5491155550000')
+    assert allowlist.is_allowed('1234567890')
+    assert not allowlist.is_allowed('+1999999999')
+    assert len(allowlist) == 2
+
+def test_empty_allowlist_is_open():
+    """Test para no rechazar a todos cuando la variable está vacía"""
+    allowlist = Allowlist([])
+    assert not allowlist.restricted
+    assert allowlist.is_allowed('+1234567890')
+
+def test_file_is_reloaded_when_it_changes(tmp_path):
+    """Test para recargar el archivo sin reiniciar"""
+    path = tmp_path / 'allowed.txt'
+    path.write_text("# Equipo\n+1234567890\n")
+    allowlist = Allowlist(path=str(path), reload_interval=0)
+
+    assert allowlist.is_allowed('+1234567890')
+    assert not allowlist.is_allowed('+1987654321')
+
+    path.write_text("+1234567890\n+1987654321, +1555000111\n")
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    assert allowlist.is_allowed('+1987654321')
+    assert len(allowlist) == 3
+
+def test_missing_file_denies_everyone(tmp_path):
+    """Test para no abrir el bot si falta el archivo configurado"""
+    allowlist = Allowlist(path=str(tmp_path / 'no-existe.txt'))
+    assert allowlist.restricted
+    assert not allowlist.is_allowed('+1234567890')
+
+def test_deleted_file_revokes_its_numbers(tmp_path, caplog):
+    """Test para dejar de autorizar los números del archivo cuando se borra"""
+    path = tmp_path / 'allowed.txt'
+    path.write_text("+1234567890\n")
+    allowlist = Allowlist(path=str(path), reload_interval=0)
+    assert allowlist.is_allowed('+1234567890')
+
+    path.unlink()
+    for _ in range(3):
+        assert not allowlist.is_allowed('+1234567890')
+
+    assert len(allowlist) == 0
+    assert allowlist.stats()['rejected'] == 3
+    assert len([r for r in caplog.records if 'No existe la lista' in r.getMessage()]) == 1
+
+def test_large_allowlist():
+    """Test para listas con decenas de miles de números"""
+    allowlist = Allowlist([f'+1{index:010d}' for index in range(50000)])
+    assert len(allowlist) == 50000
+    assert allowlist.is_allowed('+10000049999')
@@ -0,0 +1,62 @@
+"""
+Tests para los perfiles de navegador
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.automation.browser_profiles import get_browser_profile
+
+class FakeDriver:
+    """Driver falso que registra los comandos CDP"""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+
+    def execute_script(self, script):
+        return "Mozilla/5.0 HeadlessChrome/120.0.0.0 Safari/537.36"
+
+def test_production_profile_is_headless_and_lean():
+    """El perfil de producción es headless, sin GPU y con renderers limitados"""
+    arguments = get_browser_profile('production').chrome_options().arguments
+
+    assert "--headless=new" in arguments
+    assert "--disable-gpu" in arguments
+    assert "--window-size=1280,900" in arguments
+    assert any(argument.startswith("--renderer-process-limit=") for argument in arguments)
+
+def test_production_profile_blocks_heavy_resources():
+    """Se bloquean imágenes, fuentes y analítica y se oculta el user agent headless"""
+    driver = FakeDriver()
+    get_browser_profile('production').apply(driver)
+
+    commands = dict(driver.commands)
+    blocked = commands['Network.setBlockedURLs']['urls']
+    assert '*.png' in blocked and '*.woff2' in blocked and '*google-analytics.com*' in blocked
+    assert 'HeadlessChrome' not in commands['Network.setUserAgentOverride']['userAgent']
+
+def test_debug_profile_keeps_full_browser():
+    """El perfil de depuración abre un navegador visible y sin bloqueos"""
+    profile = get_browser_profile('debug')
+    driver = FakeDriver()
+    profile.apply(driver)
+
+    assert not any(argument.startswith("--headless") for argument in profile.chrome_options().arguments)
+    assert driver.commands == []
+
+def test_unknown_profile_raises():
+    """Un perfil desconocido es un error de configuración"""
+    with pytest.raises(ValueError):
+        get_browser_profile('turbo')
+
+def test_configured_chrome_binary_is_launched():
+    """Test para lanzar el mismo Chrome contra el que se verificó chromedriver"""
+    profile = get_browser_profile('production')
+    assert profile.chrome_options('/opt/chrome/chrome').binary_location == '/opt/chrome/chrome'
+    assert profile.chrome_options().binary_location == ''
@@ -0,0 +1,43 @@
+"""
+Tests para la tabla de transiciones de la conversación
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.config import Config
+from src.bot import messages
+from src.bot.conversation import TRANSITIONS, InvalidInput, parse_rating, parse_photos, parse_confirmation
+
+def test_every_state_has_a_transition():
+    """Test para que cada estado de la configuración tenga su transición"""
+    states = {
+        Config.WAITING_FOR_PLACE, Config.WAITING_FOR_RATING, Config.WAITING_FOR_TEXT,
+        Config.WAITING_FOR_PHOTOS, Config.CONFIRMING_SUBMISSION
+    }
+    assert set(TRANSITIONS) == states | {None}
+    # Los próximos estados también están en la tabla
+    assert {t.next_state for t in TRANSITIONS.values() if t.next_state} <= states
+
+def test_parse_rating():
+    """Test para aceptar solo calificaciones del 1 al 5"""
+    assert parse_rating(" 4 ", []) == 4
+    for invalid in ("0", "6", "cinco", ""):
+        with pytest.raises(InvalidInput) as error:
+            parse_rating(invalid, [])
+        assert error.value.reply == messages.INVALID_RATING
+
+def test_parse_photos_and_confirmation():
+    """Test para interpretar las fotos y la confirmación"""
+    assert parse_photos("Sin fotos", ['https://x/1']) == []
+    assert parse_photos("", ['https://x/1']) == ['https://x/1']
+    with pytest.raises(InvalidInput):
+        parse_photos("luego", [])
+
+    assert parse_confirmation("Sí", []) is True
+    assert parse_confirmation("cancelar", []) is False
+    with pytest.raises(InvalidInput):
+        parse_confirmation("quizás", [])
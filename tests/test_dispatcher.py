@@ -0,0 +1,109 @@
+"""
+Tests para el envío de mensajes salientes
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from twilio.base.exceptions import TwilioRestException
+
+from src.bot.dispatcher import OutboundDispatcher
+from src.utils.rate_limit import TokenBucket
+
+class FakeMessages:
+    """API de mensajes falsa que puede fallar con los estados indicados"""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def create(self, from_, body, to):
+        with self.lock:
+            if self.failures:
+                raise TwilioRestException(self.failures.pop(0), '/Messages')
+            self.sent.append((to, body))
+
+class FakeClient:
+    def __init__(self, messages):
+        self.messages = messages
+
+def make_dispatcher(messages, **kwargs):
+    kwargs.setdefault('rate_per_second', 1000)
+    kwargs.setdefault('backoff_base', 0.001)
+    return OutboundDispatcher(lambda: FakeClient(messages), '+10000000000', **kwargs)
+
+def test_messages_keep_order_per_recipient():
+    """Test para mantener el orden de los mensajes de cada destinatario"""
+    messages = FakeMessages()
+    dispatcher = make_dispatcher(messages, num_workers=4)
+    dispatcher.start()
+    for index in range(20):
+        dispatcher.submit('+1111111111', f"a{index}")
+        dispatcher.submit('+2222222222', f"b{index}")
+    assert dispatcher.drain(timeout=5)
+    dispatcher.stop(timeout=5)
+
+    first = [body for to, body in messages.sent if to == 'whatsapp:+1111111111']
+    assert first == [f"a{index}" for index in range(20)]
+    assert dispatcher.stats()['sent'] == 40
+
+def test_retries_on_rate_limit_and_server_errors():
+    """Test para reintentar ante 429/5xx"""
+    messages = FakeMessages(failures=[429, 503])
+    dispatcher = make_dispatcher(messages, num_workers=1)
+    dispatcher.start()
+    dispatcher.submit('+1111111111', "hola")
+    assert dispatcher.drain(timeout=5)
+    dispatcher.stop(timeout=5)
+
+    assert messages.sent == [('whatsapp:+1111111111', "hola")]
+    stats = dispatcher.stats()
+    assert (stats['sent'], stats['retries'], stats['failed']) == (1, 2, 0)
+
+def test_client_errors_are_not_retried():
+    """Test para no reintentar errores definitivos (4xx)"""
+    messages = FakeMessages(failures=[400])
+    dispatcher = make_dispatcher(messages, num_workers=1)
+    dispatcher.start()
+    dispatcher.submit('+1111111111', "hola")
+    assert dispatcher.drain(timeout=5)
+    dispatcher.stop(timeout=5)
+
+    assert messages.sent == []
+    assert dispatcher.stats()['failed'] == 1
+
+def test_worker_survives_client_creation_errors():
+    """Test para reintentar la creación del cliente sin perder los mensajes en cola"""
+    messages = FakeMessages()
+    attempts = []
+
+    def flaky_factory():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("sin red")
+        return FakeClient(messages)
+
+    dispatcher = OutboundDispatcher(flaky_factory, '+10000000000', num_workers=1,
+                                    rate_per_second=1000, backoff_base=0.001)
+    dispatcher.submit('+1111111111', "hola")
+    dispatcher.start()
+    assert dispatcher.drain(timeout=5)
+    dispatcher.stop(timeout=5)
+
+    assert len(attempts) == 3
+    assert messages.sent == [('whatsapp:+1111111111', "hola")]
+
+def test_token_bucket_limits_rate():
+    """Test para el límite de tasa del token bucket"""
+    bucket = TokenBucket(rate=20, capacity=1)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    started = time.monotonic()
+    assert bucket.acquire()
+    assert time.monotonic() - started >= 0.03
+    assert not bucket.acquire(timeout=0.001)
@@ -0,0 +1,90 @@
+"""
+Tests para la resolución de chromedriver
+"""
+
+import sys
+import os
+import stat
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.automation.driver_binary import (
+    ChromeDriverError, major_version, resolve_chromedriver, resolved_chromedriver, reset_chromedriver_cache
+)
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    reset_chromedriver_cache()
+    yield
+    reset_chromedriver_cache()
+
+def fake_binary(path, output):
+    """Crear un ejecutable que imprime ``output`` con --version"""
+    path.write_text(f"#!/bin/sh\necho '{output}'\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+def test_major_version_parses_output(tmp_path):
+    """Test para leer la versión mayor de chromedriver y Chrome"""
+    driver = fake_binary(tmp_path / 'chromedriver', 'ChromeDriver 120.0.6099.109 (abc)')
+    chrome = fake_binary(tmp_path / 'chrome', 'Google Chrome 120.0.6099.129')
+
+    assert major_version(driver) == 120
+    assert major_version(chrome) == 120
+    assert major_version(str(tmp_path / 'no-existe')) is None
+
+def test_resolve_pinned_path_once(tmp_path):
+    """La ruta configurada se verifica una vez y luego se reutiliza"""
+    driver = tmp_path / 'chromedriver'
+    fake_binary(driver, 'ChromeDriver 120.0.6099.109')
+    chrome = fake_binary(tmp_path / 'chrome', 'Google Chrome 120.0.6099.129')
+
+    assert resolve_chromedriver(str(driver), chrome_binary=chrome) == str(driver)
+    driver.unlink()
+    # Sin volver a comprobar el archivo ni la versión
+    assert resolve_chromedriver() == str(driver)
+
+def test_launch_requires_startup_resolution(tmp_path):
+    """Sin resolver al arrancar no se lanza el navegador (ni se descarga chromedriver)"""
+    with pytest.raises(ChromeDriverError):
+        resolved_chromedriver()
+
+    driver = fake_binary(tmp_path / 'chromedriver', 'ChromeDriver 120.0.6099.109')
+    chrome = fake_binary(tmp_path / 'chrome', 'Google Chrome 120.0.6099.129')
+    resolve_chromedriver(driver, chrome_binary=chrome)
+    assert resolved_chromedriver() == driver
+
+def test_resolve_fails_on_version_mismatch(tmp_path):
+    """Arrancar falla si chromedriver no corresponde al Chrome instalado"""
+    driver = fake_binary(tmp_path / 'chromedriver', 'ChromeDriver 119.0.6045.105')
+    chrome = fake_binary(tmp_path / 'chrome', 'Google Chrome 120.0.6099.129')
+
+    with pytest.raises(ChromeDriverError):
+        resolve_chromedriver(driver, chrome_binary=chrome)
+
+def test_resolve_offline_without_driver_fails(tmp_path, monkeypatch):
+    """En modo offline no se descarga nada si chromedriver no está en el PATH"""
+    monkeypatch.setenv('PATH', str(tmp_path))
+
+    with pytest.raises(ChromeDriverError):
+        resolve_chromedriver(offline=True)
+
+def test_resolve_offline_uses_path(tmp_path, monkeypatch):
+    """En modo offline se usa el chromedriver del PATH"""
+    driver = fake_binary(tmp_path / 'chromedriver', 'ChromeDriver 120.0.6099.109')
+    chrome = fake_binary(tmp_path / 'chrome', 'Google Chrome 120.0.6099.129')
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    assert resolve_chromedriver(offline=True, chrome_binary=chrome) == driver
+
+def test_resolve_fails_without_chrome(tmp_path, monkeypatch):
+    """Arrancar falla si no hay Chrome contra el que verificar, salvo que se acepte explícitamente"""
+    driver = fake_binary(tmp_path / 'chromedriver', 'ChromeDriver 120.0.6099.109')
+    monkeypatch.setenv('PATH', str(tmp_path))
+
+    with pytest.raises(ChromeDriverError):
+        resolve_chromedriver(driver)
+    with pytest.raises(ChromeDriverError):
+        resolve_chromedriver(driver, chrome_binary=str(tmp_path / 'no-existe'))
+    assert resolve_chromedriver(driver, require_chrome=False) == driver
@@ -0,0 +1,148 @@
+"""
+Tests para el pool de drivers
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.automation.driver_pool import DriverPool, DriverPoolTimeout
+from src.automation.google_maps import GoogleMapsAutomation
+
+class FakeDriver:
+    """Driver falso que solo registra si fue cerrado"""
+
+    def __init__(self):
+        self.alive = True
+
+    def quit(self):
+        self.alive = False
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    pool = DriverPool(factory, health_check=lambda driver: driver.alive, **kwargs)
+    return pool, created
+
+def test_drivers_are_reused():
+    """Test para reutilizar un driver caliente"""
+    pool, created = make_pool(size=1)
+    pool.warm()
+    assert len(created) == 1
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert first.driver is second.driver
+    assert len(created) == 1
+    assert pool.stats()['idle'] == 1
+
+def test_recycled_after_max_uses():
+    """Test para reciclar un driver tras el máximo de usos"""
+    pool, created = make_pool(size=1, max_uses=2)
+    for _ in range(3):
+        with pool.lease():
+            pass
+
+    assert len(created) == 2
+    assert not created[0].alive
+    assert pool.stats()['recycled'] == 1
+
+def test_unhealthy_driver_is_replaced():
+    """Test para reemplazar un driver cuya sesión murió"""
+    pool, created = make_pool(size=1)
+    pool.warm()
+    created[0].alive = False
+
+    with pool.lease() as pooled:
+        assert pooled.driver is created[1]
+
+def test_failed_lease_discards_driver():
+    """Test para descartar un driver tras una excepción"""
+    pool, created = make_pool(size=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            raise RuntimeError("navegador colgado")
+
+    assert not created[0].alive
+    assert pool.stats() == {'size': 1, 'idle': 0, 'leased': 0, 'created': 1, 'recycled': 1}
+
+def test_pool_is_bounded():
+    """Test para el límite de drivers prestados a la vez"""
+    pool, created = make_pool(size=1)
+    leased = pool.checkout()
+
+    with pytest.raises(DriverPoolTimeout):
+        pool.checkout(timeout=0.05)
+
+    released = threading.Timer(0.05, pool.checkin, args=(leased,))
+    released.start()
+    again = pool.checkout(timeout=5)
+    assert again.driver is created[0]
+    pool.checkin(again)
+
+def test_warm_and_checkout_never_exceed_size():
+    """Test para no lanzar más de ``size`` drivers aunque se precaliente mientras se piden"""
+    created = []
+
+    def slow_factory():
+        time.sleep(0.05)
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    pool = DriverPool(slow_factory, health_check=lambda driver: driver.alive, size=2)
+    threads = [threading.Thread(target=pool.warm) for _ in range(3)]
+    threads += [threading.Thread(target=lambda: pool.checkin(pool.checkout(timeout=5))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(created) == 2
+    assert pool.stats()['idle'] == 2
+
+def test_failed_launch_releases_reservation():
+    """Test para liberar el lugar reservado cuando Chrome no arranca"""
+    pool, created = make_pool(size=2)
+    factory = pool.factory
+    failures = [RuntimeError("Chrome no arrancó")]
+
+    def flaky_factory():
+        if failures:
+            raise failures.pop()
+        return factory()
+
+    pool.factory = flaky_factory
+    pool.warm()
+    assert created == []
+
+    pool.warm()
+    assert len(created) == 2
+    assert pool.stats()['idle'] == 2
+
+def test_failed_review_discards_driver():
+    """Test para no devolver al pool un driver cuyo envío falló sin excepción"""
+    pool, created = make_pool(size=1)
+    automation = GoogleMapsAutomation('user@gmail.com', 'clave', driver_pool=pool)
+    automation.run_review_steps = lambda *args: (False, "Error buscando el lugar")
+
+    assert automation.process_feedback_pooled('Café XYZ', 5, 'Muy bueno') == (False, "Error buscando el lugar")
+    assert not created[0].alive
+    assert pool.stats()['idle'] == 0
+
+    automation.run_review_steps = lambda *args: (True, "Reseña enviada exitosamente")
+    automation.process_feedback_pooled('Café XYZ', 5, 'Muy bueno')
+    assert created[1].alive
+    assert pool.stats()['idle'] == 1
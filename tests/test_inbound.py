@@ -0,0 +1,101 @@
+"""
+Tests para la deduplicación de mensajes entrantes
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.bot.inbound import InboundMessageLog, create_inbound_log
+from src.utils.locks import KeyedLock
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def inbound(request, tmp_path):
+    return create_inbound_log(request.param, str(tmp_path / 'sessions.db'), ttl=60, max_entries=3)
+
+def test_claim_returns_original_reply(inbound):
+    """Test para devolver la respuesta original a un reintento"""
+    assert inbound.claim('SM1') == (True, None)
+    assert inbound.claim('SM1') == (False, None)  # Todavía en curso
+
+    inbound.complete('SM1', "¡Hola!")
+    assert inbound.claim('SM1') == (False, "¡Hola!")
+    assert inbound.stats()['duplicates'] == 2
+
+def test_release_allows_reprocessing(inbound):
+    """Test para volver a procesar un mensaje cuyo manejo falló"""
+    inbound.claim('SM1')
+    inbound.release('SM1')
+    assert inbound.claim('SM1') == (True, None)
+
+def test_log_is_bounded(inbound):
+    """Test para conservar como máximo ``max_entries`` mensajes"""
+    for index in range(5):
+        inbound.claim(f'SM{index}')
+    # SQLite limpia cada PRUNE_EVERY mensajes nuevos
+    if hasattr(inbound, '_prune'):
+        inbound._prune()
+    assert len(inbound) == 3
+    assert inbound.claim('SM4')[0] is False
+
+def test_expired_entries_are_new(inbound):
+    """Test para olvidar los mensajes tras el TTL"""
+    inbound.ttl = 0
+    inbound.claim('SM1')
+    time.sleep(0.01)
+    assert inbound.claim('SM1') == (True, None)
+
+def test_incomplete_log_cannot_be_instantiated():
+    """Test para exigir todos los métodos de la interfaz al crear un registro"""
+    class PartialLog(InboundMessageLog):
+        def claim(self, message_sid):
+            return True, None
+
+    with pytest.raises(TypeError, match='complete'):
+        PartialLog()
+
+def test_keyed_lock_serializes_same_key_in_order():
+    """Test para procesar en orden los mensajes de un mismo remitente"""
+    locks = KeyedLock()
+    order = []
+    first_inside = threading.Event()
+
+    def worker(index):
+        with locks.hold('+111'):
+            if index == 0:
+                first_inside.set()
+                time.sleep(0.05)
+            order.append(index)
+
+    threads = [threading.Thread(target=worker, args=(0,))]
+    threads[0].start()
+    first_inside.wait(5)
+    for index in (1, 2, 3):
+        thread = threading.Thread(target=worker, args=(index,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == [0, 1, 2, 3]
+    assert len(locks) == 0
+
+def test_keyed_lock_does_not_block_other_keys():
+    """Test para no bloquear a otros remitentes"""
+    locks = KeyedLock()
+    done = threading.Event()
+
+    def other_sender():
+        with locks.hold('+222'):
+            done.set()
+
+    with locks.hold('+111'):
+        thread = threading.Thread(target=other_sender)
+        thread.start()
+        assert done.wait(1)
+    thread.join(5)
@@ -0,0 +1,182 @@
+"""
+Tests para la cola de envíos
+"""
+
+import sys
+import os
+import sqlite3
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.jobs import JobStore, JobStatus, SubmissionWorkerPool
+
+PAYLOAD = {'place_name': 'Café XYZ', 'rating': 5, 'text': 'Muy bueno', 'photos': []}
+
+def test_enqueue_and_claim(tmp_path):
+    """Test para encolar y tomar trabajos"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    job = store.enqueue('+1234567890', PAYLOAD)
+
+    assert store.get(job.job_id).status == JobStatus.PENDING
+
+    claimed = store.claim_next()
+    assert claimed.job_id == job.job_id
+    assert claimed.status == JobStatus.RUNNING
+    assert claimed.attempts == 1
+    assert claimed.payload == PAYLOAD
+
+    # Un trabajo en curso no se vuelve a entregar
+    assert store.claim_next() is None
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    """Test para recuperar trabajos de un worker caído"""
+    store = JobStore(str(tmp_path / 'jobs.db'), lease_timeout=0)
+    job = store.enqueue('+1234567890', PAYLOAD)
+    store.claim_next()
+    time.sleep(0.01)
+
+    reclaimed = store.claim_next()
+    assert reclaimed.job_id == job.job_id
+    assert reclaimed.attempts == 2
+
+def test_reclaimed_attempt_cannot_overwrite_result(tmp_path):
+    """Test para que un intento cuyo lease venció no pise el estado del intento nuevo"""
+    store = JobStore(str(tmp_path / 'jobs.db'), lease_timeout=0)
+    job = store.enqueue('+1234567890', PAYLOAD)
+    stale = store.claim_next()
+    time.sleep(0.01)
+    current = store.claim_next()
+
+    assert stale.lease_token != current.lease_token
+    assert not store.mark_completed(job.job_id, "Reseña enviada", lease_token=stale.lease_token)
+    assert not store.renew_lease(job.job_id, stale.lease_token)
+    assert store.get(job.job_id).status == JobStatus.RUNNING
+    assert store.mark_failed(job.job_id, "Error buscando el lugar", lease_token=current.lease_token)
+    assert store.get(job.job_id).status == JobStatus.FAILED
+
+def test_long_job_keeps_its_lease(tmp_path):
+    """Test para renovar el lease mientras el envío sigue en curso"""
+    store = JobStore(str(tmp_path / 'jobs.db'), lease_timeout=0.3)
+    other_worker = []
+
+    def slow_handler(job):
+        time.sleep(0.8)
+        other_worker.append(store.claim_next())
+        return True, "Reseña enviada exitosamente"
+
+    pool = SubmissionWorkerPool(store, handler=slow_handler, lease_renew_interval=0.05)
+    job = store.enqueue('+1234567890', PAYLOAD)
+    pool.run_job(store.claim_next())
+
+    assert other_worker == [None]
+    assert store.get(job.job_id).status == JobStatus.COMPLETED
+
+def test_worker_pool_retries_then_fails(tmp_path):
+    """Test para reintentos con backoff y fallo definitivo"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    finished = []
+    pool = SubmissionWorkerPool(
+        store,
+        handler=lambda job: (False, "Error buscando el lugar"),
+        on_finished=finished.append,
+        backoff_base=0
+    )
+    job = store.enqueue('+1234567890', PAYLOAD, max_attempts=2)
+
+    pool.run_job(store.claim_next())
+    assert store.get(job.job_id).status == JobStatus.RETRYING
+    assert finished == []
+
+    pool.run_job(store.claim_next())
+    assert store.get(job.job_id).status == JobStatus.FAILED
+    assert store.get(job.job_id).error == "Error buscando el lugar"
+    assert [j.job_id for j in finished] == [job.job_id]
+
+def test_worker_pool_processes_jobs(tmp_path):
+    """Test para el pool de workers en segundo plano"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    finished = []
+    pool = SubmissionWorkerPool(
+        store,
+        handler=lambda job: (True, "Reseña enviada exitosamente"),
+        on_finished=finished.append,
+        num_workers=2,
+        poll_interval=0.05
+    )
+    pool.start()
+    try:
+        job = store.enqueue('+1234567890', PAYLOAD)
+        pool.notify()
+        deadline = time.time() + 5
+        while not finished and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        pool.stop(timeout=5)
+
+    assert store.get(job.job_id).status == JobStatus.COMPLETED
+    assert store.get(job.job_id).result == "Reseña enviada exitosamente"
+    assert store.count_by_status() == {JobStatus.COMPLETED: 1}
+
+def test_worker_survives_store_errors(tmp_path):
+    """Test para que un error de la base al registrar un resultado no termine el worker"""
+    class FlakyStore(JobStore):
+        failures = 1
+
+        def mark_completed(self, job_id, result, lease_token=None):
+            if self.failures:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return super().mark_completed(job_id, result, lease_token)
+
+    store = FlakyStore(str(tmp_path / 'jobs.db'))
+    finished = []
+    pool = SubmissionWorkerPool(
+        store,
+        handler=lambda job: (True, "ok"),
+        on_finished=finished.append,
+        num_workers=1,
+        poll_interval=0.05
+    )
+    first = store.enqueue('+1', PAYLOAD)
+    second = store.enqueue('+2', PAYLOAD)
+    pool.start()
+    try:
+        deadline = time.time() + 5
+        while not finished and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        pool.stop(timeout=5)
+
+    assert [job.job_id for job in finished] == [second.job_id]
+    assert store.get(first.job_id).status == JobStatus.RUNNING  # Se recupera al vencer su lease
+
+def test_enqueue_once_deduplicates(tmp_path):
+    """Test para reutilizar el trabajo de una reseña o mensaje repetido"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    job, created = store.enqueue_once('+1234567890', PAYLOAD, 'huella', message_sid='SM1')
+    assert created
+
+    same, created = store.enqueue_once('+1234567890', PAYLOAD, 'huella')
+    assert (same.job_id, created) == (job.job_id, False)
+    retry, created = store.enqueue_once('+1234567890', PAYLOAD, 'otra-huella', message_sid='SM1')
+    assert (retry.job_id, created) == (job.job_id, False)
+    assert store.find_by_message_sid('SM1').job_id == job.job_id
+    assert store.count_by_status() == {JobStatus.PENDING: 1}
+
+def test_enqueue_once_allows_resubmitting_failed(tmp_path):
+    """Test para volver a enviar una reseña cuyo trabajo falló"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    job, _ = store.enqueue_once('+1234567890', PAYLOAD, 'huella')
+    store.mark_failed(job.job_id, "Error buscando el lugar")
+
+    again, created = store.enqueue_once('+1234567890', PAYLOAD, 'huella')
+    assert created and again.job_id != job.job_id
+
+def test_enqueue_once_forgets_old_fingerprints(tmp_path):
+    """Test para olvidar las huellas fuera de la ventana de deduplicación"""
+    store = JobStore(str(tmp_path / 'jobs.db'), dedup_window=0)
+    job, _ = store.enqueue_once('+1234567890', PAYLOAD, 'huella')
+    time.sleep(0.01)
+
+    again, created = store.enqueue_once('+1234567890', PAYLOAD, 'huella')
+    assert created and again.job_id != job.job_id
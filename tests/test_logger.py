@@ -0,0 +1,147 @@
+"""
+Tests para el logging estructurado
+"""
+
+import sys
+import os
+import io
+import json
+import logging
+import logging.handlers
+import threading
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.utils import logger as logger_module
+from src.utils.logger import (
+    configure_logging, shutdown_logging, log_context, JsonFormatter, TextFormatter, ContextFilter,
+    get_bot_logger, get_automation_logger
+)
+
+@pytest.fixture
+def root_logging():
+    """Restaurar los handlers del logger raíz al terminar"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def make_record(message, *args, exc_info=None):
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, message, args, exc_info)
+    ContextFilter().filter(record)
+    return record
+
+def test_json_formatter_includes_context():
+    """Test para que cada línea JSON lleve el request_id y el job_id del contexto"""
+    with log_context(request_id='SM123', job_id='job-1'):
+        record = make_record("Hola %s", 'mundo')
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['message'] == "Hola mundo"
+    assert entry['level'] == 'INFO'
+    assert entry['request_id'] == 'SM123'
+    assert entry['job_id'] == 'job-1'
+
+def test_context_is_restored_after_block():
+    """Test para que los identificadores no sobrevivan al bloque"""
+    with log_context(request_id='SM1'):
+        with log_context(job_id='job-2'):
+            inner = make_record("adentro")
+        outer = make_record("afuera")
+    after = make_record("después")
+
+    assert (inner.request_id, inner.job_id) == ('SM1', 'job-2')
+    assert (outer.request_id, outer.job_id) == ('SM1', None)
+    assert (after.request_id, after.job_id) == (None, None)
+    assert 'request_id' not in json.loads(JsonFormatter().format(after))
+
+def test_text_formatter_appends_ids():
+    """Test para el formato de texto con los identificadores al final"""
+    with log_context(job_id='job-3'):
+        line = TextFormatter().format(make_record("Envío listo"))
+
+    assert line.endswith("Envío listo [job_id=job-3]")
+    assert TextFormatter().format(make_record("Sin contexto")).endswith("Sin contexto")
+
+def test_configure_logging_writes_through_listener(root_logging, tmp_path):
+    """Test para que los registros lleguen al archivo desde el hilo del listener"""
+    log_file = str(tmp_path / 'logs' / 'bot.log')
+    listener = configure_logging('INFO', log_file)
+
+    with log_context(request_id='SM9'):
+        try:
+            raise RuntimeError("falló")
+        except RuntimeError:
+            logging.getLogger('bot').exception("Error en webhook: %s", 'x')
+    shutdown_logging()
+
+    with open(log_file, encoding='utf-8') as f:
+        entry = json.loads(f.readline())
+    assert listener is not None
+    assert entry['message'] == "Error en webhook: x"
+    assert entry['request_id'] == 'SM9'
+    assert 'RuntimeError: falló' in entry['exception']
+
+def test_configure_logging_is_idempotent(root_logging, tmp_path):
+    """Test para que configurar dos veces no duplique handlers"""
+    first = configure_logging('INFO', str(tmp_path / 'bot.log'))
+    second = configure_logging('DEBUG', str(tmp_path / 'otro.log'))
+
+    assert first is second
+    assert len(root_logging.handlers) == 1
+    assert root_logging.level == logging.INFO
+
+def test_per_process_log_file(root_logging, tmp_path):
+    """Test para el archivo de log propio de cada proceso"""
+    configure_logging('INFO', str(tmp_path / 'bot.log'), per_process=True)
+    logging.getLogger('bot').info("hola")
+    shutdown_logging()
+
+    assert os.path.exists(tmp_path / f'bot.{os.getpid()}.log')
+    assert not os.path.exists(tmp_path / 'bot.log')
+
+def test_logging_does_not_wait_for_slow_handler(root_logging):
+    """Test para que quien registra no espere a un handler lento"""
+    release = threading.Event()
+
+    class SlowStream(io.StringIO):
+        def write(self, text):
+            release.wait(5)
+            return super().write(text)
+
+    configure_logging('INFO', None)
+    assert isinstance(logging.getLogger().handlers[0], logging.handlers.QueueHandler)
+    # El listener escribe en consola; reemplazar su stream por uno que se bloquea
+    logger_module._listener.handlers[0].setStream(SlowStream())
+
+    done = threading.Event()
+    def emit():
+        for i in range(100):
+            logging.getLogger('bot').info("mensaje %s", i)
+        done.set()
+    threading.Thread(target=emit).start()
+
+    assert done.wait(2)
+    release.set()
+
+def test_legacy_helpers_are_deprecated_wrappers(root_logging, tmp_path, monkeypatch):
+    """Test para conservar get_bot_logger y get_automation_logger con aviso de obsolescencia"""
+    monkeypatch.chdir(tmp_path)
+    handlers = list(root_logging.handlers)
+    with pytest.warns(DeprecationWarning):
+        bot_logger = get_bot_logger()
+    with pytest.warns(DeprecationWarning):
+        automation_logger = get_automation_logger()
+
+    assert bot_logger.name == 'whatsapp_feedback_bot'
+    assert automation_logger.name == 'google_maps_automation'
+    assert logger_module.setup_logger('bot', 'logs/bot.log').name == 'bot'
+    # Pedir un logger no configura el logging del proceso
+    assert root_logging.handlers == handlers
+    assert logger_module._listener is None
+    assert not os.path.exists(tmp_path / 'logs')
@@ -0,0 +1,52 @@
+"""
+Tests para la descarga de fotos
+"""
+
+import sys
+import os
+import hashlib
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.media import MediaIngest
+from tests.helpers import FakeHttp, JPEG
+
+def make_ingest(tmp_path, responses, **kwargs):
+    ingest = MediaIngest(str(tmp_path), **kwargs)
+    ingest.http = FakeHttp(responses)
+    return ingest
+
+def test_downloads_are_deduplicated_by_content(tmp_path):
+    """Test para guardar una sola copia de la misma foto"""
+    ingest = make_ingest(tmp_path, {
+        'https://api.twilio.com/m/1': (JPEG, 'image/jpeg'),
+        'https://api.twilio.com/m/2': (JPEG, 'image/jpeg; charset=binary'),
+    })
+
+    paths = ingest.resolve(['https://api.twilio.com/m/1', 'https://api.twilio.com/m/2'])
+
+    expected = os.path.abspath(str(tmp_path / f"{hashlib.sha256(JPEG).hexdigest()}.jpg"))
+    assert paths == [expected, expected]
+    assert os.listdir(str(tmp_path / '.tmp')) == []
+
+def test_prefetch_reports_paths_and_is_reused(tmp_path):
+    """Test para la descarga anticipada y su reutilización al confirmar"""
+    url = 'https://api.twilio.com/m/1'
+    ingest = make_ingest(tmp_path, {url: (JPEG, 'image/jpeg')})
+    completed = []
+
+    for future in ingest.prefetch([url], on_complete=completed.append):
+        future.result(timeout=5)
+
+    assert len(completed) == 1 and len(completed[0]) == 1
+    assert ingest.resolve([url]) == completed[0]
+    assert ingest.http.requested == [url]
+
+def test_rejects_invalid_media(tmp_path):
+    """Test para descartar archivos que no son imágenes o demasiado grandes"""
+    ingest = make_ingest(tmp_path, {
+        'https://api.twilio.com/m/pdf': (b'%PDF-1.4', 'application/pdf'),
+        'https://api.twilio.com/m/big': (JPEG, 'image/jpeg'),
+    }, max_bytes=1000)
+
+    assert ingest.resolve(['https://api.twilio.com/m/pdf', 'https://api.twilio.com/m/big']) == []
+    assert [name for name in os.listdir(str(tmp_path)) if name != '.tmp'] == []
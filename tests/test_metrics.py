@@ -0,0 +1,98 @@
+"""
+Tests para las métricas de Prometheus
+"""
+
+import sys
+import os
+import pytest
+from prometheus_client import REGISTRY
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.utils.metrics import timed_step, update_gauges, render_metrics, MetricsReporter
+
+def step_count(step, outcome):
+    return REGISTRY.get_sample_value(
+        'feedback_automation_step_seconds_count', {'step': step, 'outcome': outcome}
+    ) or 0
+
+def sample_stats():
+    return {
+        'sessions': {'active': 7},
+        'outbound': {'queue_depth': 3},
+        'admission': {'in_flight': 2},
+        'jobs': {'pending': 4, 'running': 1},
+        'driver_pools': {'account-0': {'idle': 1, 'leased': 2}}
+    }
+
+def test_timed_step_records_outcome():
+    """Test para medir cada paso como ok o error según su resultado"""
+    @timed_step('test_ok')
+    def succeeds():
+        return None
+
+    @timed_step('test_error')
+    def fails():
+        return False
+
+    @timed_step('test_raise')
+    def raises():
+        raise RuntimeError("boom")
+
+    succeeds()
+    fails()
+    with pytest.raises(RuntimeError):
+        raises()
+
+    assert step_count('test_ok', 'ok') == 1
+    assert step_count('test_error', 'error') == 1
+    assert step_count('test_raise', 'error') == 1
+
+def test_update_gauges_from_stats():
+    """Test para trasladar las estadísticas del bot a los gauges"""
+    update_gauges(sample_stats())
+
+    assert REGISTRY.get_sample_value('feedback_sessions_active') == 7
+    assert REGISTRY.get_sample_value('feedback_outbound_queue_depth') == 3
+    assert REGISTRY.get_sample_value('feedback_webhook_in_flight') == 2
+    assert REGISTRY.get_sample_value('feedback_jobs', {'status': 'pending'}) == 4
+    assert REGISTRY.get_sample_value('feedback_jobs', {'status': 'failed'}) == 0
+    assert REGISTRY.get_sample_value(
+        'feedback_driver_pool_browsers', {'account': 'account-0', 'state': 'leased'}
+    ) == 2
+
+def test_drained_job_status_returns_to_zero():
+    """Test para que un estado sin trabajos vuelva a 0 en lugar de conservar su último valor"""
+    update_gauges(sample_stats())
+    stats = sample_stats()
+    stats['jobs'] = {'completed': 5}
+    update_gauges(stats)
+
+    assert REGISTRY.get_sample_value('feedback_jobs', {'status': 'pending'}) == 0
+    assert REGISTRY.get_sample_value('feedback_jobs', {'status': 'running'}) == 0
+    assert REGISTRY.get_sample_value('feedback_jobs', {'status': 'completed'}) == 5
+
+def test_render_metrics_exposes_text_format():
+    """Test para generar la respuesta de /metrics"""
+    body, content_type = render_metrics()
+
+    assert content_type.startswith('text/plain')
+    assert b'feedback_webhook_latency_seconds' in body
+    assert b'feedback_twilio_send_seconds' in body
+
+def test_reporter_survives_collect_errors():
+    """Test para que un error al leer las estadísticas no detenga el reporte"""
+    calls = []
+
+    def collect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("base de datos bloqueada")
+        stats = sample_stats()
+        stats['sessions']['active'] = 11
+        return stats
+
+    reporter = MetricsReporter(collect, interval=60)
+    reporter.report()
+    reporter.report()
+
+    assert REGISTRY.get_sample_value('feedback_sessions_active') == 11
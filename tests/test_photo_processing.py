@@ -0,0 +1,142 @@
+"""
+Tests para la normalización de fotos
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from PIL import Image
+from src.media import PhotoProcessor, normalize_photo
+from src.media import processing
+
+def make_photo(path, size=(4000, 3000), orientation=None, mode='RGB'):
+    """Crear una foto de prueba con EXIF (cámara y orientación)"""
+    image = Image.new(mode, size, 'red' if mode == 'RGB' else (255, 0, 0, 128))
+    exif = Image.Exif()
+    exif[0x010F] = 'TestCam'  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    if mode == 'RGB':
+        image.save(path, 'JPEG', exif=exif.tobytes())
+    else:
+        image.save(path, 'PNG')
+    return path
+
+def test_normalize_downscales_and_strips_metadata(tmp_path):
+    """Reduce el lado mayor y no conserva el EXIF"""
+    source = make_photo(str(tmp_path / 'foto.jpg'))
+    output = normalize_photo(source, str(tmp_path), max_dimension=1024, quality=80)
+
+    with Image.open(output) as result:
+        assert result.format == 'JPEG'
+        assert max(result.size) == 1024
+        assert result.size == (1024, 768)
+        assert not result.getexif()
+    assert os.path.getsize(output) < os.path.getsize(source)
+
+def test_normalize_applies_exif_orientation(tmp_path):
+    """Las fotos giradas por EXIF quedan con la orientación real"""
+    source = make_photo(str(tmp_path / 'rotada.jpg'), size=(400, 200), orientation=6)
+    output = normalize_photo(source, str(tmp_path), max_dimension=2048)
+
+    with Image.open(output) as result:
+        assert result.size == (200, 400)
+
+def test_normalize_converts_transparency_to_rgb(tmp_path):
+    """Los PNG con transparencia se convierten a JPEG"""
+    source = make_photo(str(tmp_path / 'logo.png'), size=(300, 300), mode='RGBA')
+    output = normalize_photo(source, str(tmp_path))
+
+    with Image.open(output) as result:
+        assert result.mode == 'RGB'
+
+def test_normalize_reuses_cached_output(tmp_path):
+    """La misma foto con los mismos parámetros no se vuelve a procesar"""
+    source = make_photo(str(tmp_path / 'foto.jpg'), size=(800, 600))
+    first = normalize_photo(source, str(tmp_path), max_dimension=512)
+    modified = os.path.getmtime(first)
+    second = normalize_photo(source, str(tmp_path), max_dimension=512)
+
+    assert first == second
+    assert os.path.getmtime(second) == modified
+
+def test_normalize_names_output_by_ingested_hash(tmp_path):
+    """El resultado se nombra con el hash que ya trae el nombre de la descarga"""
+    source_hash = 'ab' * 32
+    source = make_photo(str(tmp_path / f'{source_hash}.jpg'), size=(800, 600))
+    output = normalize_photo(source, str(tmp_path), max_dimension=512, quality=80)
+
+    assert os.path.basename(output) == f'{source_hash}_512q80.jpg'
+
+def test_normalize_removes_temp_file_on_failure(tmp_path, monkeypatch):
+    """Si no se puede mover el resultado no queda el archivo temporal"""
+    source = make_photo(str(tmp_path / 'foto.jpg'), size=(800, 600))
+    output_dir = tmp_path / 'processed'
+    output_dir.mkdir()
+
+    def failing_replace(src, dst):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        normalize_photo(source, str(output_dir))
+
+    assert os.listdir(output_dir) == []
+
+def test_processor_runs_in_process_pool(tmp_path):
+    """El procesador normaliza en otro proceso y devuelve la ruta nueva"""
+    source = make_photo(str(tmp_path / 'foto.jpg'), size=(3000, 1000))
+    processor = PhotoProcessor(str(tmp_path / 'processed'), max_dimension=600, max_workers=1)
+    try:
+        output = processor.process(source)
+    finally:
+        processor.close()
+
+    assert os.path.dirname(output) == str(tmp_path / 'processed')
+    with Image.open(output) as result:
+        assert result.size == (600, 200)
+
+def test_processor_falls_back_to_original_on_error(tmp_path):
+    """Si la foto no se puede abrir se sube el archivo original"""
+    source = tmp_path / 'rota.heic'
+    source.write_bytes(b'no es una imagen')
+    processor = PhotoProcessor(str(tmp_path / 'processed'), max_workers=1)
+    try:
+        assert processor.process(str(source)) == str(source)
+    finally:
+        processor.close()
+
+def test_executor_is_created_once_under_concurrency(tmp_path, monkeypatch):
+    """Se crea un solo pool aunque varios hilos lo pidan a la vez"""
+    created = []
+
+    class SlowExecutor:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+        def shutdown(self, **kwargs):
+            pass
+
+    monkeypatch.setattr(processing, 'ProcessPoolExecutor', SlowExecutor)
+    processor = PhotoProcessor(str(tmp_path / 'processed'))
+    start = threading.Barrier(8)
+    seen = []
+
+    def use_executor():
+        start.wait()
+        seen.append(processor.executor)
+
+    threads = [threading.Thread(target=use_executor) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    processor.close()
+
+    assert len(created) == 1
+    assert all(executor is created[0] for executor in seen)
@@ -0,0 +1,88 @@
+"""
+Tests para la caché de lugares
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.automation.place_cache import PlaceCache, normalize_place_name
+
+URL = "https://www.google.com/maps/place/Caf%C3%A9+XYZ/@-34.6,-58.4,17z"
+
+def test_normalize_place_name():
+    """Test para la normalización de nombres"""
+    assert normalize_place_name("  Café   XYZ! ") == "cafe xyz"
+    assert normalize_place_name("CAFE xyz") == "cafe xyz"
+
+def test_hit_and_miss():
+    """Test para aciertos, fallos y tasa de aciertos"""
+    cache = PlaceCache()
+    assert cache.get("Café XYZ") is None
+
+    cache.put("Café XYZ", URL)
+    assert cache.get("cafe  xyz") == URL
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+def test_lru_eviction():
+    """Test para descartar el lugar menos usado"""
+    cache = PlaceCache(max_entries=2)
+    cache.put("A lugar", "a")
+    cache.put("B lugar", "b")
+    cache.get("A lugar")
+    cache.put("C lugar", "c")
+
+    assert cache.get("B lugar") is None
+    assert cache.get("A lugar") == "a"
+    assert cache.get("C lugar") == "c"
+
+def test_ttl_expiry():
+    """Test para la expiración de entradas"""
+    cache = PlaceCache(ttl=0.01)
+    cache.put("Café XYZ", URL)
+    time.sleep(0.02)
+    assert cache.get("Café XYZ") is None
+    assert cache.stats()['entries'] == 0
+
+def test_persists_across_restarts(tmp_path):
+    """Test para recuperar la caché desde disco"""
+    path = str(tmp_path / 'places.json')
+    PlaceCache(path).put("Café XYZ", URL)
+
+    reloaded = PlaceCache(path)
+    assert reloaded.get("café xyz") == URL
+
+def test_concurrent_persists_do_not_collide(tmp_path, caplog):
+    """Test para guardar a la vez desde dos cachés sobre el mismo archivo"""
+    path = str(tmp_path / 'places.json')
+    caches = [PlaceCache(path), PlaceCache(path)]
+
+    def writer(cache, index):
+        for number in range(20):
+            cache.put(f"Lugar {index} {number}", URL)
+
+    threads = [threading.Thread(target=writer, args=(caches[index % 2], index)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert "No se pudo guardar" not in caplog.text
+    assert os.listdir(tmp_path) == ['places.json']
+    assert PlaceCache(path).stats()['entries'] > 0
+
+def test_failed_persist_removes_temp_file(tmp_path, monkeypatch):
+    """Test para no dejar el temporal cuando falla el reemplazo"""
+    path = str(tmp_path / 'places.json')
+    cache = PlaceCache(path)
+
+    def failing_replace(src, dst):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    cache.put("Café XYZ", URL)
+
+    assert cache.get("Café XYZ") == URL
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,111 @@
+"""
+Tests para el reparto de envíos entre cuentas
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from src.jobs import JobStore, JobStatus, GoogleAccount, AccountScheduler, load_accounts
+
+PAYLOAD = {'place_name': 'Café XYZ', 'rating': 5, 'text': 'Muy bueno', 'photos': []}
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_load_accounts_from_file(tmp_path):
+    """Test para cargar varias cuentas con sus límites"""
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([
+        {'email': 'a@gmail.com', 'password': 'x', 'concurrency': 2, 'cooldown': 30},
+        {'email': 'b@gmail.com', 'password': 'y', 'alias': 'secundaria'},
+    ]))
+
+    accounts = load_accounts(str(path), concurrency=1, cooldown=5)
+    assert [account.email for account in accounts] == ['a@gmail.com', 'b@gmail.com']
+    assert [account.alias for account in accounts] == ['account-0', 'secundaria']
+    assert (accounts[0].concurrency, accounts[0].cooldown) == (2, 30.0)
+    assert (accounts[1].concurrency, accounts[1].cooldown) == (1, 5.0)
+    assert 'x' not in repr(accounts[0])
+
+    # Sin archivo se usa la cuenta única de la configuración
+    assert load_accounts(None, 'c@gmail.com', 'z')[0].email == 'c@gmail.com'
+
+def test_load_accounts_rejects_duplicates(tmp_path):
+    """Test para rechazar cuentas repetidas"""
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([{'email': 'a@gmail.com', 'password': 'x'}] * 2))
+
+    with pytest.raises(ValueError):
+        load_accounts(str(path))
+
+def test_claim_prefers_users_without_running_jobs(tmp_path):
+    """Test para no dejar que un usuario acapare las cuentas"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    for _ in range(3):
+        store.enqueue('+111', PAYLOAD)
+    store.enqueue('+222', PAYLOAD)
+
+    first = store.claim_next(account='a@gmail.com')
+    second = store.claim_next(account='b@gmail.com')
+    assert (first.user_number, second.user_number) == ('+111', '+222')
+    assert store.get(second.job_id).account == 'b@gmail.com'
+
+def test_scheduler_spreads_jobs_across_accounts(tmp_path):
+    """Test para procesar en paralelo con varias cuentas"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    for index in range(4):
+        store.enqueue(f'+{index}', PAYLOAD)
+
+    used = []
+    barrier = threading.Barrier(2, timeout=5)
+
+    def handler(job, account):
+        used.append(account.email)
+        barrier.wait()  # Solo pasa si las dos cuentas trabajan a la vez
+        return True, "ok"
+
+    accounts = [GoogleAccount('a@gmail.com', 'x'), GoogleAccount('b@gmail.com', 'y')]
+    scheduler = AccountScheduler(store, accounts, handler, max_concurrent=2, poll_interval=0.05)
+    scheduler.start()
+    try:
+        assert wait_until(lambda: store.count_by_status() == {JobStatus.COMPLETED: 4})
+    finally:
+        scheduler.stop(timeout=5)
+
+    assert set(used) == {'a@gmail.com', 'b@gmail.com'}
+    # Las estadísticas y los trabajos no publican el email de la cuenta
+    assert set(scheduler.stats()) == {'account-0', 'account-1'}
+    assert sum(stats['completed'] for stats in scheduler.stats().values()) == 4
+    accounts_used = {row['account'] for row in store.db.execute("SELECT account FROM jobs").fetchall()}
+    assert accounts_used == {'account-0', 'account-1'}
+
+def test_account_cooldown_spaces_submissions(tmp_path):
+    """Test para respetar el tiempo mínimo entre envíos de una cuenta"""
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    store.enqueue('+1', PAYLOAD)
+    store.enqueue('+2', PAYLOAD)
+
+    started = []
+
+    def handler(job, account):
+        started.append(time.monotonic())
+        return True, "ok"
+
+    accounts = [GoogleAccount('a@gmail.com', 'x', concurrency=2, cooldown=0.3)]
+    scheduler = AccountScheduler(store, accounts, handler, poll_interval=0.05)
+    scheduler.start()
+    try:
+        assert wait_until(lambda: len(started) == 2)
+    finally:
+        scheduler.stop(timeout=5)
+
+    assert started[1] - started[0] >= 0.3
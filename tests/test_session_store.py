@@ -0,0 +1,100 @@
+"""
+Tests para la persistencia de la sesión de Google
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.automation.session_store import GoogleSessionStore
+
+class FakeDriver:
+    """Driver falso que responde a los comandos DevTools usados"""
+
+    def __init__(self, cookies=None):
+        self.cookies = cookies or []
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        if command == 'Network.getAllCookies':
+            return {'cookies': self.cookies}
+        return {}
+
+    def execute_script(self, script):
+        return ['https://www.google.com', {'maps_pref': '1'}]
+
+COOKIES = [
+    {'name': 'SID', 'value': 'abc', 'domain': '.google.com', 'path': '/', 'expires': time.time() + 3600,
+     'size': 6, 'httpOnly': True, 'secure': True, 'session': False},
+    {'name': 'NID', 'value': 'old', 'domain': '.google.com', 'path': '/', 'expires': time.time() - 10,
+     'size': 6, 'httpOnly': True, 'secure': True, 'session': False},
+    {'name': 'TMP', 'value': 'x', 'domain': 'accounts.google.com', 'path': '/', 'expires': -1,
+     'size': 4, 'httpOnly': False, 'secure': True, 'session': True},
+]
+
+def test_save_is_encrypted(tmp_path):
+    """Test para verificar que el archivo guardado está cifrado"""
+    store = GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto')
+    assert store.save(FakeDriver(COOKIES))
+
+    with open(store.path, 'rb') as session_file:
+        raw = session_file.read()
+    assert b'SID' not in raw
+    assert store.load()['local_storage'] == {'https://www.google.com': {'maps_pref': '1'}}
+
+def test_restore_sets_valid_cookies(tmp_path):
+    """Test para restaurar solo cookies vigentes"""
+    store = GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto')
+    store.save(FakeDriver(COOKIES))
+
+    driver = FakeDriver()
+    assert store.restore(driver)
+
+    commands = dict(driver.commands)
+    restored = commands['Network.setCookies']['cookies']
+    assert [cookie['name'] for cookie in restored] == ['SID', 'TMP']
+    assert 'size' not in restored[0]
+    assert 'expires' not in restored[1]
+    assert 'maps_pref' in commands['Page.addScriptToEvaluateOnNewDocument']['source']
+
+def test_wrong_key_discards_session(tmp_path):
+    """Test para descartar una sesión cifrada con otra clave"""
+    GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto').save(FakeDriver(COOKIES))
+    other = GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'otra-clave')
+
+    assert not other.restore(FakeDriver())
+    assert not os.path.exists(other.path)
+
+def test_key_is_salted_per_file(tmp_path):
+    """Test para derivar la clave con una sal aleatoria guardada junto al archivo"""
+    first = GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto')
+    second = GoogleSessionStore.for_account(str(tmp_path), 'otro@gmail.com', 'secreto')
+
+    assert os.path.exists(f"{first.path}.salt")
+    assert first.load_salt() != second.load_salt()
+    assert GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto').load_salt() == first.load_salt()
+
+    first.save(FakeDriver(COOKIES))
+    with open(first.path, 'rb') as session_file:
+        token = session_file.read()
+    assert GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto').fernet.decrypt(token)
+
+def test_concurrent_saves_use_their_own_temp_file(tmp_path):
+    """Test para que dos escrituras simultáneas no compartan el archivo temporal"""
+    stores = [GoogleSessionStore.for_account(str(tmp_path), 'user@gmail.com', 'secreto') for _ in range(2)]
+    results = []
+    threads = [
+        threading.Thread(target=lambda store=store: results.extend(store.save(FakeDriver(COOKIES)) for _ in range(20)))
+        for store in stores
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert results == [True] * 40
+    assert stores[0].load()['cookies'][0]['name'] == 'SID'
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
@@ -0,0 +1,109 @@
+"""
+Tests para los almacenes de sesiones
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import time
+import pytest
+
+from src.bot.sessions import InMemorySessionStore, SQLiteSessionStore, SessionStore
+
+def make_store(backend, tmp_path, **kwargs):
+    if backend == 'memory':
+        return InMemorySessionStore(**kwargs)
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'), **kwargs)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    return make_store(request.param, tmp_path)
+
+def test_get_or_create(store):
+    """Test para crear una sesión vacía"""
+    assert store.get('+1234567890') is None
+
+    session = store.get_or_create('+1234567890')
+    assert session.state is None
+    assert session.photos == []
+    assert len(store) == 1
+
+def test_changes_require_save(store):
+    """Test para verificar que las sesiones se devuelven como copias"""
+    session = store.get_or_create('+1234567890')
+    session.photos.append('foto.jpg')
+    assert store.get('+1234567890').photos == []
+
+    store.save('+1234567890', session)
+    assert store.get('+1234567890').photos == ['foto.jpg']
+
+def test_compare_and_set(store):
+    """Test para transiciones atómicas de estado"""
+    session = store.get_or_create('+1234567890')
+    session.state = 'waiting_for_place'
+    assert store.compare_and_set('+1234567890', None, session)
+
+    # Una segunda transición desde el estado anterior se rechaza
+    stale = session.copy()
+    stale.state = 'waiting_for_rating'
+    assert not store.compare_and_set('+1234567890', None, stale)
+    assert store.get('+1234567890').state == 'waiting_for_place'
+
+def test_conditional_delete(store):
+    """Test para borrar solo si el estado coincide"""
+    session = store.get_or_create('+1234567890')
+    session.state = 'confirming_submission'
+    store.save('+1234567890', session)
+
+    assert not store.delete('+1234567890', expected_state='waiting_for_text')
+    assert store.delete('+1234567890', expected_state='confirming_submission')
+    assert not store.delete('+1234567890', expected_state='confirming_submission')
+    assert store.get('+1234567890') is None
+
+def test_sqlite_store_is_shared(tmp_path):
+    """Test para compartir sesiones entre procesos (dos instancias del almacén)"""
+    path = str(tmp_path / 'sessions.db')
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+
+    session = first.get_or_create('+1234567890')
+    session.state = 'waiting_for_place'
+    assert first.compare_and_set('+1234567890', None, session)
+    assert second.get('+1234567890').state == 'waiting_for_place'
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_idle_sessions_expire(backend, tmp_path):
+    """Test para expirar sesiones inactivas"""
+    store = make_store(backend, tmp_path, idle_timeout=0.05)
+    store.get_or_create('+1234567890')
+    store.get_or_create('+1987654321')
+    time.sleep(0.1)
+
+    assert store.get('+1234567890') is None
+    assert store.sweep() == 1
+    assert store.stats() == {'active': 0, 'created': 2, 'expired': 2, 'evicted': 0}
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_least_recently_used_is_evicted(backend, tmp_path):
+    """Test para el límite de sesiones activas"""
+    store = make_store(backend, tmp_path, max_sessions=2)
+    store.get_or_create('+1111111111')
+    time.sleep(0.01)
+    store.get_or_create('+2222222222')
+    time.sleep(0.01)
+    store.save('+1111111111', store.get('+1111111111'))
+    time.sleep(0.01)
+    store.get_or_create('+3333333333')
+
+    assert store.get('+2222222222') is None
+    assert store.get('+1111111111') is not None
+    assert store.stats()['evicted'] == 1
+
+def test_incomplete_store_cannot_be_instantiated():
+    """Test para exigir todos los métodos de la interfaz al crear un almacén"""
+    class PartialStore(SessionStore):
+        def get(self, user_number):
+            return None
+
+    with pytest.raises(TypeError, match='compare_and_set'):
+        PartialStore()
@@ -0,0 +1,156 @@
+"""
+Tests para las trazas de los envíos y las capturas de fallos
+"""
+
+import sys
+import os
+import io
+import gzip
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from PIL import Image
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from src.automation.tracing import Trace, TraceStore, traced_step, describe_condition
+from src.automation.waits import Waiter, element_stable
+
+def png_bytes(size=(2000, 1000)):
+    output = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(output, 'PNG')
+    return output.getvalue()
+
+class FakeDriver:
+    page_source = "<html><body><h1>Café XYZ</h1></body></html>"
+
+    def __init__(self, found_after=0):
+        self.found_after = found_after
+        self.lookups = 0
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        if self.lookups <= self.found_after:
+            raise NoSuchElementException(value)
+        return object()
+
+    def get_screenshot_as_png(self):
+        return png_bytes()
+
+class FakeAutomation:
+    """Pasos con la misma forma que los de GoogleMapsAutomation"""
+
+    def __init__(self, driver, trace=None):
+        self.driver = driver
+        self.trace = trace
+
+    @traced_step('review')
+    def submit_review(self):
+        return self.upload_photos()
+
+    @traced_step('photo_upload')
+    def upload_photos(self):
+        raise RuntimeError("input de fotos no encontrado")
+
+    @traced_step('search')
+    def search_place(self, found):
+        return found
+
+def test_describe_condition_includes_selector():
+    """Test para nombrar las condiciones con su selector"""
+    assert describe_condition(EC.presence_of_element_located((By.CSS_SELECTOR, "h1"))) == \
+        "presence_of_element_located(h1)"
+    assert describe_condition(element_stable((By.ID, "searchboxinput"))) == "element_stable(searchboxinput)"
+
+def test_waiter_records_polls_and_timeouts():
+    """Test para registrar la duración, los sondeos y los tiempos agotados de cada espera"""
+    trace = Trace(job_id='job-1')
+    waiter = Waiter({'search': 0.3}, poll_frequency=0.01)
+    waiter.trace = trace
+    driver = FakeDriver(found_after=2)
+
+    with trace.span('search'):
+        waiter.until(driver, 'search', EC.presence_of_element_located((By.CSS_SELECTOR, "h1")))
+        with pytest.raises(TimeoutException):
+            waiter.until(driver, 'search', lambda driver: False)
+
+    found, timed_out = trace.waits
+    assert found['polls'] == 3
+    assert found['timed_out'] is False
+    assert found['condition'] == "presence_of_element_located(h1)"
+    assert found['span'] == 0
+    assert timed_out['timed_out'] is True
+    assert timed_out['duration_ms'] >= 300
+
+def test_failed_step_captures_snapshot_once():
+    """Test para capturar la página en el primer paso que falla y marcar los spans padres"""
+    trace = Trace(job_id='job-2', attempt=1)
+    automation = FakeAutomation(FakeDriver(), trace)
+
+    with pytest.raises(RuntimeError):
+        automation.submit_review()
+    trace.finish(False, "Error enviando la reseña")
+
+    review, upload = trace.spans
+    assert (review['outcome'], upload['outcome']) == ('error', 'error')
+    assert upload['parent'] == 0
+    assert trace.failed_step == 'photo_upload'
+    assert trace.to_dict()['snapshots'] == ['dom', 'screenshot']
+
+    content_type, encoding, screenshot = trace.snapshots['screenshot']
+    with Image.open(io.BytesIO(screenshot)) as image:
+        assert image.format == 'JPEG'
+        assert max(image.size) == 1280
+    content_type, encoding, dom = trace.snapshots['dom']
+    assert encoding == 'gzip'
+    assert 'Café XYZ' in gzip.decompress(dom).decode('utf-8')
+
+def test_false_result_is_a_failure_without_trace_cost():
+    """Test para tratar False como fallo y no registrar nada sin traza"""
+    trace = Trace()
+    assert FakeAutomation(FakeDriver(), trace).search_place(False) is False
+    assert trace.spans[0]['outcome'] == 'error'
+    assert FakeAutomation(FakeDriver()).search_place(True) is True
+
+def test_store_is_bounded(tmp_path):
+    """Test para conservar solo las últimas trazas y capturas"""
+    store = TraceStore(str(tmp_path / 'traces.db'), max_traces=3, max_snapshots=1)
+    saved = []
+    for index in range(5):
+        trace = store.start_trace(job_id=f'job-{index}', attempt=1)
+        trace.started_at += index
+        automation = FakeAutomation(FakeDriver(), trace)
+        automation.search_place(index % 2 == 0)
+        store.save(trace.finish(index % 2 == 0, None if index % 2 == 0 else "Error buscando el lugar"))
+        saved.append(trace.trace_id)
+
+    recent = store.recent()
+    assert [trace['job_id'] for trace in recent] == ['job-4', 'job-3', 'job-2']
+    assert [trace['job_id'] for trace in store.recent(status='error')] == ['job-3']
+    assert store.get(saved[0]) is None
+    assert store.get(saved[3])['snapshots'] == ['dom', 'screenshot']
+    assert store.get_snapshot(saved[3], 'screenshot')[0] == 'image/jpeg'
+    assert store.stats() == {'traces': 3, 'failed': 1, 'with_snapshots': 1}
+
+def test_summary_shows_dominant_step(tmp_path):
+    """Test para resumir la duración de cada paso y de cada espera"""
+    store = TraceStore(str(tmp_path / 'traces.db'))
+    for _ in range(2):
+        trace = store.start_trace(job_id='job-1')
+        with trace.span('search'):
+            trace.record_wait('search', element_stable((By.ID, 'searchboxinput')), 0.2, 4, False)
+        with trace.span('review'):
+            pass
+        trace.spans[0]['duration_ms'] = 900.0
+        trace.spans[1]['duration_ms'] = 100.0
+        trace.finish(True)
+        trace.duration_ms = 1000.0
+        store.save(trace)
+
+    summary = store.summary()
+    assert summary['traces'] == 2
+    assert summary['steps']['search']['share'] == 0.9
+    assert summary['steps']['review']['p95_ms'] == 100.0
+    wait = summary['waits']['search: element_stable(searchboxinput)']
+    assert (wait['count'], wait['avg_polls'], wait['timeouts']) == (2, 4.0, 0)
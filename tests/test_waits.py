@@ -0,0 +1,107 @@
+"""
+Tests para las esperas por condición
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.automation.waits import Waiter, network_idle, element_stable, uploads_complete
+
+class FakeElement:
+    def __init__(self, rects):
+        self.rects = list(rects)
+
+    @property
+    def rect(self):
+        return self.rects.pop(0) if len(self.rects) > 1 else self.rects[0]
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+class FakeDriver:
+    def __init__(self, element=None, log_batches=None):
+        self.element = element
+        self.log_batches = list(log_batches or [])
+
+    def find_elements(self, by, value):
+        return [self.element] if self.element else []
+
+    def get_log(self, log_type):
+        return self.log_batches.pop(0) if self.log_batches else []
+
+def log_entry(method, request_id, request_type='XHR'):
+    message = {'message': {'method': method, 'params': {'requestId': request_id, 'type': request_type}}}
+    return {'message': json.dumps(message)}
+
+def test_element_stable_waits_for_animation():
+    """Test para esperar a que el elemento deje de moverse"""
+    element = FakeElement([{'x': 0}, {'x': 10}, {'x': 20}, {'x': 20}])
+    condition = element_stable(('css selector', 'button'))
+    driver = FakeDriver(element)
+
+    results = [condition(driver) for _ in range(4)]
+    assert results[:3] == [False, False, False]
+    assert results[3] is element
+
+def test_network_idle_tracks_requests():
+    """Test para detectar peticiones en curso en el log de rendimiento"""
+    condition = network_idle(idle_ms=0)
+    driver = FakeDriver(log_batches=[
+        [log_entry('Network.requestWillBeSent', '1'), log_entry('Network.requestWillBeSent', '2', 'WebSocket')],
+        [log_entry('Network.loadingFinished', '1')],
+    ])
+
+    assert not condition(driver)
+    assert condition(driver)
+
+class FakeThumbnail:
+    def __init__(self, uploading):
+        self.uploading = uploading
+
+    def find_elements(self, by, value):
+        return ['progress'] if self.uploading else []
+
+class ThumbnailDriver:
+    def __init__(self, thumbnails):
+        self.thumbnails = thumbnails
+
+    def find_elements(self, by, value):
+        return self.thumbnails
+
+def test_uploads_complete_counts_finished_thumbnails():
+    """Test para esperar a que terminen las miniaturas nuevas"""
+    existing = FakeThumbnail(False)
+    first, second = FakeThumbnail(True), FakeThumbnail(True)
+    driver = ThumbnailDriver([existing, first, second])
+    condition = uploads_complete(('css selector', 'thumb'), ('css selector', 'bar'), expected=2, baseline=1)
+
+    assert not condition(driver)
+    first.uploading = False
+    assert not condition(driver)
+    assert len(condition.completed_at) == 1
+    second.uploading = False
+    assert condition(driver)
+    assert len(condition.completed_at) == 2
+    assert condition.completed_at[0] <= condition.completed_at[1]
+
+def test_waiter_records_time_per_step():
+    """Test para registrar el tiempo esperado por paso"""
+    waiter = Waiter({'search': 0.05}, poll_frequency=0.01)
+    driver = FakeDriver()
+
+    assert waiter.until(driver, 'review', lambda d: 'ok') == 'ok'
+    with pytest.raises(TimeoutException):
+        waiter.until(driver, 'search', lambda d: False)
+
+    timings = waiter.summary()
+    assert set(timings) == {'review', 'search'}
+    assert timings['search'] >= 0.05
+    assert waiter.timeout_for('login') == 20
@@ -0,0 +1,223 @@
+"""
+Tests para el flujo de conversación del bot
+"""
+
+import sys
+import os
+import time
+import hashlib
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.config import Config
+from src.bot import WhatsAppBot
+from src.jobs import JobStatus, review_fingerprint
+from tests.helpers import FakeHttp, JPEG
+
+USER = '+1234567890'
+
+class FakeMessages:
+    """Registro de los mensajes enviados por la API REST de Twilio"""
+
+    def __init__(self):
+        self.sent = []
+
+    def create(self, from_, body, to):
+        self.sent.append((to, body))
+        return self
+
+class FakeClient:
+    def __init__(self):
+        self.messages = FakeMessages()
+
+@pytest.fixture
+def bot(bot_config, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'PLACE_CACHE_PATH', str(tmp_path / 'places.json'))
+    monkeypatch.setattr(Config, 'TRACE_DB_PATH', str(tmp_path / 'traces.db'))
+
+    bot = WhatsAppBot()
+    bot.client = FakeClient()
+    bot.dispatcher.client_factory = lambda: bot.client
+    yield bot
+    # Cierra también las descargas, el pool de procesos de fotos y los workers de envío
+    bot.stop_workers(timeout=5)
+
+def converse(bot, *messages):
+    return [bot.handle_incoming_message(USER, message, []) for message in messages]
+
+def test_full_conversation_queues_submission(bot):
+    """Test para la conversación completa hasta encolar la reseña"""
+    replies = converse(bot, "hola", "Café XYZ", "5", "Excelente servicio y comida", "sin fotos", "sí")
+
+    assert "nombre del lugar" in replies[0]
+    assert "*Café XYZ*" in replies[1]
+    assert "⭐⭐⭐⭐⭐" in replies[2]
+    assert "Resumen de tu reseña" in replies[4]
+    assert "Reseña en cola" in replies[5]
+    assert bot.sessions.get(USER) is None
+    assert bot.job_store.count_by_status() == {JobStatus.PENDING: 1}
+
+def test_repeated_confirmation_reuses_job(bot):
+    """Test para no encolar dos veces la misma reseña"""
+    first = converse(bot, "hola", "Café XYZ", "5", "Excelente servicio", "sin fotos", "sí")[-1]
+    second = converse(bot, "hola", "cafe xyz", "5", "Excelente  servicio", "sin fotos", "si")[-1]
+
+    job_id = first.rsplit(' ', 1)[-1]
+    assert "Reseña en cola" in second and second.endswith(job_id)
+    assert bot.job_store.count_by_status() == {JobStatus.PENDING: 1}
+
+def test_twilio_retry_returns_same_reply(bot):
+    """Test para responder igual a un reintento del webhook con el mismo MessageSid"""
+    converse(bot, "hola", "Café XYZ", "5", "Excelente servicio", "sin fotos")
+    reply = bot.handle_incoming_message(USER, "sí", [], message_sid='SM123')
+    retry = bot.handle_incoming_message(USER, "sí", [], message_sid='SM123')
+
+    assert retry == reply
+    assert bot.sessions.get(USER) is None
+    assert bot.job_store.count_by_status() == {JobStatus.PENDING: 1}
+
+def test_webhook_retry_does_not_replay_transition(bot):
+    """Test para no aplicar dos veces un mensaje reintentado por Twilio"""
+    converse(bot, "hola", "Café XYZ")
+    reply = bot.handle_incoming_message(USER, "5", [], message_sid='SM5')
+    retry = bot.handle_incoming_message(USER, "5", [], message_sid='SM5')
+
+    assert retry == reply
+    assert bot.sessions.get(USER).state == bot.config.WAITING_FOR_TEXT
+
+def test_unauthorized_sender_gets_no_session(bot):
+    """Test para rechazar números no autorizados antes de crear la sesión"""
+    reply = bot.handle_incoming_message('+1999999999', "hola", [])
+    assert "no tienes autorización" in reply
+    assert bot.sessions.get('+1999999999') is None
+    assert len(bot.sessions) == 0
+
+def test_rate_limited_sender_gets_no_session(bot):
+    """Test para rechazar a un remitente que supera su límite sin crear sesión"""
+    bot.rate_limiter.burst = 0
+    bot.rate_limiter._buckets.clear()
+
+    reply = bot.handle_incoming_message(USER, "hola", [])
+    assert "muy rápido" in reply
+    assert bot.sessions.get(USER) is None
+    assert bot.get_stats()['rate_limit']['rejected'] == 1
+
+def test_stats_do_not_publish_account_emails(bot, monkeypatch):
+    """Test para identificar las cuentas por alias en las estadísticas públicas"""
+    monkeypatch.setattr(Config, 'GOOGLE_EMAIL', 'dueño@gmail.com')
+    monkeypatch.setattr(Config, 'DRIVER_POOL_SIZE', 1)
+    other = WhatsAppBot()
+    try:
+        stats = other.get_stats()
+    finally:
+        other.stop_workers(timeout=5)
+
+    assert set(stats['accounts']) == {'account-0'}
+    assert set(stats['driver_pools']) == {'account-0'}
+    assert 'gmail.com' not in str(stats)
+
+def test_webhook_latency_covers_rejections(bot):
+    """Test para medir cada mensaje entrante completo, también los rechazados"""
+    def observed(outcome):
+        return REGISTRY.get_sample_value('feedback_webhook_request_seconds_count', {'outcome': outcome}) or 0
+
+    rejected, processed = observed('rejected'), observed('processed')
+    bot.handle_incoming_message('+1999999999', "hola", [])
+    bot.handle_incoming_message(USER, "hola", [])
+
+    assert observed('rejected') == rejected + 1
+    assert observed('processed') == processed + 1
+
+def test_webhook_latency_by_session_state(bot):
+    """Test para medir el procesamiento de cada mensaje según el estado de la sesión"""
+    def observed(state):
+        return REGISTRY.get_sample_value('feedback_webhook_latency_seconds_count', {'state': state}) or 0
+
+    new, waiting_for_rating = observed('new'), observed(Config.WAITING_FOR_RATING)
+    converse(bot, "hola", "Café XYZ", "5")
+
+    assert observed('new') == new + 1
+    assert observed(Config.WAITING_FOR_RATING) == waiting_for_rating + 1
+
+def test_turn_replies_are_not_sent_by_rest(bot):
+    """Test para responder cada turno solo por TwiML"""
+    converse(bot, "hola", "Café XYZ", "siete", "4")
+    assert bot.client.messages.sent == []
+
+def test_submission_result_is_sent_by_rest(bot):
+    """Test para notificar el resultado asíncrono por la API REST"""
+    converse(bot, "hola", "Café XYZ", "5", "Excelente servicio y comida", "no", "si")
+    pool = next(iter(bot.worker_pool.pools.values()))
+    pool.handler = lambda job: (True, "Reseña enviada exitosamente")
+
+    bot.dispatcher.start()
+    pool.run_job(bot.job_store.claim_next(account=pool.account))
+    assert bot.dispatcher.drain(timeout=5)
+
+    assert len(bot.client.messages.sent) == 1
+    to, body = bot.client.messages.sent[0]
+    assert to == f'whatsapp:{USER}'
+    assert "Reseña enviada exitosamente" in body
+
+def test_photos_are_downloaded_before_confirmation(bot):
+    """Test para descargar las fotos mientras el usuario confirma"""
+    url = 'https://api.twilio.com/media/1'
+    bot.media.http = FakeHttp({url: (JPEG, 'image/jpeg')})
+
+    converse(bot, "hola", "Café XYZ", "5", "Excelente servicio y comida")
+    reply = bot.handle_incoming_message(USER, "", [url])
+    assert "1 imagen(es)" in reply
+
+    deadline = time.time() + 5
+    while not bot.sessions.get(USER).photos and time.time() < deadline:
+        time.sleep(0.01)
+    session = bot.sessions.get(USER)
+    assert session.media_urls == [url]
+    assert len(session.photos) == 1 and os.path.exists(session.photos[0])
+
+def test_fingerprint_waits_for_pending_downloads(bot):
+    """Test para identificar las fotos por contenido aunque se confirme antes de que terminen de bajar"""
+    url = 'https://api.twilio.com/media/2'
+    released = threading.Event()
+
+    class SlowHttp(FakeHttp):
+        def get(self, url, stream, timeout):
+            released.wait(5)
+            return super().get(url, stream, timeout)
+
+    bot.media.http = SlowHttp({url: (JPEG, 'image/jpeg')})
+    converse(bot, "hola", "Café XYZ", "5", "Excelente servicio y comida")
+    bot.handle_incoming_message(USER, "", [url])
+    threading.Timer(0.2, released.set).start()
+    converse(bot, "si")
+
+    job = bot.job_store.claim_next(account=next(iter(bot.worker_pool.pools.values())).account)
+    assert len(job.payload['photos']) == 1
+    expected = review_fingerprint(
+        USER, "Café XYZ", 5, "Excelente servicio y comida", [hashlib.sha256(JPEG).hexdigest()]
+    )
+    row = bot.job_store.db.execute(
+        "SELECT job_id FROM job_fingerprints WHERE fingerprint = ?", (expected,)
+    ).fetchone()
+    assert row['job_id'] == job.job_id
+
+def test_unknown_state_restarts_conversation(bot):
+    """Test para reiniciar explícitamente una sesión con un estado desconocido"""
+    converse(bot, "hola")
+    session = bot.sessions.get(USER)
+    session.state = 'estado_obsoleto'
+    bot.sessions.save(USER, session)
+
+    reply = bot.handle_incoming_message(USER, "hola", [])
+    assert "empezamos de nuevo" in reply
+    assert bot.sessions.get(USER).state == bot.config.WAITING_FOR_PLACE
+
+def test_invalid_input_keeps_state(bot):
+    """Test para repetir la pregunta sin avanzar ante una respuesta inválida"""
+    replies = converse(bot, "hola", "Café XYZ", "seis", "0")
+
+    assert replies[2] == replies[3] == "Por favor, escribe solo un número del 1 al 5."
+    assert bot.sessions.get(USER).state == bot.config.WAITING_FOR_RATING